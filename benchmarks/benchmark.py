@@ -0,0 +1,338 @@
+"""
+Benchmarks of the server, by default against a large synthetic compstate.
+
+Each endpoint is timed both as the first request after a reload ("cold"), so
+that everything derived from the compstate must be computed, and with a
+snapshot which has already served the request ("warm"). Loading the compstate
+and building the information about every match are timed separately.
+
+Results can be written to a file and compared with those from a previous run,
+for example of the last release::
+
+    python -m benchmarks.benchmark --output 1.11.0.json --compare 1.10.0.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import functools
+import importlib.metadata
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from typing import Any, NamedTuple
+
+from flask.testing import FlaskClient
+
+from benchmarks import synthetic
+from sr.comp.comp import SRComp
+from sr.comp.http import server
+from sr.comp.http.incremental import load_comp, ScoreSheetCache
+from sr.comp.http.manager import SRCompManager, touch_update_file
+from sr.comp.http.query_utils import match_json_info
+
+ENDPOINTS: Sequence[str] = (
+    '/',
+    '/arenas',
+    '/corners',
+    '/locations',
+    '/config',
+    '/state',
+    '/teams',
+    '/teams/{tla}',
+    '/teams/{tla}/matches',
+    '/matches',
+    '/matches?arena={arena}',
+    '/matches?team={tla}',
+    '/matches?type=league&limit=100',
+    '/matches?fields=num,arena,times.slot',
+    '/matches/last_scored',
+    '/periods',
+    '/current',
+    '/knockout',
+    '/batch?path=/state&path=/current&path=/matches/last_scored',
+)
+"""
+The endpoints to time. ``{tla}`` and ``{arena}`` are replaced with the first
+team and arena in the compstate.
+"""
+
+RELOAD_TIMEOUT = 10
+"""The longest, in seconds, to wait for the server to notice an update."""
+
+SLOWER_THRESHOLD = 0.1
+"""
+The fractional increase in minimum time reported as a regression. The minimum
+is compared as it is the least affected by other activity on the machine.
+"""
+
+
+class Timing(NamedTuple):
+    runs: int
+    minimum: float
+    median: float
+    mean: float
+    p95: float
+    """The 95th percentile, in seconds."""
+
+    @classmethod
+    def from_durations(cls, durations: Sequence[float]) -> Timing:
+        if len(durations) > 1:
+            p95 = statistics.quantiles(durations, n=20, method='inclusive')[-1]
+        else:
+            p95 = durations[0]
+        return cls(
+            runs=len(durations),
+            minimum=min(durations),
+            median=statistics.median(durations),
+            mean=statistics.fmean(durations),
+            p95=p95,
+        )
+
+
+def time_calls(
+    function: Callable[[], object],
+    repeat: int,
+    setup: Callable[[], object] | None = None,
+) -> Timing:
+    """
+    Time repeated calls to a function.
+
+    :param callable setup: Called before each call to the function, outside
+                           of the timing.
+    """
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return Timing.from_durations(durations)
+
+
+@contextlib.contextmanager
+def _serving(compstate: str) -> Iterator[None]:
+    """Serve the given compstate, restoring the app's configuration after."""
+    config = server.app.config
+    previous = config.get('COMPSTATE')
+    config['COMPSTATE'] = compstate
+    try:
+        yield
+    finally:
+        if previous is None:
+            del config['COMPSTATE']
+        else:
+            config['COMPSTATE'] = previous
+
+
+def _get(client: FlaskClient, path: str) -> None:
+    response = client.get(path)
+    if response.status_code != 200:
+        raise RuntimeError(f"Got {response.status} from {path}")
+
+
+def _reload(manager: SRCompManager) -> None:
+    """
+    Signal an update to the compstate and wait for it to be reloaded,
+    discarding everything derived from it.
+    """
+    previous = manager.get_snapshot()
+    touch_update_file(manager.root_dir)
+
+    deadline = time.monotonic() + RELOAD_TIMEOUT
+    while manager.get_snapshot() is previous:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Timed out waiting for {manager.root_dir} to reload")
+        time.sleep(0.01)
+
+
+def benchmark_endpoints(
+    compstate: str,
+    repeat: int,
+    endpoints: Sequence[str] = ENDPOINTS,
+) -> dict[str, Timing]:
+    timings = {}
+    client = server.app.test_client()
+
+    with _serving(compstate):
+        comp = server.configure_manager().get_comp()
+        substitutions = {
+            'tla': next(iter(comp.teams)),
+            'arena': next(iter(comp.arenas)),
+        }
+
+        for template in endpoints:
+            get = functools.partial(_get, client, template.format(**substitutions))
+            timings[f'GET {template} (cold)'] = time_calls(
+                get,
+                repeat,
+                setup=lambda: _reload(server.comp_man),
+            )
+            timings[f'GET {template} (warm)'] = time_calls(get, repeat)
+
+    return timings
+
+
+def benchmark_load(compstate: str, repeat: int) -> Timing:
+    """Time a full load of the compstate, as done by the server."""
+    return time_calls(lambda: load_comp(compstate, ScoreSheetCache()), repeat)
+
+
+def benchmark_match_json_info(compstate: str, repeat: int) -> Timing:
+    """Time building the information about every match in the compstate."""
+    comp = SRComp(compstate)
+    matches = [
+        match
+        for slot in comp.schedule.matches
+        for match in slot.values()
+    ]
+
+    def build_all() -> None:
+        for match in matches:
+            match_json_info(comp, match)
+
+    return time_calls(build_all, repeat)
+
+
+def run(
+    compstate: str,
+    repeat: int = 5,
+    load_repeat: int = 3,
+) -> dict[str, Timing]:
+    """Run all the benchmarks against a compstate."""
+    return {
+        'load_comp': benchmark_load(compstate, load_repeat),
+        'match_json_info (all matches)': benchmark_match_json_info(compstate, repeat),
+        **benchmark_endpoints(compstate, repeat),
+    }
+
+
+def describe_environment() -> dict[str, str]:
+    versions = {
+        name: importlib.metadata.version(name)
+        for name in ('sr.comp', 'sr.comp.http', 'flask')
+    }
+    return {
+        **versions,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def results_json(
+    timings: Mapping[str, Timing],
+    scale: synthetic.Scale | None,
+) -> dict[str, Any]:
+    return {
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'environment': describe_environment(),
+        'scale': None if scale is None else scale._asdict(),
+        'timings': {name: timing._asdict() for name, timing in timings.items()},
+    }
+
+
+def compare(
+    previous: Mapping[str, Any],
+    timings: Mapping[str, Timing],
+    threshold: float = SLOWER_THRESHOLD,
+) -> tuple[list[str], list[str]]:
+    """
+    Compare timings with the results of a previous run.
+
+    :return: A description of the change in each minimum time, and the names
+             of the timings which are slower by more than the threshold.
+    """
+    lines = []
+    slower = []
+    for name, timing in timings.items():
+        before = previous['timings'].get(name)
+        if before is None:
+            lines.append(f'{name}: new')
+            continue
+
+        change = timing.minimum / before['minimum'] - 1
+        lines.append(
+            f"{name}: {before['minimum'] * 1000:.2f}ms -> "
+            f"{timing.minimum * 1000:.2f}ms ({change:+.0%})",
+        )
+        if change > threshold:
+            slower.append(name)
+
+    return lines, slower
+
+
+def format_timings(timings: Mapping[str, Timing]) -> str:
+    width = max(len(name) for name in timings)
+    lines = [f"{'':<{width}}  {'median':>9}  {'p95':>9}  {'min':>9}"]
+    for name, timing in timings.items():
+        lines.append(
+            f'{name:<{width}}  {timing.median * 1000:7.2f}ms  '
+            f'{timing.p95 * 1000:7.2f}ms  {timing.minimum * 1000:7.2f}ms',
+        )
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the SRComp HTTP API.")
+    parser.add_argument(
+        '--compstate',
+        help="Compstate to benchmark against, instead of a synthetic one",
+    )
+    synthetic.add_scale_arguments(parser)
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help="Number of times to run each benchmark (default: %(default)s).",
+    )
+    parser.add_argument(
+        '--load-repeat',
+        type=int,
+        default=3,
+        help="Number of times to load the compstate (default: %(default)s).",
+    )
+    parser.add_argument('--output', help="File to write the results to, as JSON")
+    parser.add_argument(
+        '--compare',
+        help="Results of a previous run to compare with. Exits with an error if "
+             "any benchmark is more than 10%% slower.",
+    )
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if args.compstate is None:
+            scale = synthetic.scale_from_arguments(args)
+            compstate = stack.enter_context(tempfile.TemporaryDirectory())
+            synthetic.generate(compstate, scale)
+        else:
+            scale = None
+            compstate = args.compstate
+
+        timings = run(compstate, args.repeat, args.load_repeat)
+
+    print(format_timings(timings))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results_json(timings, scale), f, indent=2)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        lines, slower = compare(previous, timings)
+        print()
+        print('\n'.join(lines))
+        if slower:
+            sys.exit(f"Slower than {args.compare}: {', '.join(slower)}")
+
+
+if __name__ == '__main__':
+    main()
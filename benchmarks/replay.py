@@ -0,0 +1,294 @@
+"""
+Replay of recorded requests, for load testing the server with a realistic mix
+of requests.
+
+Requests are recorded by a server whose ``REQUEST_RECORD_FILE`` config key is
+set. They can then be replayed against the application in-process::
+
+    python -m benchmarks.replay requests.jsonl --compstate /path/to/compstate
+
+or against a running server, here at twice the recorded rate::
+
+    python -m benchmarks.replay requests.jsonl --url http://localhost:5112 --speed 2
+
+Requests are sent at the times they were recorded, scaled by the speed, and
+the latency of each is measured from the time it was due to be sent. Latencies
+therefore include any time spent waiting for a free worker, as the recorded
+clients would have experienced it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import http.client
+import logging
+import math
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Iterable, Sequence
+from typing import NamedTuple
+
+from flask import Flask
+from flask.testing import FlaskClient
+
+from sr.comp.http.recording import read_recording, RecordedRequest
+
+SKIPPED_ROUTES = frozenset({
+    # Responses never complete, so cannot be timed
+    '/stream',
+})
+
+PERCENTILES: Sequence[float] = (0.5, 0.9, 0.99)
+
+Send = Callable[[RecordedRequest], int]
+"""Sends a request, returning the status code of the response."""
+
+
+class Result(NamedTuple):
+    route: str
+    status: int | None
+    """The status code of the response, or ``None`` if the request failed."""
+    latency: float
+    """The time from when the request was due to be sent until its response."""
+    lag: float
+    """How late the request was sent, for example due to a lack of workers."""
+
+
+class RouteSummary(NamedTuple):
+    route: str
+    requests: int
+    errors: int
+    """The number of requests which failed or had a server error."""
+    percentiles: dict[float, float]
+    """Mapping of fractions to the latencies at those percentiles."""
+    maximum: float
+
+
+def _headers(recorded: RecordedRequest) -> dict[str, str]:
+    headers = {}
+    if recorded.accept_encoding is not None:
+        headers['Accept-Encoding'] = recorded.accept_encoding
+    return headers
+
+
+class InProcessTarget:
+    """
+    Sends requests directly to a WSGI application.
+
+    :param Flask app: The application to send requests to.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self._local = threading.local()
+
+    def __call__(self, recorded: RecordedRequest) -> int:
+        client: FlaskClient | None = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+
+        response = client.open(
+            recorded.path,
+            method=recorded.method,
+            query_string=recorded.query,
+            headers=_headers(recorded),
+        )
+        # Consume the body, as a real client would
+        response.get_data()
+        return response.status_code
+
+
+class HttpTarget:
+    """
+    Sends requests to a server over HTTP, keeping a connection open on each
+    thread.
+
+    :param str url: The base URL of the server.
+    """
+
+    def __init__(self, url: str) -> None:
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != 'http' or parts.hostname is None:
+            raise ValueError(f"Unsupported URL {url!r}, must be http://<host>")
+
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self._local = threading.local()
+
+    def __call__(self, recorded: RecordedRequest) -> int:
+        connection: http.client.HTTPConnection | None
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port)
+            self._local.connection = connection
+
+        target = self.base_path + recorded.path
+        if recorded.query:
+            target += '?' + recorded.query
+
+        try:
+            connection.request(recorded.method, target, headers=_headers(recorded))
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect for the next request
+            connection.close()
+            self._local.connection = None
+            raise
+
+        return response.status
+
+
+def _send(send: Send, recorded: RecordedRequest, due: float | None) -> Result:
+    start = time.perf_counter()
+    if due is None:
+        due = start
+
+    status: int | None
+    try:
+        status = send(recorded)
+    except Exception:
+        logging.exception("Error requesting %s", recorded.path)
+        status = None
+
+    return Result(
+        route=recorded.route,
+        status=status,
+        latency=time.perf_counter() - due,
+        lag=max(start - due, 0),
+    )
+
+
+def replay(
+    requests: Iterable[RecordedRequest],
+    send: Send,
+    speed: float = 1,
+    workers: int = 32,
+) -> list[Result]:
+    """
+    Replay requests at their recorded times, scaled by the given speed.
+
+    :param float speed: How many times faster than recorded to send the
+                        requests, or zero to send them as fast as possible.
+    :param int workers: The maximum number of requests to have in progress.
+    """
+    requests = sorted(
+        (x for x in requests if x.route not in SKIPPED_ROUTES),
+        key=lambda x: x.time,
+    )
+    if not requests:
+        return []
+
+    first = requests[0].time
+    start = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix='srcomp-replay',
+    ) as executor:
+        futures = []
+        for recorded in requests:
+            due = None
+            if speed:
+                due = start + (recorded.time - first) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(executor.submit(_send, send, recorded, due))
+
+        return [future.result() for future in futures]
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """The nearest-rank percentile of some sorted values."""
+    index = math.ceil(fraction * len(values)) - 1
+    return values[min(max(index, 0), len(values) - 1)]
+
+
+def summarise(results: Iterable[Result]) -> list[RouteSummary]:
+    """Summarise the latencies of the results for each route, by route."""
+    by_route: dict[str, list[Result]] = {}
+    for result in results:
+        by_route.setdefault(result.route, []).append(result)
+
+    summaries = []
+    for route, route_results in sorted(by_route.items()):
+        latencies = sorted(x.latency for x in route_results)
+        summaries.append(RouteSummary(
+            route=route,
+            requests=len(route_results),
+            errors=sum(1 for x in route_results if x.status is None or x.status >= 500),
+            percentiles={x: percentile(latencies, x) for x in PERCENTILES},
+            maximum=latencies[-1],
+        ))
+    return summaries
+
+
+def format_summaries(summaries: Sequence[RouteSummary]) -> str:
+    width = max([len('route'), *(len(x.route) for x in summaries)])
+    headings = [f'p{x * 100:g}' for x in PERCENTILES] + ['max']
+    lines = [
+        f"{'route':<{width}}  {'requests':>8}  {'errors':>6}  " +
+        '  '.join(f'{x:>9}' for x in headings),
+    ]
+    for summary in summaries:
+        latencies = [*summary.percentiles.values(), summary.maximum]
+        lines.append(
+            f'{summary.route:<{width}}  {summary.requests:>8}  {summary.errors:>6}  ' +
+            '  '.join(f'{x * 1000:7.1f}ms' for x in latencies),
+        )
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded requests.")
+    parser.add_argument('recording', help="File of recorded requests")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        '--compstate',
+        help="Compstate to serve the requests from, in this process",
+    )
+    target.add_argument('--url', help="Base URL of a server to send the requests to")
+    parser.add_argument(
+        '--speed',
+        type=float,
+        default=1,
+        help="How many times faster than recorded to send requests, or 0 to "
+             "send them as fast as possible (default: %(default)s).",
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=32,
+        help="Maximum number of concurrent requests (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    send: Send
+    if args.url is not None:
+        send = HttpTarget(args.url)
+    else:
+        from sr.comp.http import app
+        app.config['COMPSTATE'] = args.compstate
+        send = InProcessTarget(app)
+
+    requests = list(read_recording(args.recording))
+
+    start = time.perf_counter()
+    results = replay(requests, send, args.speed, args.workers)
+    duration = time.perf_counter() - start
+
+    print(format_summaries(summarise(results)))
+    print()
+    print(
+        f"Sent {len(results)} requests in {duration:.1f}s "
+        f"({len(results) / duration:.1f}/s), "
+        f"skipped {len(requests) - len(results)}",
+    )
+
+
+if __name__ == '__main__':
+    main()
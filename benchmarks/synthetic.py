@@ -0,0 +1,266 @@
+"""
+Generation of synthetic compstates, for exercising the server at scale.
+
+For example, to write a compstate with 200 teams playing 3,000 league matches
+across 8 arenas::
+
+    python -m benchmarks.synthetic /path/to/compstate \\
+        --teams 200 --arenas 8 --league-slots 375
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+import random
+import string
+import subprocess
+from typing import Any, NamedTuple
+
+import yaml
+
+# The start of the league, in the compstate's timezone
+START = datetime.datetime(
+    2024,
+    4,
+    13,
+    10,
+    0,
+    tzinfo=datetime.timezone(datetime.timedelta(hours=1)),
+)
+
+SLOT_LENGTH = 300
+"""The length of each match slot, in seconds."""
+
+CORNERS = 4
+
+SCORER = '''\
+class Scorer:
+    def __init__(self, teams_data, arena_data):
+        self.teams_data = teams_data
+
+    def calculate_scores(self):
+        return {tla: info['score'] for tla, info in self.teams_data.items()}
+'''
+
+
+class Scale(NamedTuple):
+    teams: int = 200
+    arenas: int = 8
+    league_slots: int = 375
+    """The number of league matches in each arena."""
+    scored_slots: int | None = None
+    """
+    The number of league matches in each arena which have been scored.
+    Defaults to half of them.
+    """
+    knockout_teams: int = 32
+    seed: int = 0
+    """Seeds the random allocation of teams to matches and their scores."""
+
+
+def team_tla(index: int) -> str:
+    letters = string.ascii_uppercase
+    return letters[index // 676 % 26] + letters[index // 26 % 26] + letters[index % 26]
+
+
+def arena_name(index: int) -> str:
+    return string.ascii_uppercase[index]
+
+
+def _dump(root: str, name: str, data: Any) -> None:
+    path = os.path.join(root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        yaml.safe_dump(data, f)
+
+
+def _schedule(scale: Scale, arenas: list[str]) -> dict[str, Any]:
+    league_end = START + datetime.timedelta(seconds=SLOT_LENGTH * (scale.league_slots + 12))
+    knockout_start = league_end + datetime.timedelta(hours=1)
+    return {
+        'match_slot_lengths': {'pre': 90, 'match': 180, 'post': 30, 'total': SLOT_LENGTH},
+        'staging': {
+            'opens': 300,
+            'closes': 120,
+            'duration': 180,
+            'signal_shepherds': {'Blue': 241, 'Green': 181},
+            'signal_teams': 240,
+        },
+        'timezone': 'Europe/London',
+        'delays': [],
+        'match_periods': {
+            'league': [{
+                'start_time': START,
+                'end_time': league_end,
+                'description': "League",
+            }],
+            'knockout': [{
+                'start_time': knockout_start,
+                'end_time': knockout_start + datetime.timedelta(hours=4),
+                'description': "Knockouts",
+            }],
+        },
+        'league': {'extra_spacing': []},
+        'knockout': {
+            'scheduler': 'automatic',
+            'arity': scale.knockout_teams,
+            'round_spacing': {'default': {'delay_flex': 0, 'minimum': 300, 'nominal': 300}},
+            'single_arena': {'rounds': 1, 'arenas': arenas[:1]},
+        },
+    }
+
+
+def generate(root: str, scale: Scale | None = None) -> None:
+    """
+    Write a synthetic compstate to a directory and commit it to a git
+    repository there, creating the repository if needed.
+
+    Each league match slot uses distinct teams in every arena, so there must
+    be at least four teams for each arena.
+    """
+    if scale is None:
+        scale = Scale()
+
+    if scale.teams < CORNERS * scale.arenas:
+        raise ValueError(
+            f"Need at least {CORNERS * scale.arenas} teams for {scale.arenas} arenas",
+        )
+    if not 0 < scale.arenas <= 26:
+        raise ValueError("Must have between 1 and 26 arenas")
+
+    rng = random.Random(scale.seed)
+    teams = [team_tla(x) for x in range(scale.teams)]
+    arenas = [arena_name(x) for x in range(scale.arenas)]
+
+    _dump(root, 'teams.yaml', {'teams': {
+        tla: {'name': f"Team {tla}", 'rookie': index % 5 == 0}
+        for index, tla in enumerate(teams)
+    }})
+    _dump(root, 'arenas.yaml', {
+        'arenas': {arena: {'display_name': f"Arena {arena}"} for arena in arenas},
+        'corners': {x: {'colour': f'#00ff0{x}'} for x in range(CORNERS)},
+    })
+
+    half = len(teams) // 2
+    _dump(root, 'layout.yaml', {'teams': [
+        {'name': 'a-group', 'display_name': "A group", 'teams': teams[:half]},
+        {'name': 'b-group', 'display_name': "B group", 'teams': teams[half:]},
+    ]})
+    _dump(root, 'shepherding.yaml', {'shepherds': [
+        {'name': 'Blue', 'colour': 'blue', 'regions': ['a-group']},
+        {'name': 'Green', 'colour': 'green', 'regions': ['b-group']},
+    ]})
+    _dump(root, 'schedule.yaml', _schedule(scale, arenas))
+
+    league: dict[int, dict[str, list[str]]] = {}
+    for num in range(scale.league_slots):
+        playing = rng.sample(teams, CORNERS * scale.arenas)
+        league[num] = {
+            arena: playing[index * CORNERS:(index + 1) * CORNERS]
+            for index, arena in enumerate(arenas)
+        }
+    _dump(root, 'league.yaml', {'matches': league})
+
+    os.makedirs(os.path.join(root, 'scoring'), exist_ok=True)
+    with open(os.path.join(root, 'scoring', 'score.py'), 'w') as f:
+        f.write(SCORER)
+
+    scored_slots = scale.scored_slots
+    if scored_slots is None:
+        scored_slots = scale.league_slots // 2
+    for num in range(min(scored_slots, scale.league_slots)):
+        for arena, match_teams in league[num].items():
+            _dump(root, f'league/{arena}/{num:03d}.yaml', {
+                'arena_id': arena,
+                'match_number': num,
+                'teams': {
+                    tla: {'zone': zone, 'score': rng.randint(0, 20), 'present': True}
+                    for zone, tla in enumerate(match_teams)
+                },
+            })
+
+    if not os.path.exists(os.path.join(root, '.git')):
+        subprocess.check_call(['git', 'init', '--quiet'], cwd=root)
+    subprocess.check_call(['git', 'add', '--all'], cwd=root)
+    # Fixed dates so that the revision depends only on the content
+    date = START.isoformat()
+    subprocess.check_call(
+        [
+            'git',
+            '-c',
+            'user.name=SRComp',
+            '-c',
+            'user.email=srcomp@localhost',
+            'commit',
+            '--quiet',
+            '--allow-empty',
+            f'--message=Synthetic compstate {scale}',
+        ],
+        cwd=root,
+        env={**os.environ, 'GIT_AUTHOR_DATE': date, 'GIT_COMMITTER_DATE': date},
+    )
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = Scale()
+    parser.add_argument(
+        '--teams',
+        type=int,
+        default=defaults.teams,
+        help="Number of teams (default: %(default)s).",
+    )
+    parser.add_argument(
+        '--arenas',
+        type=int,
+        default=defaults.arenas,
+        help="Number of arenas (default: %(default)s).",
+    )
+    parser.add_argument(
+        '--league-slots',
+        type=int,
+        default=defaults.league_slots,
+        help="Number of league matches in each arena (default: %(default)s).",
+    )
+    parser.add_argument(
+        '--scored-slots',
+        type=int,
+        default=defaults.scored_slots,
+        help="Number of league matches in each arena with scores (default: half).",
+    )
+    parser.add_argument(
+        '--knockout-teams',
+        type=int,
+        default=defaults.knockout_teams,
+        help="Number of teams in the knockouts (default: %(default)s).",
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=defaults.seed,
+        help="Seed for the random allocation of teams and scores (default: %(default)s).",
+    )
+
+
+def scale_from_arguments(args: argparse.Namespace) -> Scale:
+    return Scale(
+        teams=args.teams,
+        arenas=args.arenas,
+        league_slots=args.league_slots,
+        scored_slots=args.scored_slots,
+        knockout_teams=args.knockout_teams,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic compstate.")
+    parser.add_argument('compstate', help="Directory to write the compstate to")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    generate(args.compstate, scale_from_arguments(args))
+
+
+if __name__ == '__main__':
+    main()
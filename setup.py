@@ -20,13 +20,18 @@ setup(
     author="Student Robotics Competition Software SIG",
     author_email="srobo-devel@googlegroups.com",
     install_requires=[
-        'sr.comp >=1.5, <2',
+        'sr.comp >=1.12, <2',
         'Flask >=2.2',
         'Werkzeug >= 2, <4',
         'simplejson >=3.6, <4',
         'python-dateutil >=2.2, <3',
         'typing-extensions >=3.7.4.2, <5',
     ],
+    extras_require={
+        'brotli': ['brotli'],
+        'images': ['Pillow'],
+        'orjson': ['orjson >=3.6'],
+    },
     python_requires='>=3.10',
     entry_points={
         'console_scripts': [
@@ -0,0 +1,266 @@
+"""
+An ASGI application serving the same API as the Flask application.
+
+Requests are handled by the Flask application on a pool of threads, so that
+loading the compstate and rendering responses does not block the event loop.
+The `/stream` endpoint is served directly on the event loop, allowing a single
+process to hold open many more connections than it has threads.
+
+This can be served by any ASGI server, for example::
+
+    uvicorn sr.comp.http.asgi:app
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import io
+import logging
+import sys
+from collections.abc import Awaitable, Callable, MutableMapping
+from typing import Any
+
+from flask import Flask
+
+from sr.comp.http import server
+from sr.comp.http.events import AsyncSubscription
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+WsgiResponse = tuple[int, list[tuple[bytes, bytes]], bytes]
+
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    # Prevent nginx from buffering the events
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def _path_info(scope: Scope) -> str:
+    """
+    The path of an ASGI HTTP request, relative to the application's root.
+
+    Some servers include the ``root_path`` in the ``path``, while others do
+    not, so it is removed only when present.
+    """
+    root_path: str = scope.get('root_path', '')
+    path: str = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return path
+
+
+def _wsgi_environ(scope: Scope, body: bytes) -> dict[str, Any]:
+    """Build a WSGI environment for an ASGI HTTP request."""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    client = scope.get('client')
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': _path_info(scope).encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0] if client else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = f'HTTP_{key}'
+        if key in environ:
+            environ[key] += ',' + value.decode('latin-1')
+        else:
+            environ[key] = value.decode('latin-1')
+
+    return environ
+
+
+def _call_wsgi(wsgi_app: Flask, environ: dict[str, Any]) -> WsgiResponse:
+    """Call a WSGI application, collecting its whole response."""
+    status_line = ''
+    headers: list[tuple[str, str]] = []
+
+    def start_response(
+        status: str,
+        response_headers: list[tuple[str, str]],
+        exc_info: Any = None,
+    ) -> Callable[[bytes], object]:
+        nonlocal status_line, headers
+        status_line = status
+        headers = response_headers
+        return lambda data: None
+
+    result = wsgi_app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        close = getattr(result, 'close', None)
+        if close is not None:
+            close()
+
+    return (
+        int(status_line.split(' ', 1)[0]),
+        [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        body,
+    )
+
+
+class AsgiApp:
+    """
+    An ASGI application which serves the API.
+
+    :param Flask wsgi_app: The Flask application which handles requests.
+    :param int max_workers: The number of threads to handle requests with.
+                            Defaults to that of a
+                            :class:`concurrent.futures.ThreadPoolExecutor`.
+    """
+
+    def __init__(self, wsgi_app: Flask = server.app, max_workers: int | None = None) -> None:
+        self.wsgi_app = wsgi_app
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='srcomp-asgi',
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if scope['method'] == 'GET' and _path_info(scope) == '/stream':
+                await self._stream(scope, receive, send)
+            else:
+                await self._call_flask(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    async def _call_flask(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body = await self._read_body(receive)
+        environ = _wsgi_environ(scope, body)
+
+        loop = asyncio.get_running_loop()
+        status, headers, response_body = await loop.run_in_executor(
+            self.executor,
+            _call_wsgi,
+            self.wsgi_app,
+            environ,
+        )
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        await send({'type': 'http.response.body', 'body': response_body})
+
+    def _prepare_stream(self) -> None:
+        server.configure_manager().get_snapshot()
+
+    async def _stream(self, scope: Scope, receive: Receive, send: Send) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            # Ensure that the compstate can be loaded before starting the stream
+            await loop.run_in_executor(self.executor, self._prepare_stream)
+        except Exception:
+            logging.exception("Error loading compstate for /stream")
+            await send({
+                'type': 'http.response.start',
+                'status': 500,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+            })
+            await send({'type': 'http.response.body', 'body': b'Internal Server Error'})
+            return
+
+        headers = list(STREAM_HEADERS)
+        if any(name == b'origin' for name, _ in scope['headers']):
+            headers.append((b'access-control-allow-origin', b'*'))
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': headers,
+        })
+
+        subscription = server.events.subscribe_async(loop)
+        try:
+            await self._send_events(subscription, receive, send)
+        finally:
+            subscription.close()
+
+    async def _send_events(
+        self,
+        subscription: AsyncSubscription,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            while True:
+                message = asyncio.ensure_future(subscription.get())
+                await asyncio.wait(
+                    (message, disconnected),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if disconnected.done():
+                    message.cancel()
+                    return
+
+                event = message.result()
+                if event is None:
+                    break
+
+                await send({
+                    'type': 'http.response.body',
+                    'body': event,
+                    'more_body': True,
+                })
+
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+
+    async def _wait_for_disconnect(self, receive: Receive) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+
+app = AsgiApp()
+"""The ASGI application, wrapping :data:`sr.comp.http.app`."""
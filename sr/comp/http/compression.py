@@ -0,0 +1,68 @@
+"""Compression of response bodies."""
+
+from __future__ import annotations
+
+import collections
+import gzip
+import threading
+from collections.abc import Sequence
+
+from werkzeug.datastructures import Accept
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 500
+"""Bodies smaller than this many bytes are not worth compressing."""
+
+ENCODINGS: Sequence[str] = ('br', 'gzip') if brotli is not None else ('gzip',)
+"""The supported content codings, in order of preference."""
+
+
+def choose_encoding(accept_encodings: Accept) -> str | None:
+    """
+    Choose the content coding to use for a response, given the request's
+    ``Accept-Encoding`` header.
+    """
+    return accept_encodings.best_match(ENCODINGS)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        # Fixed mtime so that the output depends only on the body
+        return gzip.compress(body, mtime=0)
+    elif encoding == 'br' and brotli is not None:
+        compressed: bytes = brotli.compress(body)
+        return compressed
+    else:
+        raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+class CompressedBodies:
+    """
+    A bounded cache of compressed response bodies, discarding the least
+    recently used bodies once full.
+
+    :param int max_entries: The maximum number of bodies to keep.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._bodies: collections.OrderedDict[tuple[str, str], bytes]
+        self._bodies = collections.OrderedDict()
+
+    def get(self, key: str, encoding: str) -> bytes | None:
+        with self._lock:
+            body = self._bodies.get((key, encoding))
+            if body is not None:
+                self._bodies.move_to_end((key, encoding))
+            return body
+
+    def add(self, key: str, encoding: str, body: bytes) -> None:
+        with self._lock:
+            self._bodies[key, encoding] = body
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
@@ -1,4 +1,4 @@
-from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import BadRequest, Gone
 
 
 # 400
@@ -8,3 +8,23 @@ class UnknownMatchFilter(BadRequest):
     def __init__(self, name: str) -> None:
         super().__init__()
         self.details = {'name': name}
+
+
+class UnknownImageSize(BadRequest):
+    description = 'Unknown image size.'
+
+    def __init__(self, size: str) -> None:
+        super().__init__()
+        self.details = {'size': size}
+
+
+# 410
+class UnknownRevision(Gone):
+    description = (
+        'Changes since the given revision are not available. Fetch all the '
+        'matches again by passing an empty since parameter.'
+    )
+
+    def __init__(self, state: str) -> None:
+        super().__init__()
+        self.details = {'state': state}
@@ -0,0 +1,264 @@
+"""Broadcasting of Server-Sent Events to many subscribers."""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from typing import TypeVar
+
+TSubscription = TypeVar('TSubscription', bound='BaseSubscription')
+
+HEARTBEAT = b': heartbeat\n\n'
+"""A comment, sent to keep idle connections open."""
+
+
+def format_event(name: str, data: str) -> bytes:
+    """Format an event in the ``text/event-stream`` format."""
+    lines = [f'event: {name}']
+    lines += [f'data: {line}' for line in data.splitlines()]
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class BaseSubscription(abc.ABC):
+    """Base class for subscribers to the events of a :class:`Broadcaster`."""
+
+    def __init__(self, broadcaster: Broadcaster) -> None:
+        self._broadcaster = broadcaster
+
+    @abc.abstractmethod
+    def put(self, message: bytes) -> None:
+        """
+        Queue a message for the subscriber. Called on the producer's thread.
+        """
+
+    def close(self) -> None:
+        self._broadcaster.unsubscribe(self)
+
+
+class Subscription(BaseSubscription):
+    """
+    A subscription for consumption from a thread.
+
+    Iterating over a subscription yields the formatted events, blocking until
+    each is available. Iteration ends if the subscriber falls too far behind.
+    """
+
+    def __init__(
+        self,
+        broadcaster: Broadcaster,
+        max_pending: int,
+        initial: Iterable[bytes] = (),
+    ) -> None:
+        super().__init__(broadcaster)
+        self._queue: queue.Queue[bytes | None] = queue.Queue(max_pending)
+        for message in initial:
+            self._queue.put_nowait(message)
+
+    def put(self, message: bytes) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            logging.warning("Dropping event subscriber which has fallen behind")
+            self.close()
+            # Make room to signal the end of the events
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._queue.put_nowait(None)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            yield message
+
+
+class AsyncSubscription(BaseSubscription):
+    """
+    A subscription for consumption from an asyncio event loop.
+
+    Asynchronously iterating over a subscription yields the formatted events.
+    Iteration ends if the subscriber falls too far behind.
+    """
+
+    def __init__(
+        self,
+        broadcaster: Broadcaster,
+        max_pending: int,
+        loop: asyncio.AbstractEventLoop,
+        initial: Iterable[bytes] = (),
+    ) -> None:
+        super().__init__(broadcaster)
+        self._loop = loop
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(max_pending)
+        for message in initial:
+            self._queue.put_nowait(message)
+
+    def put(self, message: bytes) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The loop has been closed
+            self.close()
+
+    def _put(self, message: bytes) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logging.warning("Dropping event subscriber which has fallen behind")
+            self.close()
+            # Make room to signal the end of the events
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self) -> bytes | None:
+        """
+        Wait for the next event, returning ``None`` once there will be no more.
+        """
+        return await self._queue.get()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            message = await self.get()
+            if message is None:
+                return
+            yield message
+
+
+class Broadcaster:
+    """
+    Fans out events from a single producer to any number of subscribers.
+
+    The producer is run on a background thread while there are subscribers.
+    Events are formatted once, however many subscribers there are. The latest
+    event of each name is kept and sent to new subscribers when they join.
+
+    :param producer: Function which publishes events to the broadcaster. It
+                     should return once :meth:`wait` returns ``False``.
+    :param float heartbeat_interval: The number of seconds after which to send
+                                     a heartbeat if no events have been sent.
+    :param int max_pending: The maximum number of events queued for a
+                            subscriber before it is dropped.
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[Broadcaster], None],
+        heartbeat_interval: float = 15,
+        max_pending: int = 100,
+    ) -> None:
+        self.producer = producer
+        self.heartbeat_interval = heartbeat_interval
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._subscribers: list[BaseSubscription] = []
+        self._latest: dict[str, bytes] = {}
+        self._last_sent = time.monotonic()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def num_subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def _add(self, factory: Callable[[Iterable[bytes]], TSubscription]) -> TSubscription:
+        with self._lock:
+            subscription = factory(self._latest.values())
+            self._subscribers.append(subscription)
+
+            if self._thread is None:
+                self._start_producer()
+
+        return subscription
+
+    def subscribe(self) -> Subscription:
+        """Add a subscriber, starting the producer if needed."""
+        return self._add(
+            lambda initial: Subscription(self, self.max_pending, initial),
+        )
+
+    def subscribe_async(self, loop: asyncio.AbstractEventLoop) -> AsyncSubscription:
+        """
+        Add a subscriber which consumes events on the given event loop,
+        starting the producer if needed.
+        """
+        return self._add(
+            lambda initial: AsyncSubscription(self, self.max_pending, loop, initial),
+        )
+
+    def unsubscribe(self, subscription: BaseSubscription) -> None:
+        with self._lock:
+            try:
+                self._subscribers.remove(subscription)
+            except ValueError:
+                # Already removed
+                return
+            if not self._subscribers:
+                self.wake()
+
+    def _start_producer(self) -> None:
+        self._thread = threading.Thread(
+            target=self._produce,
+            name='srcomp-events',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _produce(self) -> None:
+        try:
+            self.producer(self)
+        except Exception:
+            logging.exception("Error in event producer")
+        finally:
+            with self._lock:
+                self._thread = None
+                self._latest.clear()
+                # Subscribers may have joined while the producer was stopping
+                if self._subscribers:
+                    self._start_producer()
+
+    def _send(self, message: bytes) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._last_sent = time.monotonic()
+
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def publish(self, name: str, data: str) -> None:
+        """Send an event to all current (and future) subscribers."""
+        message = format_event(name, data)
+        with self._lock:
+            self._latest[name] = message
+        self._send(message)
+
+    def wake(self) -> None:
+        """Cause the producer to return early from :meth:`wait`."""
+        self._wakeup.set()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait for up to the given number of seconds, sending heartbeats as
+        needed. Called by the producer between checks for new events.
+
+        :return: Whether the producer should continue; ``False`` once there
+                 are no subscribers.
+        """
+        if time.monotonic() - self._last_sent >= self.heartbeat_interval:
+            self._send(HEARTBEAT)
+
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+        with self._lock:
+            return bool(self._subscribers)
@@ -0,0 +1,267 @@
+"""
+Loading of compstates in timed phases, including incremental reloading where
+only scores have changed.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+
+from sr.comp import arenas, teams, venue, yaml_loader
+from sr.comp.comp import load_ranker, load_scorer, SRComp
+from sr.comp.http.timing import PhaseTimer
+from sr.comp.matches import MatchSchedule
+from sr.comp.scores import (
+    KnockoutScores,
+    LeagueScores,
+    load_external_scores,
+    load_external_scores_data,
+    results_finder,
+    Scores,
+    TiebreakerScores,
+)
+from sr.comp.types import ScoreData, TLA
+from sr.comp.winners import compute_awards
+
+# Directories within a compstate which contain only score data
+SCORES_DIRS = ('external', 'knockout', 'league', 'tiebreaker')
+
+
+def _git_paths(compstate_path: str, command: str, *args: str) -> list[str]:
+    output = subprocess.check_output(
+        ('git', command, '-z', *args),
+        cwd=compstate_path,
+        stderr=subprocess.DEVNULL,
+    )
+    return [x for x in os.fsdecode(output).split('\0') if x]
+
+
+def changed_paths(compstate_path: str, old_state: str) -> list[str]:
+    """
+    Get the paths in the compstate's working tree which differ from the given
+    revision, including untracked files.
+    """
+    return [
+        *_git_paths(compstate_path, 'diff', '--name-only', old_state, '--'),
+        *_git_paths(compstate_path, 'ls-files', '--others', '--exclude-standard'),
+    ]
+
+
+def only_scores_changed(
+    compstate_path: str,
+    old_state: str,
+    ignore: Iterable[str] = (),
+) -> bool:
+    """
+    Determine whether the only differences between the compstate's working
+    tree and the given revision are to score data.
+
+    :param iterable ignore: Paths to disregard, such as lock files.
+    """
+    try:
+        paths = changed_paths(compstate_path, old_state)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+    ignored = set(ignore)
+    return all(
+        path in ignored or path.split('/', 1)[0] in SCORES_DIRS
+        for path in paths
+    )
+
+
+class ScoreSheetCache:
+    """
+    A cache of parsed score sheets.
+
+    Sheets are identified by their path and are re-parsed only when their
+    size or modification time changes. Each load returns copies of the parsed
+    sheets, as scorers may modify the data they are given.
+    """
+
+    def __init__(self) -> None:
+        self._sheets: dict[Path, tuple[tuple[int, int], ScoreData]] = {}
+
+    def load(self, directory: Path) -> list[ScoreData]:
+        """Load the score sheets in the given directory."""
+        sheets = []
+        for path in results_finder(directory):
+            stat = path.stat()
+            key = (stat.st_mtime_ns, stat.st_size)
+
+            cached = self._sheets.get(path)
+            if cached is not None and cached[0] == key:
+                data = cached[1]
+            else:
+                data = yaml_loader.load(path)
+                self._sheets[path] = (key, data)
+
+            sheets.append(copy.deepcopy(data))
+
+        return sheets
+
+    def clear(self) -> None:
+        self._sheets.clear()
+
+
+def _git_state(root: Path) -> str:
+    return subprocess.check_output(
+        ('git', 'rev-parse', 'HEAD'),
+        text=True,
+        cwd=str(root),
+    ).strip()
+
+
+def _load_scores(
+    root: Path,
+    teams: Iterable[TLA],
+    num_teams_per_arena: int,
+    sheets: ScoreSheetCache,
+    timer: PhaseTimer,
+) -> Scores:
+    """Equivalent to ``Scores.load``, but using cached score sheets."""
+    teams = list(teams)
+
+    with timer.phase('parse'):
+        scorer = load_scorer(root)
+        ranker = load_ranker(root)
+        external_data = list(load_external_scores_data(root / 'external'))
+        league_data = sheets.load(root / 'league')
+        knockout_data = sheets.load(root / 'knockout')
+        tiebreaker_data = sheets.load(root / 'tiebreaker')
+
+    with timer.phase('scoring'):
+        external = load_external_scores(external_data, teams)
+        league = LeagueScores(
+            league_data,
+            teams,
+            scorer,
+            ranker,
+            num_teams_per_arena,
+            extra=external,
+        )
+        knockout = KnockoutScores(
+            knockout_data,
+            teams,
+            scorer,
+            ranker,
+            num_teams_per_arena,
+            league.positions,
+        )
+        tiebreaker = TiebreakerScores(
+            tiebreaker_data,
+            teams,
+            scorer,
+            ranker,
+            num_teams_per_arena,
+            league.positions,
+        )
+        return Scores(league, knockout, tiebreaker)
+
+
+def _load_schedule(comp: SRComp, timer: PhaseTimer) -> None:
+    """Build the schedule and awards, which depend on the scores."""
+    root = comp.root
+
+    # The knockouts are seeded from the league scores, so the schedule must
+    # be rebuilt along with the scores.
+    with timer.phase('schedule'):
+        comp.schedule = MatchSchedule.create(
+            root / 'schedule.yaml',
+            root / 'league.yaml',
+            root / 'knockout.yaml',
+            comp.scores,
+            comp.arenas,
+            comp.num_teams_per_arena,
+            comp.teams,
+        )
+        comp.timezone = comp.schedule.timezone
+
+    with timer.phase('awards'):
+        comp.awards = compute_awards(
+            comp.scores,
+            comp.schedule.final_match,
+            comp.teams,
+            root / 'awards.yaml',
+        )
+
+
+def load_comp(
+    compstate_path: str,
+    sheets: ScoreSheetCache,
+    timer: PhaseTimer | None = None,
+) -> SRComp:
+    """
+    Load a compstate in full, equivalently to constructing an ``SRComp``, but
+    timing each phase of the load and caching the parsed score sheets.
+
+    :param PhaseTimer timer: Optional timer to record the phases of the load.
+    """
+    timer = timer or PhaseTimer()
+    root = Path(compstate_path)
+
+    comp = SRComp.__new__(SRComp)
+    comp.root = root
+
+    with timer.phase('parse'):
+        comp.state = _git_state(root)
+        comp.teams = teams.load_teams(root / 'teams.yaml')
+        comp.arenas = arenas.load_arenas(root / 'arenas.yaml')
+        comp.corners = arenas.load_corners(root / 'arenas.yaml')
+        comp.num_teams_per_arena = len(comp.corners)
+
+    comp.scores = _load_scores(
+        root,
+        comp.teams.keys(),
+        comp.num_teams_per_arena,
+        sheets,
+        timer,
+    )
+    _load_schedule(comp, timer)
+
+    with timer.phase('venue'):
+        comp.venue = venue.Venue(
+            comp.teams.keys(),
+            root / 'layout.yaml',
+            root / 'shepherding.yaml',
+        )
+        comp.venue.check_staging_times(comp.schedule.staging_times)
+
+    return comp
+
+
+def reload_scores(
+    previous: SRComp,
+    sheets: ScoreSheetCache,
+    timer: PhaseTimer | None = None,
+) -> SRComp:
+    """
+    Create a new ``SRComp`` for the same compstate as ``previous``, reloading
+    only the scores and the parts of the competition which depend on them.
+
+    This must only be used when the only changes to the compstate since
+    ``previous`` was loaded are to score data.
+
+    :param PhaseTimer timer: Optional timer to record the phases of the load.
+    """
+    timer = timer or PhaseTimer()
+    root = previous.root
+    logging.info("Reloading scores from %s", root)
+
+    comp = copy.copy(previous)
+    comp.state = _git_state(root)
+    comp.scores = _load_scores(
+        root,
+        comp.teams.keys(),
+        comp.num_teams_per_arena,
+        sheets,
+        timer,
+    )
+    _load_schedule(comp, timer)
+
+    return comp
@@ -2,6 +2,8 @@
 
 import datetime
 import json
+import math
+import re
 from enum import Enum
 from typing import Any
 
@@ -10,10 +12,54 @@ import simplejson
 from flask import g
 from werkzeug.http import http_date
 
-from sr.comp.comp import SRComp
-from sr.comp.http.query_utils import match_json_info
+from sr.comp.http.manager import Snapshot
+from sr.comp.http.query_utils import cached_match_json_infos
 from sr.comp.match_period import Match
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+FAST_ENCODING_AVAILABLE: bool = orjson is not None
+"""Whether orjson is installed, so that :func:`fast_dumps` can be used."""
+
+COMPACT_SEPARATORS = (',', ':')
+
+# The fast encoder formats floats with an exponent (such as 1e16 or 1.5e-9)
+# differently to the standard encoder, and formats some which the standard
+# encoder gives an exponent (such as 1e-05) as decimals (0.00001).
+_EXPONENT = re.compile(rb'e-?[0-9]')
+_SMALL_DECIMAL = b'0.0000'
+
+
+def _default(obj: object) -> Any:
+    if isinstance(obj, Match):
+        snapshot: Snapshot = g.comp_man.get_snapshot()
+        return cached_match_json_infos(snapshot, [obj])[0]
+    elif isinstance(obj, datetime.datetime):
+        return http_date(obj.utctimetuple())
+    elif isinstance(obj, datetime.date):
+        return http_date(obj.timetuple())
+    else:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _has_non_finite(obj: object) -> bool:
+    """Whether an object to be serialised contains any non-finite floats."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    elif isinstance(obj, dict):
+        return any(_has_non_finite(x) for x in obj.values())
+    elif isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(x) for x in obj)
+    elif isinstance(obj, Enum):
+        return _has_non_finite(obj.value)
+    elif isinstance(obj, Match):
+        return _has_non_finite(_default(obj))
+    else:
+        return False
+
 
 class JsonEncoder(simplejson.JSONEncoder):
     """A JSON encoder that deals with various types used in SRComp."""
@@ -32,24 +78,81 @@ class JsonEncoder(simplejson.JSONEncoder):
     def default(self, obj: object) -> Any:
         if isinstance(obj, Enum):
             return obj.value
-        elif isinstance(obj, Match):
-            comp: SRComp = g.comp_man.get_comp()
-            return match_json_info(comp, obj)
-        elif isinstance(obj, datetime.datetime):
-            return http_date(obj.utctimetuple())
-        elif isinstance(obj, datetime.date):
-            return http_date(obj.timetuple())
-        else:
+        try:
+            return _default(obj)
+        except TypeError:
             return super().default(obj)
 
 
+def fast_dumps(obj: object, sort_keys: bool = False, **kwargs: Any) -> str | None:
+    """
+    Serialise an object to compact JSON using orjson, if it is available.
+
+    The output is identical to that of :class:`JsonEncoder`. Where that
+    cannot be guaranteed, for example for options which orjson does not
+    support, types it does not know about or strings containing non-ASCII
+    characters, ``None`` is returned and the caller should use
+    :class:`JsonEncoder` instead.
+
+    The standard encoder writes non-finite floats as ``NaN`` or ``Infinity``
+    while orjson writes them as ``null``, so ``None`` is also returned when
+    the object contains any.
+    """
+    if not FAST_ENCODING_AVAILABLE:
+        return None
+
+    if kwargs != {'separators': COMPACT_SEPARATORS}:
+        return None
+
+    option = (
+        orjson.OPT_NON_STR_KEYS |
+        orjson.OPT_PASSTHROUGH_DATACLASS |
+        orjson.OPT_PASSTHROUGH_DATETIME
+    )
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+
+    try:
+        output: bytes = orjson.dumps(obj, default=_default, option=option)
+    except TypeError:
+        # Includes orjson.JSONEncodeError
+        return None
+
+    # The standard encoder escapes all non-ASCII characters, and DEL
+    if not output.isascii() or b'\x7f' in output:
+        return None
+
+    if _SMALL_DECIMAL in output or _EXPONENT.search(output):
+        return None
+
+    # Non-finite floats are written as null, so only need looking for if
+    # there are any
+    if b'null' in output and _has_non_finite(obj):
+        return None
+
+    return output.decode('ascii')
+
+
 class JsonProvider(flask.json.provider.DefaultJSONProvider):
-    def dumps(self, *args: Any, **kwargs: Any) -> str:
+    fast_encoding = True
+    """
+    Whether to use :func:`fast_dumps` where possible. Has no effect if orjson
+    is not installed.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
         # Don't user super() as that also sets other things we don't want,
         # namely `ensure_ascii` and `default`.
-        kwargs.setdefault('sort_keys', self.sort_keys)
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+
+        if self.fast_encoding:
+            output = fast_dumps(obj, sort_keys, **kwargs)
+            if output is not None:
+                return output
+
         return json.dumps(
-            *args,
+            obj,
             cls=JsonEncoder,  # type: ignore[arg-type]
+            sort_keys=sort_keys,
             **kwargs,
         )
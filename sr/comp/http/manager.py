@@ -2,20 +2,58 @@
 
 from __future__ import annotations
 
+import collections
 import contextlib
 import errno
 import fcntl
+import functools
+import hashlib
+import importlib.metadata
 import logging
+import mmap
 import os
+import pickle
+import stat
+import subprocess
+import tempfile
+import threading
 import time
-from collections.abc import Iterator
-from typing import IO
+from collections.abc import Callable, Hashable, Iterator
+from pathlib import Path
+from typing import Any, cast, IO, TypeVar
+from typing_extensions import TypedDict
 
-from sr.comp.comp import SRComp
+from sr.comp.comp import load_ranker, load_scorer, SRComp
+from sr.comp.http.incremental import (
+    load_comp,
+    only_scores_changed,
+    reload_scores,
+    ScoreSheetCache,
+)
+from sr.comp.http.metrics import CACHE_REQUESTS
+from sr.comp.http.timing import PhaseTimer
+from sr.comp.http.watcher import create_update_watcher, UpdateWatcher
 
 LOCK_FILE = ".update-lock"
 UPDATE_FILE = ".update-pls"
 
+# The number of reloads to keep information about
+RELOAD_HISTORY = 20
+
+T = TypeVar('T')
+
+
+class ReloadInfo(TypedDict):
+    state: str
+    time: float
+    phases: dict[str, float]
+    """The seconds spent in each phase of the load."""
+    derived_phases: dict[str, float]
+    """
+    The seconds spent deriving data from the loaded snapshot, which grow as
+    the snapshot is used.
+    """
+
 
 def update_lock_path(compstate_path: str) -> str:
     return os.path.join(compstate_path, LOCK_FILE)
@@ -66,51 +104,424 @@ def update_lock(compstate_path: str) -> Iterator[None]:
         touch_update_file(compstate_path)
 
 
+def shared_snapshot_path(compstate_path: str, directory: str) -> str:
+    digest = hashlib.sha1(os.fsencode(os.path.abspath(compstate_path))).hexdigest()
+    return os.path.join(directory, f'srcomp-{digest[:16]}.snapshot')
+
+
+class _CompPickler(pickle.Pickler):
+    """
+    Pickler for ``SRComp`` instances.
+
+    The scorer and ranker classes are loaded from the compstate via ``runpy``
+    and so cannot be pickled by reference as normal. Instead they are pickled
+    as instructions to load them again from the compstate.
+    """
+
+    def __init__(self, file: IO[bytes], comp: SRComp) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._root = comp.root
+
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, type) and obj.__module__ == '<run_path>':
+            if obj.__name__ == 'Scorer':
+                return (load_scorer, (self._root,))
+            if obj.__name__ == 'Ranker':
+                return (load_ranker, (self._root,))
+        return NotImplemented
+
+
+@functools.lru_cache
+def _library_versions() -> str:
+    # Part of the key of shared snapshots, as the layout of the pickled
+    # classes may change between versions
+    versions = []
+    for name in ('sr.comp', 'sr.comp.http'):
+        try:
+            version = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            version = 'unknown'
+        versions.append(f'{name}={version}')
+    return ' '.join(versions)
+
+
+def _compstate_revision(compstate_path: str) -> str | None:
+    try:
+        return subprocess.check_output(
+            ('git', 'rev-parse', 'HEAD'),
+            text=True,
+            cwd=compstate_path,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _is_private(stat_result: os.stat_result) -> bool:
+    """
+    Whether a file is owned by the current user and cannot be written by
+    anyone else.
+    """
+    return (
+        stat_result.st_uid == os.geteuid() and
+        not stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _read_shared_snapshot(
+    snapshot_path: str,
+    key: bytes,
+    timer: PhaseTimer,
+) -> SRComp | None:
+    """
+    Load a shared snapshot, if it exists, is private and has the given key.
+
+    Callers should hold at least a shared lock on the snapshot.
+    """
+    try:
+        with open(snapshot_path, 'rb') as f, mmap.mmap(
+            f.fileno(),
+            0,
+            access=mmap.ACCESS_READ,
+        ) as data:
+            if _is_private(os.fstat(f.fileno())) and data.read(len(key)) == key:
+                logging.info("Using shared snapshot %s", snapshot_path)
+                with timer.phase('unpickle'):
+                    return cast(SRComp, pickle.load(data))
+    except (OSError, ValueError, pickle.UnpicklingError):
+        # Missing, empty or otherwise unusable
+        pass
+    return None
+
+
+def load_shared_comp(
+    compstate_path: str,
+    directory: str,
+    load: Callable[[str], SRComp],
+    timer: PhaseTimer | None = None,
+) -> SRComp:
+    """
+    Load a compstate via a snapshot file shared with other processes.
+
+    The first process to load a given version of the compstate stores the
+    loaded ``SRComp`` in a file in the given directory. Other processes then
+    memory map that file and unpickle it rather than loading the compstate
+    again, concurrently with each other as they need only a shared lock on it.
+    Versions are identified by the modification time of the update pls file,
+    the commit of the compstate and the versions of the libraries, so the
+    snapshot is not used if that file does not exist.
+
+    As snapshots are unpickled, the directory must be private to the user
+    running the server. Snapshots are neither used nor stored if it, or a
+    snapshot in it, is writable by any other user.
+
+    Callers should hold at least a shared lock on the compstate.
+
+    :param callable load: Used to load the compstate when needed.
+    :param PhaseTimer timer: Optional timer to record the phases of the load.
+    """
+    timer = timer or PhaseTimer()
+    try:
+        update_time = os.stat(update_pls_path(compstate_path)).st_mtime_ns
+    except FileNotFoundError:
+        return load(compstate_path)
+
+    revision = _compstate_revision(compstate_path)
+    if revision is None:
+        return load(compstate_path)
+
+    if not _is_private(os.stat(directory)):
+        logging.warning(
+            "Not sharing snapshots via %s as it is writable by other users",
+            directory,
+        )
+        return load(compstate_path)
+
+    key = f'{update_time} {revision} {_library_versions()}\n'.encode('ascii')
+    snapshot_path = shared_snapshot_path(compstate_path, directory)
+    lock_path = snapshot_path + '.lock'
+
+    with timer.phase('snapshot_lock_wait'):
+        lock = share_lock(lock_path)
+
+    with lock:
+        comp = _read_shared_snapshot(snapshot_path, key, timer)
+        if comp is not None:
+            return comp
+
+    # Only one process loads a given version; the rest wait for it.
+    with timer.phase('snapshot_lock_wait'):
+        lock = exclusive_lock(lock_path)
+
+    with lock:
+        # Another process may have stored it while we waited for the lock
+        comp = _read_shared_snapshot(snapshot_path, key, timer)
+        if comp is not None:
+            return comp
+
+        comp = load(compstate_path)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.srcomp-')
+        try:
+            with timer.phase('pickle'), open(fd, 'wb') as snapshot_file:
+                snapshot_file.write(key)
+                _CompPickler(snapshot_file, comp).dump(comp)
+            os.replace(tmp_path, snapshot_path)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logging.warning("Unable to share snapshot of %s: %s", compstate_path, e)
+            os.unlink(tmp_path)
+
+        return comp
+
+
+class Snapshot:
+    """
+    A loaded ``SRComp`` instance, along with data derived from it.
+
+    Snapshots are replaced as a whole when the compstate is reloaded, so
+    anything cached on them is discarded along with the old ``SRComp``.
+
+    :param SRComp comp: The loaded competition.
+    """
+
+    def __init__(self, comp: SRComp) -> None:
+        self.comp = comp
+
+        self.timer = PhaseTimer()
+        """
+        Timings of the work done deriving data from the snapshot, such as
+        pre-rendering responses, which happens after it is loaded.
+        """
+
+        self.load_time = time.time()
+        """The time at which the snapshot was loaded."""
+
+        self._cache: dict[Hashable, object] = {}
+
+    def cached(
+        self,
+        cache: str,
+        key: Hashable,
+        factory: Callable[[], T],
+        *,
+        counted: bool = True,
+    ) -> T:
+        """
+        Get a value derived from this snapshot, computing it if needed.
+
+        Concurrent callers may each compute the value, though only one of the
+        values will be kept.
+
+        :param str cache: The name of the kind of value, for metrics.
+        :param key: Identifies the value within the named cache.
+        :param bool counted: Whether to count the request in the cache
+                             metrics. Containers whose entries are counted
+                             by their users should not be counted.
+        """
+        full_key = (cache, key)
+        try:
+            value = self._cache[full_key]
+        except KeyError:
+            pass
+        else:
+            if counted:
+                CACHE_REQUESTS.inc(cache, 'hit')
+            return cast(T, value)
+
+        if counted:
+            CACHE_REQUESTS.inc(cache, 'miss')
+        return cast(T, self._cache.setdefault(full_key, factory()))
+
+
 class SRCompManager:
-    """An ``SRComp`` manager."""
+    """
+    An ``SRComp`` manager.
+
+    By default a change to the compstate is loaded inline by the request which
+    notices it. When ``background_reload`` is enabled the new ``SRComp`` is
+    instead built on a background thread while requests continue to be served
+    from the previous instance, which is swapped out once the load completes.
+
+    In either mode reloads are single-flight: however many requests notice a
+    given change, the compstate is only loaded once. Changes are noticed via
+    an :class:`sr.comp.http.watcher.UpdateWatcher` on the update pls file.
+    """
 
     def __init__(self) -> None:
         self.root_dir = "./"
 
+        self.background_reload = False
+        """Whether to reload changed compstates on a background thread."""
+
+        self.incremental_reload = False
+        """
+        Whether to reload only the scores (and things derived from them) when
+        those are the only parts of the compstate which have changed.
+        """
+
+        self.shared_snapshot_dir: str | None = None
+        """
+        A directory in which to share loaded compstates with other processes,
+        or ``None`` to always load the compstate directly.
+        """
+
         self.update_time: float | None = None
         """The last time we updated our information."""
 
-        self._update_pls_time: float | None = None
-        """The time the update pls file was last modified."""
+        self._watcher: UpdateWatcher | None = None
+        """Watcher for the update pls file."""
+
+        self._watched_dir: str | None = None
+        """The compstate directory which ``_watcher`` is watching."""
+
+        self._snapshot: Snapshot | None = None
+        """Cached snapshot of the competition."""
+
+        self.reloads: collections.deque[ReloadInfo] = collections.deque(
+            maxlen=RELOAD_HISTORY,
+        )
+        """Information about recent reloads, oldest first."""
 
-        self._comp: SRComp | None = None
-        """Cached SRComp instance."""
+        self._reload_listeners: list[Callable[[ReloadInfo], None]] = []
+
+        self._score_sheets = ScoreSheetCache()
+        """Parsed score sheets, for incremental reloads."""
+
+        self._reload_lock = threading.Lock()
+        """Held while checking for and performing a reload."""
+
+        self._reload_thread: threading.Thread | None = None
+        """The thread performing a background reload, if one is running."""
+
+    def _load_comp(self, compstate_path: str, timer: PhaseTimer) -> SRComp:
+        if not self.incremental_reload:
+            with timer.phase('load'):
+                return SRComp(compstate_path)
+
+        previous = self._snapshot
+        if previous is not None and previous.comp.root == Path(compstate_path):
+            with timer.phase('diff'):
+                scores_only = only_scores_changed(
+                    compstate_path,
+                    previous.comp.state,
+                    ignore=(LOCK_FILE, UPDATE_FILE),
+                )
+            if scores_only:
+                return reload_scores(previous.comp, self._score_sheets, timer)
+
+        self._score_sheets.clear()
+        return load_comp(compstate_path, self._score_sheets, timer)
 
     def _load(self) -> None:
+        timer = PhaseTimer()
         lock_path = update_lock_path(self.root_dir)
-        with share_lock(lock_path):
+        with timer.phase('lock_wait'):
+            lock = share_lock(lock_path)
+
+        with lock:
             # Grab a lock & reload
             logging.info("Loading compstate from %s", self.root_dir)
-            self._comp = SRComp(self.root_dir)
-            self.update_time = time.time()
+            if self.shared_snapshot_dir is None:
+                comp = self._load_comp(self.root_dir, timer)
+            else:
+                comp = load_shared_comp(
+                    self.root_dir,
+                    self.shared_snapshot_dir,
+                    functools.partial(self._load_comp, timer=timer),
+                    timer,
+                )
+            snapshot = Snapshot(comp)
 
-    def _state_changed(self) -> bool:
-        update_path = update_pls_path(self.root_dir)
+        # Replace the snapshot in one assignment so that concurrent readers
+        # see either the old snapshot or the new one, never a partial load.
+        self._snapshot = snapshot
+        self.update_time = snapshot.load_time
+
+        logging.info(
+            "Loaded compstate %s in %.3fs (%s)",
+            comp.state,
+            timer.total,
+            timer.describe(),
+        )
+        info: ReloadInfo = {
+            'state': comp.state,
+            'time': snapshot.load_time,
+            'phases': dict(timer.phases),
+            'derived_phases': snapshot.timer.phases,
+        }
+        self.reloads.append(info)
+
+        for listener in self._reload_listeners:
+            try:
+                listener(info)
+            except Exception:
+                logging.exception("Error in reload listener %r", listener)
+
+    def add_reload_listener(self, listener: Callable[[ReloadInfo], None]) -> None:
+        """
+        Register a function to be called after each load of the compstate.
+
+        Listeners are called on the thread which performed the load.
+        """
+        self._reload_listeners.append(listener)
+
+    def _background_load(self) -> None:
         try:
-            new_time = os.path.getmtime(update_path)
-        except OSError:
-            # It doesn't exist. That's fine -- use a value which won't ever
-            # happen so that we load at least the first time through
-            new_time = -1
-
-        if new_time != self._update_pls_time:
-            self._update_pls_time = new_time
+            self._load()
+        except Exception:
+            # Keep serving the old instance until the next update
+            logging.exception("Failed to load compstate from %s", self.root_dir)
+        finally:
+            self._reload_thread = None
+
+    def _start_background_load(self) -> None:
+        thread = threading.Thread(
+            target=self._background_load,
+            name='srcomp-reload',
+            daemon=True,
+        )
+        self._reload_thread = thread
+        thread.start()
+
+    def _watch(self) -> None:
+        if self._watcher is not None:
+            self._watcher.close()
+        self._watcher = create_update_watcher(update_pls_path(self.root_dir))
+        self._watched_dir = self.root_dir
+
+    def _state_changed(self) -> bool:
+        if self._watched_dir != self.root_dir:
+            # Either the first check or a different compstate
+            self._watch()
             return True
 
-        return False
+        assert self._watcher is not None
+        return self._watcher.changed()
 
-    def get_comp(self) -> SRComp:
-        if self.update_time is None:
-            self._load()
+    def get_snapshot(self) -> Snapshot:
+        if self._snapshot is None:
+            with self._reload_lock:
+                # Another thread may have completed the first load while we
+                # were waiting for the lock.
+                if self._snapshot is None:
+                    self._state_changed()
+                    self._load()
 
-        elif time.time() - self.update_time > 5 and self._state_changed():
-            # data is more than 5 seconds old and the state has changed, reload
-            self._load()
+        elif self.background_reload:
+            if self._reload_thread is None and self._reload_lock.acquire(blocking=False):
+                try:
+                    if self._reload_thread is None and self._state_changed():
+                        self._start_background_load()
+                finally:
+                    self._reload_lock.release()
+
+        else:
+            with self._reload_lock:
+                if self._state_changed():
+                    self._load()
+
+        assert self._snapshot is not None
+        return self._snapshot
 
-        assert self._comp is not None
-        return self._comp
+    def get_comp(self) -> SRComp:
+        return self.get_snapshot().comp
@@ -0,0 +1,60 @@
+"""Tracking of changes to the matches between revisions of the compstate."""
+
+from __future__ import annotations
+
+import collections
+import threading
+
+from sr.comp.types import ArenaName, MatchNumber
+
+MatchKey = tuple[ArenaName, MatchNumber]
+
+MatchDigests = dict[MatchKey, bytes]
+"""Mapping of matches, in schedule order, to digests of their information."""
+
+
+def diff_matches(
+    old: MatchDigests,
+    new: MatchDigests,
+) -> tuple[list[MatchKey], list[MatchKey]]:
+    """
+    Compare the digests of the matches at two revisions.
+
+    :return: The matches which were added or changed, in the order of the new
+             digests, and the matches which were removed.
+    """
+    changed = [key for key, digest in new.items() if old.get(key) != digest]
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+class MatchHistory:
+    """
+    A bounded record of the digests of the matches at recent revisions of the
+    compstate, discarding the least recently used revisions once full.
+
+    The history is kept in memory, so each worker process has its own and
+    knows only the revisions which it has served.
+
+    :param int max_revisions: The maximum number of revisions to keep.
+    """
+
+    def __init__(self, max_revisions: int) -> None:
+        self.max_revisions = max_revisions
+        self._lock = threading.Lock()
+        self._digests: collections.OrderedDict[str, MatchDigests]
+        self._digests = collections.OrderedDict()
+
+    def get(self, state: str) -> MatchDigests | None:
+        with self._lock:
+            digests = self._digests.get(state)
+            if digests is not None:
+                self._digests.move_to_end(state)
+            return digests
+
+    def add(self, state: str, digests: MatchDigests) -> None:
+        with self._lock:
+            self._digests[state] = digests
+            self._digests.move_to_end(state)
+            while len(self._digests) > self.max_revisions:
+                self._digests.popitem(last=False)
@@ -0,0 +1,292 @@
+"""Indexes for efficiently querying the matches in a competition."""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import heapq
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import Any, Generic
+
+from sr.comp.comp import SRComp
+from sr.comp.http.query_utils import TParseable
+from sr.comp.match_period import Match
+from sr.comp.types import ArenaName, MatchNumber
+
+Bounds = tuple[Any, Any]
+"""Inclusive lower and upper bounds, either of which may be ``None``."""
+
+
+class SortedIndex(Generic[TParseable]):
+    """
+    An index of positions by a sortable key, supporting range queries.
+
+    :param entries: Pairs of a key and the position it occurs at.
+    """
+
+    def __init__(self, entries: Iterable[tuple[TParseable, int]]) -> None:
+        ordered = sorted(entries, key=lambda x: x[0])
+        self._keys: list[TParseable] = [key for key, _ in ordered]
+        self._positions = [position for _, position in ordered]
+
+    def between(
+        self,
+        lower: TParseable | None,
+        upper: TParseable | None,
+    ) -> list[int]:
+        """
+        Get the positions whose keys are within the given inclusive bounds.
+        """
+        start = 0 if lower is None else bisect.bisect_left(self._keys, lower)
+        end = (
+            len(self._keys)
+            if upper is None
+            else bisect.bisect_right(self._keys, upper)
+        )
+        return self._positions[start:end]
+
+
+RESOLUTION = datetime.timedelta(microseconds=1)
+"""The smallest difference between two instants."""
+
+
+class IntervalIndex:
+    """
+    An index of positions by intervals of time, supporting finding those
+    intervals which contain a given instant.
+
+    Intervals are kept sorted by their start, so lookups take time
+    proportional to the logarithm of the number of intervals plus the number
+    of intervals which start within the length of the longest interval before
+    the instant. This is efficient where, as for the matches in a
+    competition, intervals are of similar lengths.
+
+    :param entries: Tuples of the start and end of an interval and the
+                    position it occurs at.
+    :param bool inclusive_end: Whether intervals include their end.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[tuple[datetime.datetime, datetime.datetime, int]],
+        inclusive_end: bool = True,
+    ) -> None:
+        ordered = sorted(entries, key=lambda x: x[0])
+        self._starts = [start for start, _, _ in ordered]
+        self._ends = [end for _, end, _ in ordered]
+        self._positions = [position for _, _, position in ordered]
+        self._max_length = max(
+            (end - start for start, end, _ in ordered),
+            default=datetime.timedelta(0),
+        )
+        self.inclusive_end = inclusive_end
+
+    def boundaries(self) -> Iterator[datetime.datetime]:
+        """
+        Yield the instants at which the intervals which contain an instant
+        may change.
+        """
+        yield from self._starts
+        for end in self._ends:
+            # Inclusive intervals change just after their end
+            yield end + RESOLUTION if self.inclusive_end else end
+
+    def containing(self, when: datetime.datetime) -> list[int]:
+        """
+        Get the positions whose intervals contain the given instant, in
+        ascending order.
+        """
+        first = bisect.bisect_left(self._starts, when - self._max_length)
+        last = bisect.bisect_right(self._starts, when)
+        return sorted(
+            self._positions[index]
+            for index in range(first, last)
+            if (
+                when <= self._ends[index]
+                if self.inclusive_end
+                else when < self._ends[index]
+            )
+        )
+
+
+class MatchIndex:
+    """
+    Indexes of the matches in a competition.
+
+    Matches are identified by their position in the schedule, ordered by
+    slot and then by arena, which is also the order they are returned in.
+
+    :param SRComp comp: The competition whose matches to index.
+    """
+
+    def __init__(self, comp: SRComp) -> None:
+        self.matches: list[Match] = [
+            match
+            for slots in comp.schedule.matches
+            for match in slots.values()
+        ]
+
+        self._positions: dict[tuple[ArenaName, MatchNumber], int] = {
+            (match.arena, match.num): position
+            for position, match in enumerate(self.matches)
+        }
+
+        match_slot_lengths = comp.schedule.match_slot_lengths
+        game_start: datetime.timedelta = match_slot_lengths['pre']
+        game_end: datetime.timedelta = game_start + match_slot_lengths['match']
+
+        def index(key: Callable[[Match], Any]) -> SortedIndex[Any]:
+            return SortedIndex(
+                (key(match), position)
+                for position, match in enumerate(self.matches)
+            )
+
+        self.indexes: dict[str, SortedIndex[Any]] = {
+            'num': index(lambda x: x.num),
+            'arena': index(lambda x: x.arena),
+            'type': index(lambda x: x.type.value),
+            'game_start_time': index(lambda x: x.start_time + game_start),
+            'game_end_time': index(lambda x: x.start_time + game_end),
+            'slot_start_time': index(lambda x: x.start_time),
+            'slot_end_time': index(lambda x: x.end_time),
+            'team': SortedIndex(
+                (tla, position)
+                for position, match in enumerate(self.matches)
+                for tla in set(match.teams)
+                if tla is not None
+            ),
+        }
+        """
+        Mapping of the names of the criteria which can be queried to the
+        indexes which answer them.
+        """
+
+        self.slots = IntervalIndex(
+            (
+                (match.start_time, match.end_time, position)
+                for position, match in enumerate(self.matches)
+            ),
+            inclusive_end=False,
+        )
+        """Index of the times during which each match's slot is running."""
+
+        staging = []
+        shepherding = []
+        for position, match in enumerate(self.matches):
+            staging_times = comp.schedule.get_staging_times(match)
+            closes = staging_times['closes']
+            staging.append((staging_times['opens'], closes, position))
+
+            signal_shepherds = staging_times['signal_shepherds']
+            if signal_shepherds:
+                first_signal = min(signal_shepherds.values())
+                shepherding.append((first_signal, closes, position))
+
+        self.staging = IntervalIndex(staging)
+        """Index of the times during which each match is staging."""
+
+        self.shepherding = IntervalIndex(shepherding)
+        """
+        Index of the times during which the teams for each match are being
+        shepherded to staging.
+        """
+
+        transitions = {
+            *self.slots.boundaries(),
+            *self.staging.boundaries(),
+            *self.shepherding.boundaries(),
+            *(delay.time for delay in comp.schedule.delays),
+        }
+        for period in comp.schedule.match_periods:
+            transitions.add(period.start_time)
+            transitions.add(period.max_end_time)
+
+        self.transitions = sorted(transitions)
+        """
+        The instants at which the current, staging or shepherding matches or
+        the current delay may change.
+        """
+
+    def at(self, index: IntervalIndex, when: datetime.datetime) -> list[Match]:
+        """
+        Get the matches whose intervals in the given index contain the given
+        instant, in schedule order.
+        """
+        return [self.matches[position] for position in index.containing(when)]
+
+    def window(self, when: datetime.datetime) -> tuple[int, datetime.datetime | None]:
+        """
+        Find the window between transitions which contains the given instant.
+
+        :return: A number identifying the window and the time of the next
+                 transition, if any.
+        """
+        window = bisect.bisect_right(self.transitions, when)
+        if window < len(self.transitions):
+            return window, self.transitions[window]
+        return window, None
+
+    def positions(self, name: str, bounds: Iterable[Bounds]) -> set[int]:
+        """
+        Get the positions of the matches which are within any of the given
+        bounds for the named criterion.
+        """
+        index = self.indexes[name]
+        return {
+            position
+            for lower, upper in bounds
+            for position in index.between(lower, upper)
+        }
+
+    def position(self, arena: ArenaName, num: MatchNumber) -> int:
+        """Get the position of the given match."""
+        return self._positions[arena, num]
+
+    def start_after(self, arena: ArenaName, num: MatchNumber) -> int:
+        """
+        Get the position just after the given match.
+
+        Should the match not exist (for example as the schedule has changed
+        since the position was requested), this is the position of the first
+        match with a greater number.
+        """
+        try:
+            return self._positions[arena, num] + 1
+        except KeyError:
+            positions = self.indexes['num'].between(num + 1, None)
+            return min(positions, default=len(self.matches))
+
+    def select(
+        self,
+        criteria: Mapping[str, Iterable[Bounds]],
+        start: int = 0,
+        limit: int | None = None,
+    ) -> list[Match]:
+        """
+        Get the matches which meet all of the given criteria, in schedule
+        order.
+
+        :param criteria: Mapping of names of criteria to bounds within which
+                         the matches must be. A match need only be within one
+                         of the bounds for each criterion.
+        :param int start: The position from which to select matches.
+        :param int limit: The maximum number of matches to select.
+        """
+        selected: set[int] | None = None
+        for name, bounds in criteria.items():
+            positions = self.positions(name, bounds)
+            selected = positions if selected is None else selected & positions
+            if not selected:
+                return []
+
+        if selected is None:
+            end = None if limit is None else start + limit
+            return self.matches[start:end]
+
+        candidates = (x for x in selected if x >= start)
+        ordered = (
+            sorted(candidates)
+            if limit is None
+            else heapq.nsmallest(limit, candidates)
+        )
+        return [self.matches[position] for position in ordered]
@@ -0,0 +1,248 @@
+"""
+Lightweight metrics, exposed in the Prometheus text format.
+
+Recording a value takes a lock and updates a few numbers, so is cheap enough
+to leave enabled in production.
+"""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import math
+import threading
+from collections.abc import Callable, Iterable, Iterator, Sequence
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class Metric(abc.ABC):
+    """Base class for metrics."""
+
+    type_name = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check_labels(self, labels: LabelValues) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"Expected {len(self.labelnames)} label values for {self.name}, "
+                f"got {len(labels)}",
+            )
+
+    @abc.abstractmethod
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        """
+        Yield tuples of (suffix, label names, label values, value) for each of
+        the samples of this metric.
+        """
+
+    def exposition(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.type_name}'
+        for suffix, names, values, value in self.samples():
+            labels = _format_labels(names, values)
+            yield f'{self.name}{suffix}{labels} {_format_value(value)}'
+
+
+class Counter(Metric):
+    """A value which only ever increases."""
+
+    type_name = 'counter'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._check_labels(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield '', self.labelnames, labels, value
+
+
+class _HistogramValues:
+    __slots__ = ('counts', 'total')
+
+    def __init__(self, num_buckets: int) -> None:
+        self.counts = [0] * num_buckets
+        self.total: float = 0
+
+
+class Histogram(Metric):
+    """A distribution of observed values, counted in buckets."""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[LabelValues, _HistogramValues] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        self._check_labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            try:
+                values = self._values[labels]
+            except KeyError:
+                # Note: the final bucket is for values above all the bounds
+                values = self._values[labels] = _HistogramValues(len(self.buckets) + 1)
+            values.counts[index] += 1
+            values.total += value
+
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        with self._lock:
+            values = sorted(
+                (labels, (list(x.counts), x.total))
+                for labels, x in self._values.items()
+            )
+
+        bucket_labelnames = (*self.labelnames, 'le')
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield (
+                    '_bucket',
+                    bucket_labelnames,
+                    (*labels, _format_value(bound)),
+                    cumulative,
+                )
+            yield '_sum', self.labelnames, labels, total
+            yield '_count', self.labelnames, labels, cumulative
+
+
+class Gauge(Metric):
+    """A value which is computed when the metrics are collected."""
+
+    type_name = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Callable[[], float | None],
+    ) -> None:
+        super().__init__(name, documentation)
+        self._function = function
+
+    def samples(self) -> Iterable[tuple[str, Sequence[str], Sequence[str], float]]:
+        value = self._function()
+        if value is not None:
+            yield '', (), (), value
+
+
+class Registry:
+    """A collection of metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> Counter:
+        counter = Counter(name, documentation, labelnames)
+        self.register(counter)
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, buckets, labelnames)
+        self.register(histogram)
+        return histogram
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        function: Callable[[], float | None],
+    ) -> Gauge:
+        gauge = Gauge(name, documentation, function)
+        self.register(gauge)
+        return gauge
+
+    def exposition(self) -> str:
+        """Render all the metrics in the Prometheus text format."""
+        lines = [
+            line
+            for metric in self._metrics
+            for line in metric.exposition()
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+"""The registry of metrics exposed by the server."""
+
+CACHE_REQUESTS = REGISTRY.counter(
+    'srcomp_http_cache_requests_total',
+    "Lookups in the server's caches.",
+    ('cache', 'result'),
+)
@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import datetime
-from collections.abc import Mapping
-from typing import Callable, overload, TypeVar, Union
+from collections.abc import Iterable, Mapping
+from typing import Any, Callable, overload, TypeVar, Union
 from typing_extensions import NotRequired, TypedDict
 
 from league_ranker import LeaguePoints, RankedPosition
 
 from sr.comp.comp import SRComp
+from sr.comp.http.manager import Snapshot
+from sr.comp.http.metrics import CACHE_REQUESTS
 from sr.comp.match_period import Match, MatchType
 from sr.comp.types import ArenaName, GamePoints, MatchNumber, ShepherdName, TLA
 
@@ -60,6 +62,12 @@ class MatchInfo(TypedDict):
 
 TParseable = TypeVar('TParseable', int, str, datetime.datetime)
 
+FieldSelection = dict[str, Union['FieldSelection', None]]
+"""
+Nested mapping of the keys selected from an object. A key which maps to
+``None`` selects the whole of its value.
+"""
+
 
 def match_json_info(comp: SRComp, match: Match) -> MatchInfo:
     """
@@ -133,29 +141,59 @@ def match_json_info(comp: SRComp, match: Match) -> MatchInfo:
     return info
 
 
+def cached_match_json_infos(
+    snapshot: Snapshot,
+    matches: Iterable[Match],
+) -> list[MatchInfo]:
+    """
+    Get match JSON information for some matches, as from
+    :func:`match_json_info`, caching the results within the given snapshot.
+
+    Each call is counted as a single cache request, which is a miss if the
+    information for any of the matches had to be computed.
+
+    The returned values are shared between requests and must not be modified.
+    """
+    infos: dict[tuple[ArenaName, MatchNumber], MatchInfo]
+    infos = snapshot.cached('match_info', None, dict, counted=False)
+
+    result = []
+    missed = False
+    for match in matches:
+        key = (match.arena, match.num)
+        info = infos.get(key)
+        if info is None:
+            missed = True
+            info = infos.setdefault(key, match_json_info(snapshot.comp, match))
+        result.append(info)
+
+    CACHE_REQUESTS.inc('match_info', 'miss' if missed else 'hit')
+    return result
+
+
 @overload
-def parse_difference_string(
+def parse_difference_bounds(
     string: str,
     type_converter: Callable[[str], TParseable],
-) -> Callable[[TParseable], bool]:
+) -> tuple[TParseable | None, TParseable | None]:
     ...
 
 
 @overload
-def parse_difference_string(
+def parse_difference_bounds(
     string: str,
     type_converter: Callable[[str], int] = int,
-) -> Callable[[int], bool]:
+) -> tuple[int | None, int | None]:
     ...
 
 
-def parse_difference_string(
+def parse_difference_bounds(
     string: str,
     type_converter: Callable[[str], TParseable] = int,  # type: ignore[assignment]
-) -> Callable[[TParseable], bool]:
+) -> tuple[TParseable | None, TParseable | None]:
     """
-    Parse a difference string (x..x, ..x, x.., x) and return a function that
-    accepts a single argument and returns ``True`` if it is in the difference.
+    Parse a difference string (x..x, ..x, x.., x) into a tuple of inclusive
+    lower and upper bounds. Bounds which are not specified are ``None``.
     """
     separator = '..'
     if string == separator:
@@ -166,19 +204,101 @@ def parse_difference_string(
         raise ValueError('Argument is not a different string.')
     elif len(tokens) == 1:
         converted_token = type_converter(tokens[0])
-        return lambda x: x == converted_token
+        return converted_token, converted_token
     elif len(tokens) == 2:
         if not tokens[1]:
-            lower_bound = type_converter(tokens[0])
-            return lambda x: x >= lower_bound
+            return type_converter(tokens[0]), None
         elif not tokens[0]:
-            upper_bound = type_converter(tokens[1])
-            return lambda x: x <= upper_bound
+            return None, type_converter(tokens[1])
         else:
             lhs = type_converter(tokens[0])
             rhs = type_converter(tokens[1])
             if lhs > rhs:
                 raise ValueError('Bounds are the wrong way around.')
-            return lambda x: lhs <= x <= rhs
+            return lhs, rhs
     else:
         raise AssertionError('Argument contains unknown input.')
+
+
+@overload
+def parse_difference_string(
+    string: str,
+    type_converter: Callable[[str], TParseable],
+) -> Callable[[TParseable], bool]:
+    ...
+
+
+@overload
+def parse_difference_string(
+    string: str,
+    type_converter: Callable[[str], int] = int,
+) -> Callable[[int], bool]:
+    ...
+
+
+def parse_difference_string(
+    string: str,
+    type_converter: Callable[[str], TParseable] = int,  # type: ignore[assignment]
+) -> Callable[[TParseable], bool]:
+    """
+    Parse a difference string (x..x, ..x, x.., x) and return a function that
+    accepts a single argument and returns ``True`` if it is in the difference.
+    """
+    lower_bound, upper_bound = parse_difference_bounds(string, type_converter)
+
+    if lower_bound is None:
+        assert upper_bound is not None
+        return lambda x: x <= upper_bound
+    elif upper_bound is None:
+        return lambda x: x >= lower_bound
+    elif lower_bound is upper_bound:
+        # An exact value
+        return lambda x: x == lower_bound
+    else:
+        return lambda x: lower_bound <= x <= upper_bound
+
+
+def parse_fields(string: str) -> FieldSelection:
+    """
+    Parse a comma separated list of dotted paths (such as ``num,times.slot``)
+    into the selection of the fields they name.
+    """
+    selection: FieldSelection = {}
+    for path in string.split(','):
+        keys = path.split('.')
+        if not all(keys):
+            raise ValueError(f'Invalid field {path!r}.')
+
+        node: FieldSelection | None = selection
+        for key in keys[:-1]:
+            assert node is not None
+            if key in node and node[key] is None:
+                # The whole of this value is already selected
+                node = None
+                break
+            node = node.setdefault(key, {})
+
+        if node is not None:
+            node[keys[-1]] = None
+
+    return selection
+
+
+def select_fields(value: Any, selection: FieldSelection) -> Any:
+    """
+    Select the given fields from a value, or from each of the items in a list
+    of values.
+
+    Fields which are not present are omitted. The value is not modified; the
+    selected parts are copied into new containers.
+    """
+    if isinstance(value, Mapping):
+        return {
+            key: value[key] if nested is None else select_fields(value[key], nested)
+            for key, nested in selection.items()
+            if key in value
+        }
+    elif isinstance(value, list):
+        return [select_fields(x, selection) for x in value]
+    else:
+        return value
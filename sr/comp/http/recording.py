@@ -0,0 +1,93 @@
+"""Recording of the requests handled by the server, for later replay."""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Iterator
+from typing import IO, NamedTuple
+
+
+class RecordedRequest(NamedTuple):
+    time: float
+    """The time at which the request arrived, as a Unix timestamp."""
+    interval: float | None
+    """
+    The time since the previous request recorded by the same process, or
+    ``None`` for its first request.
+    """
+    method: str
+    path: str
+    query: str
+    """The raw query string, without the leading ``?``."""
+    accept_encoding: str | None
+    route: str
+    """The URL rule which handled the request."""
+    status: int
+    duration: float
+    """The time taken to handle the request, in seconds."""
+
+
+class RequestRecorder:
+    """
+    Records requests to a file, as lines of JSON.
+
+    The file is appended to, so may be shared by several processes. Since
+    lines are written whole, the records from each process remain intact.
+
+    :param str path: The file to record requests to.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = None
+        self._last_arrival: float | None = None
+
+    def record(
+        self,
+        arrival: float,
+        method: str,
+        path: str,
+        query: str,
+        accept_encoding: str | None,
+        route: str,
+        status: int,
+        duration: float,
+    ) -> None:
+        with self._lock:
+            interval = None
+            if self._last_arrival is not None:
+                interval = max(arrival - self._last_arrival, 0)
+            self._last_arrival = arrival
+
+            entry = RecordedRequest(
+                time=arrival,
+                interval=interval,
+                method=method,
+                path=path,
+                query=query,
+                accept_encoding=accept_encoding,
+                route=route,
+                status=status,
+                duration=duration,
+            )
+
+            if self._file is None:
+                # Line buffered so that each record is written in one go
+                self._file = open(self.path, 'a', buffering=1)
+            self._file.write(json.dumps(entry._asdict(), separators=(',', ':')) + '\n')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_recording(path: str) -> Iterator[RecordedRequest]:
+    """Read the requests from a recording, in the order they were written."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield RecordedRequest(**json.loads(line))
@@ -0,0 +1,94 @@
+"""A cache of whole responses, shared between identical requests."""
+
+from __future__ import annotations
+
+import collections
+import threading
+from collections.abc import Hashable
+from typing import NamedTuple
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
+class ResponseCache:
+    """
+    A cache of responses bounded by the total size of their bodies,
+    discarding the least recently used responses once full.
+
+    Lookups are single-flight: when several callers miss on the same key at
+    once, only the first is asked to compute the response. The others wait
+    for it to be added to the cache (or abandoned) before trying again.
+
+    :param int max_bytes: The maximum total size of the cached bodies.
+    :param float wait_timeout: The maximum number of seconds to wait for
+                               another caller to compute a response.
+    """
+
+    def __init__(self, max_bytes: int, wait_timeout: float = 10) -> None:
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+        self.size = 0
+        """The total size of the cached bodies."""
+
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[Hashable, CachedResponse]
+        self._entries = collections.OrderedDict()
+        self._pending: dict[Hashable, threading.Event] = {}
+
+    def lookup(self, key: Hashable) -> tuple[CachedResponse | None, bool]:
+        """
+        Get a cached response, waiting if another caller is computing it.
+
+        :return: The cached response, if any, and whether the caller should
+                 compute the response and then call either :meth:`add` or
+                 :meth:`abandon` with the key.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry, False
+
+                event = self._pending.get(key)
+                if event is None:
+                    self._pending[key] = threading.Event()
+                    return None, True
+
+            if not event.wait(self.wait_timeout):
+                # Compute the response without waiting any longer, but leave
+                # adding it to the cache to the original caller
+                return None, False
+
+    def add(self, key: Hashable, entry: CachedResponse) -> None:
+        """Add a response to the cache, releasing any callers waiting for it."""
+        with self._lock:
+            if len(entry.body) <= self.max_bytes:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self.size -= len(previous.body)
+                self._entries[key] = entry
+                self.size += len(entry.body)
+
+                while self.size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.size -= len(evicted.body)
+
+            self._release(key)
+
+    def abandon(self, key: Hashable) -> None:
+        """
+        Release any callers waiting for a response which will not be added to
+        the cache. One of them will be asked to compute it instead.
+        """
+        with self._lock:
+            self._release(key)
+
+    def _release(self, key: Hashable) -> None:
+        event = self._pending.pop(key, None)
+        if event is not None:
+            event.set()
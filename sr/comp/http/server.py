@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 import datetime
+import functools
+import hashlib
 import importlib.metadata
+import logging
+import operator
 import os.path
+import time
+from collections.abc import Callable, Hashable, Iterator
 from typing import Any, Union
 
 import dateutil.parser
@@ -22,35 +28,381 @@ from flask import (
 from sr.comp.arenas import Arena, Corner, CornerNumber
 from sr.comp.comp import SRComp
 from sr.comp.http import errors
+from sr.comp.http.compression import (
+    choose_encoding,
+    compress,
+    CompressedBodies,
+    ENCODINGS,
+    MIN_SIZE,
+)
+from sr.comp.http.events import Broadcaster
 from sr.comp.http.json_provider import JsonProvider
-from sr.comp.http.manager import SRCompManager
-from sr.comp.http.query_utils import match_json_info, parse_difference_string
+from sr.comp.http.manager import ReloadInfo, Snapshot, SRCompManager
+from sr.comp.http.match_history import diff_matches, MatchDigests, MatchHistory
+from sr.comp.http.match_index import Bounds, MatchIndex
+from sr.comp.http.metrics import (
+    CACHE_REQUESTS,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    LATENCY_BUCKETS,
+    REGISTRY,
+    SIZE_BUCKETS,
+)
+from sr.comp.http.query_utils import (
+    cached_match_json_infos,
+    FieldSelection,
+    parse_difference_bounds,
+    parse_fields,
+    select_fields,
+)
+from sr.comp.http.recording import RequestRecorder
+from sr.comp.http.response_cache import CachedResponse, ResponseCache
+from sr.comp.http.team_images import TeamImages, VARIANT_SIZES
 from sr.comp.match_period import MatchPeriod, MatchType
 from sr.comp.teams import Team
 from sr.comp.types import ArenaName, MatchNumber, Region, RegionName, TLA
 
-from .query_utils import MatchInfo
-
 app = Flask('sr.comp.http')
 app.json = JsonProvider(app)
 
 comp_man = SRCompManager()
 
+# The maximum number of compressed response bodies kept for each snapshot
+COMPRESSED_BODIES = 1000
 
-@app.before_request
-def before_request() -> None:
+# The number of revisions of the compstate for which changes to the matches
+# can be requested
+MATCH_HISTORY_REVISIONS = 50
+
+match_history = MatchHistory(MATCH_HISTORY_REVISIONS)
+
+# The most recently built manifest of the teams' images, from which the next
+# reuses the digests of unchanged images
+_last_team_images: TeamImages | None = None
+
+# The default maximum total size, in bytes, of the response bodies cached for
+# each snapshot. Overridden by the ``RESPONSE_CACHE_MAX_BYTES`` config key.
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+REQUESTS = REGISTRY.counter(
+    'srcomp_http_requests_total',
+    "Requests handled, by route and status code.",
+    ('route', 'status'),
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    'srcomp_http_request_duration_seconds',
+    "Time spent handling requests, by route.",
+    LATENCY_BUCKETS,
+    ('route',),
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    'srcomp_http_response_size_bytes',
+    "Size of response bodies, by route.",
+    SIZE_BUCKETS,
+    ('route',),
+)
+RELOADS = REGISTRY.counter(
+    'srcomp_http_reloads_total',
+    "Loads of the compstate.",
+)
+RELOAD_DURATION = REGISTRY.histogram(
+    'srcomp_http_reload_duration_seconds',
+    "Time spent loading the compstate.",
+    LATENCY_BUCKETS,
+)
+REGISTRY.gauge(
+    'srcomp_http_snapshot_age_seconds',
+    "Time since the current compstate was loaded.",
+    lambda: None if comp_man.update_time is None else time.time() - comp_man.update_time,
+)
+
+
+def _record_reload(info: ReloadInfo) -> None:
+    RELOADS.inc()
+    RELOAD_DURATION.observe(sum(info['phases'].values()))
+
+
+comp_man.add_reload_listener(_record_reload)
+
+# Endpoints whose responses depend on more than the compstate revision and the
+# request. Responses from all other endpoints are given ETags.
+UNCACHEABLE_ENDPOINTS = frozenset({
+    'current_state',
+    'reloads',
+    'metrics',
+    'stream',
+    # Team images have their own validators, derived from the image
+    'get_team_image',
+    # May include any of the above
+    'batch',
+})
+
+
+@functools.lru_cache
+def _compstate_path(path: str) -> str:
+    # Cached to avoid filesystem access on every request
+    return os.path.realpath(path)
+
+
+@functools.lru_cache
+def _request_recorder(path: str) -> RequestRecorder:
+    return RequestRecorder(path)
+
+
+def _response_etag() -> str | None:
+    if (
+        request.method not in ('GET', 'HEAD') or
+        request.endpoint is None or
+        request.endpoint in UNCACHEABLE_ENDPOINTS
+    ):
+        return None
+
+    comp: SRComp = g.comp_man.get_comp()
+    # URLs in the body are relative to the script root
+    key = f'{comp.state}:{request.script_root}{request.full_path}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _response_cache_key() -> Hashable | None:
+    if (
+        request.method != 'GET' or
+        request.endpoint is None or
+        request.endpoint in UNCACHEABLE_ENDPOINTS
+    ):
+        return None
+
+    # Sorted by name only, as some views use just the first of several values
+    args = sorted(request.args.items(multi=True), key=operator.itemgetter(0))
+    # URLs in the body are relative to the script root
+    return (request.script_root, request.path, tuple(args))
+
+
+def _response_cache(snapshot: Snapshot) -> ResponseCache | None:
+    """
+    Get the cache of responses for a snapshot. As the cache belongs to the
+    snapshot, it is discarded along with it when the compstate is reloaded.
+    """
+    max_bytes = app.config.get('RESPONSE_CACHE_MAX_BYTES', RESPONSE_CACHE_MAX_BYTES)
+    if not max_bytes:
+        return None
+    return snapshot.cached(
+        'response_cache',
+        None,
+        lambda: ResponseCache(max_bytes),
+        counted=False,
+    )
+
+
+def _lookup_response(key: Hashable) -> tuple[ResponseCache | None, Response | None]:
+    """
+    Look up a response in the current snapshot's cache, waiting for it if
+    another request is already rendering it.
+
+    :return: The cache to add the response to once rendered, if the caller
+             should do so, and the cached response, if any.
+    """
+    cache = _response_cache(g.comp_man.get_snapshot())
+    if cache is None:
+        return None, None
+
+    entry, should_add = cache.lookup(key)
+    if entry is None:
+        CACHE_REQUESTS.inc('response', 'miss')
+        return (cache if should_add else None), None
+
+    CACHE_REQUESTS.inc('response', 'hit')
+    resp = app.response_class(entry.body, status=entry.status, headers=entry.headers)
+    return None, resp
+
+
+def _store_response(cache: ResponseCache, key: Hashable, resp: Response) -> None:
+    """Add a rendered response to the cache, if it is suitable."""
+    if resp.status_code != 200 or resp.is_streamed or resp.direct_passthrough:
+        cache.abandon(key)
+        return
+
+    cache.add(key, CachedResponse(
+        status=resp.status_code,
+        headers=resp.headers.to_wsgi_list(),
+        body=resp.get_data(),
+    ))
+
+
+def configure_manager() -> SRCompManager:
+    """Apply the app's configuration to the compstate manager."""
     if "COMPSTATE" in app.config:
-        comp_man.root_dir = os.path.realpath(app.config["COMPSTATE"])
-    g.comp_man = comp_man
+        comp_man.root_dir = _compstate_path(app.config["COMPSTATE"])
+    comp_man.background_reload = app.config.get("COMPSTATE_BACKGROUND_RELOAD", False)
+    comp_man.incremental_reload = app.config.get("COMPSTATE_INCREMENTAL_RELOAD", False)
+    comp_man.shared_snapshot_dir = app.config.get("COMPSTATE_SHARED_SNAPSHOT_DIR")
+    return comp_man
+
+
+@app.before_request
+def before_request() -> Response | None:
+    g.request_start = time.perf_counter()
+    g.comp_man = configure_manager()
+
+    g.etag = _response_etag()
+    if g.etag is not None:
+        # Compressed responses have their own ETags
+        for etag in (g.etag, *(f'{g.etag}-{x}' for x in ENCODINGS)):
+            # Conditional GETs use the weak comparison (RFC 9110 13.1.2)
+            if request.if_none_match.contains_weak(etag):
+                CACHE_REQUESTS.inc('etag', 'hit')
+                g.etag = etag
+                # Skip the view entirely; the ETag is added in `after_request`
+                return Response(status=304)
+        CACHE_REQUESTS.inc('etag', 'miss')
+
+    key = _response_cache_key()
+    if key is not None:
+        cache, resp = _lookup_response(key)
+        if cache is not None:
+            # Rendered by the view and then added in `store_response`
+            g.response_cache = (cache, key)
+        return resp
+
+    return None
+
+
+# Note: registered before the other `after_request` handlers so that it runs
+# after them and measures the final response.
+@app.after_request
+def record_metrics(resp: Response) -> Response:
+    start = g.get('request_start')
+    if start is None:
+        return resp
+
+    duration = time.perf_counter() - start
+    route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    REQUESTS.inc(route, str(resp.status_code))
+    REQUEST_DURATION.observe(duration, route)
+    if resp.content_length is not None:
+        RESPONSE_SIZE.observe(resp.content_length, route)
+
+    record_file = app.config.get('REQUEST_RECORD_FILE')
+    if record_file is not None:
+        _request_recorder(record_file).record(
+            arrival=time.time() - duration,
+            method=request.method,
+            path=request.path,
+            query=request.query_string.decode('latin-1'),
+            accept_encoding=request.headers.get('Accept-Encoding'),
+            route=route,
+            status=resp.status_code,
+            duration=duration,
+        )
+
+    return resp
+
+
+def _compress_response(resp: Response, etag: str) -> None:
+    """
+    Compress the body of a response if the client accepts it, re-using the
+    compressed body from the snapshot's cache where possible.
+    """
+    resp.vary.add('Accept-Encoding')
+
+    if resp.status_code != 200 or resp.direct_passthrough or resp.content_encoding:
+        return
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return
+
+    body = resp.get_data()
+    if len(body) < MIN_SIZE:
+        return
+
+    snapshot: Snapshot = g.comp_man.get_snapshot()
+    bodies = snapshot.cached(
+        'compressed',
+        None,
+        lambda: CompressedBodies(COMPRESSED_BODIES),
+        counted=False,
+    )
+
+    compressed = bodies.get(etag, encoding)
+    if compressed is None:
+        CACHE_REQUESTS.inc('compressed', 'miss')
+        compressed = compress(body, encoding)
+        bodies.add(etag, encoding, compressed)
+    else:
+        CACHE_REQUESTS.inc('compressed', 'hit')
+
+    resp.set_data(compressed)
+    resp.content_encoding = encoding
+    # Each encoding is a different representation, so needs its own ETag
+    resp.set_etag(f'{etag}-{encoding}')
 
 
 @app.after_request
 def after_request(resp: Response) -> Response:
     if 'Origin' in request.headers:
         resp.headers['Access-Control-Allow-Origin'] = '*'
+
+    etag = g.get('etag')
+    if etag is not None and resp.status_code in (200, 304):
+        resp.set_etag(etag)
+        _compress_response(resp, etag)
+
     return resp
 
 
+# Note: registered after `after_request` so that it runs before it, and so
+# caches the response as rendered by the view.
+@app.after_request
+def store_response(resp: Response) -> Response:
+    pending = g.pop('response_cache', None)
+    if pending is not None:
+        cache, key = pending
+        _store_response(cache, key, resp)
+    return resp
+
+
+@app.teardown_request
+def abandon_response(exc: BaseException | None) -> None:
+    # Release any requests waiting for a response which failed to render
+    pending = g.pop('response_cache', None)
+    if pending is not None:
+        cache, key = pending
+        cache.abandon(key)
+
+
+def prerendered(view: Callable[[], Response]) -> Callable[[], Response]:
+    """
+    Serve the body of a view's response from a cache on the current snapshot.
+
+    The body is rendered on first use for each snapshot. This is only suitable
+    for views which depend on nothing other than the compstate.
+    """
+
+    def render(snapshot: Snapshot) -> bytes:
+        with snapshot.timer.phase('prerender'):
+            return view().get_data()
+
+    @functools.wraps(view)
+    def wrapper() -> Response:
+        snapshot: Snapshot = g.comp_man.get_snapshot()
+        # URLs in the body are relative to the script root
+        key = (view.__name__, request.script_root)
+        body = snapshot.cached('prerendered', key, lambda: render(snapshot))
+        return app.response_class(body, mimetype='application/json')
+
+    return wrapper
+
+
+def _requested_fields() -> FieldSelection | None:
+    """Get the selection of fields from the ``fields`` query parameter."""
+    fields = request.args.get('fields')
+    if fields is None:
+        return None
+    try:
+        return parse_fields(fields)
+    except ValueError:
+        raise errors.BadRequest(f"Bad value '{fields}' for 'fields'.")
+
+
 @app.route('/')
 def root() -> Response:
     return jsonify(
@@ -79,6 +431,7 @@ def format_arena(arena: Arena) -> dict[str, Any]:
 
 
 @app.route('/arenas')
+@prerendered
 def arenas() -> Response:
     comp: SRComp = g.comp_man.get_comp()
     return jsonify(arenas={
@@ -115,6 +468,7 @@ def format_location(location: Region) -> dict[str, Any]:
 
 
 @app.route('/locations')
+@prerendered
 def locations() -> Response:
     comp: SRComp = g.comp_man.get_comp()
 
@@ -136,13 +490,17 @@ def get_location(name: str) -> Response:
     return jsonify(format_location(location))
 
 
-def _team_image_path(team: Team) -> str:
-    return os.path.join(
-        g.comp_man.root_dir,
-        'teams',
-        'images',
-        f'{team.tla}.png',
-    )
+def _team_images(snapshot: Snapshot) -> TeamImages:
+    directory = os.path.join(g.comp_man.root_dir, 'teams', 'images')
+
+    def build() -> TeamImages:
+        global _last_team_images
+        with snapshot.timer.phase('team_images'):
+            images = TeamImages(directory, previous=_last_team_images)
+        _last_team_images = images
+        return images
+
+    return snapshot.cached('team_images', directory, build)
 
 
 def team_info(comp: SRComp, team: Team) -> dict[str, Any]:
@@ -165,14 +523,14 @@ def team_info(comp: SRComp, team: Team) -> dict[str, Any]:
         },
     }
 
-    if os.path.exists(_team_image_path(team)):
+    if _team_images(g.comp_man.get_snapshot()).get(team.tla) is not None:
         info['image_url'] = url_for('get_team_image', tla=team.tla)
 
     return info
 
 
-@app.route('/teams')
-def teams() -> Response:
+@prerendered
+def all_teams() -> Response:
     comp: SRComp = g.comp_man.get_comp()
 
     resp = {}
@@ -182,6 +540,19 @@ def teams() -> Response:
     return jsonify(teams=resp)
 
 
+@app.route('/teams')
+def teams() -> Response:
+    fields = _requested_fields()
+    if fields is None:
+        return all_teams()
+
+    comp: SRComp = g.comp_man.get_comp()
+    return jsonify(teams={
+        team.tla: select_fields(team_info(comp, team), fields)
+        for team in comp.teams.values()
+    })
+
+
 @app.route('/teams/<tla>')
 def get_team(tla: str) -> Response:
     comp: SRComp = g.comp_man.get_comp()
@@ -190,24 +561,45 @@ def get_team(tla: str) -> Response:
         team = comp.teams[TLA(tla)]
     except KeyError:
         abort(404)
-    return jsonify(team_info(comp, team))
+
+    info = team_info(comp, team)
+    fields = _requested_fields()
+    if fields is not None:
+        info = select_fields(info, fields)
+    return jsonify(info)
 
 
 @app.route('/teams/<tla>/image')
 def get_team_image(tla: str) -> Response:
-    comp: SRComp = g.comp_man.get_comp()
+    snapshot: Snapshot = g.comp_man.get_snapshot()
 
-    try:
-        team = comp.teams[TLA(tla)]
-    except KeyError:
+    if TLA(tla) not in snapshot.comp.teams:
         abort(404)
 
-    filename = _team_image_path(team)
-    if os.path.exists(filename):
-        return send_file(filename, mimetype='image/png')
-    else:
+    size = request.args.get('size')
+    if size is not None and size not in VARIANT_SIZES:
+        raise errors.UnknownImageSize(size)
+
+    images = _team_images(snapshot)
+    image = images.get(TLA(tla))
+    if image is None:
         abort(404)
 
+    variant = images.variant(TLA(tla), size) if size is not None else None
+    if variant is None:
+        return send_file(
+            image.path,
+            mimetype='image/png',
+            etag=image.digest,
+            last_modified=image.last_modified,
+        )
+
+    response = app.response_class(variant, mimetype='image/png')
+    response.set_etag(f'{image.digest}-{size}')
+    response.last_modified = image.last_modified
+    response.make_conditional(request)
+    return response
+
 
 def format_corner(corner: Corner) -> dict[str, Any]:
     return {
@@ -218,6 +610,7 @@ def format_corner(corner: Corner) -> dict[str, Any]:
 
 
 @app.route("/corners")
+@prerendered
 def corners() -> Response:
     comp: SRComp = g.comp_man.get_comp()
     return jsonify(corners={
@@ -239,6 +632,7 @@ def get_corner(number: int) -> Response:
 
 
 @app.route("/state")
+@prerendered
 def state() -> Response:
     comp: SRComp = g.comp_man.get_comp()
     return jsonify(state=comp.state)
@@ -266,6 +660,7 @@ def get_config_dict(comp: SRComp) -> dict[str, Any]:
 
 
 @app.route("/config")
+@prerendered
 def config() -> Response:
     comp: SRComp = g.comp_man.get_comp()
     return jsonify(config=get_config_dict(comp))
@@ -277,79 +672,199 @@ def last_scored_match() -> Response:
     return jsonify(last_scored=comp.scores.last_scored_match)
 
 
-@app.route("/matches")
-def matches() -> Response:
-    comp: SRComp = g.comp_man.get_comp()
-    matches: list[MatchInfo] = []
-    for slots in comp.schedule.matches:
-        matches.extend(
-            match_json_info(comp, match)
-            for match in slots.values()
+def _parse_date(string: str) -> datetime.datetime:
+    if ' ' in string:
+        raise errors.BadRequest(
+            "Date string should not contain spaces. "
+            "Did you pass in a '+'?",
         )
+    else:
+        when = dateutil.parser.parse(string)
+        if when.tzinfo is None:
+            raise errors.BadRequest("Date string must include a timezone.")
+        return when
+
+
+# Mapping of the names of filters on matches to functions which convert values
+# from the query string into the keys used by the `MatchIndex`.
+MATCH_FILTERS: dict[str, Callable[[str], Any]] = {
+    'type': lambda x: MatchType(x).value,
+    'arena': str,
+    'num': int,
+    'team': str,
+    'game_start_time': _parse_date,
+    'game_end_time': _parse_date,
+    'slot_start_time': _parse_date,
+    'slot_end_time': _parse_date,
+}
+
+
+def _match_index(snapshot: Snapshot) -> MatchIndex:
+    return snapshot.cached('match_index', None, lambda: MatchIndex(snapshot.comp))
+
+
+def _match_digests(snapshot: Snapshot) -> MatchDigests:
+    def build() -> MatchDigests:
+        with snapshot.timer.phase('match_digests'):
+            matches = _match_index(snapshot).matches
+            return {
+                (match.arena, match.num): hashlib.sha1(
+                    app.json.dumps(info, separators=(',', ':')).encode(),
+                ).digest()
+                for match, info in zip(matches, cached_match_json_infos(snapshot, matches))
+            }
 
-    def parse_date(string: str) -> datetime.datetime:
-        if ' ' in string:
-            raise errors.BadRequest(
-                "Date string should not contain spaces. "
-                "Did you pass in a '+'?",
-            )
-        else:
-            when = dateutil.parser.parse(string)
-            if when.tzinfo is None:
-                raise errors.BadRequest("Date string must include a timezone.")
-            return when
-
-    filters: Any = [  # TODO: re-work this to get checking
-        ('type', MatchType, lambda x: x['type']),
-        ('arena', str, lambda x: x['arena']),
-        ('num', int, lambda x: x['num']),
-        ('game_start_time', parse_date, lambda x: x['times']['game']['start']),
-        ('game_end_time', parse_date, lambda x: x['times']['game']['end']),
-        ('slot_start_time', parse_date, lambda x: x['times']['slot']['start']),
-        ('slot_end_time', parse_date, lambda x: x['times']['slot']['end']),
-    ]
+    return snapshot.cached('match_digests', None, build)
+
+
+def _matches_since(snapshot: Snapshot, since: str) -> Response:
+    """
+    Get the response listing the changes to the matches since the given
+    revision, or since nothing if that is empty.
+    """
+    comp = snapshot.comp
+
+    for arg in request.args:
+        if arg not in ('since', 'fields'):
+            raise errors.BadRequest(f"'since' cannot be combined with '{arg}'.")
+
+    digests = _match_digests(snapshot)
+    # Record the current revision so that clients may ask for changes since it
+    match_history.add(comp.state, digests)
+
+    if since:
+        previous = match_history.get(since)
+        if previous is None:
+            raise errors.UnknownRevision(since)
+    else:
+        previous = {}
+
+    changed, removed = diff_matches(previous, digests)
+
+    index = _match_index(snapshot)
+    matches = cached_match_json_infos(
+        snapshot,
+        (index.matches[index.position(arena, num)] for arena, num in changed),
+    )
+
+    fields = _requested_fields()
+    if fields is not None:
+        matches = select_fields(matches, fields)
+
+    return jsonify(
+        matches=matches,
+        removed=[{'arena': arena, 'num': num} for arena, num in removed],
+        state=comp.state,
+        last_scored=comp.scores.last_scored_match,
+    )
+
+
+def _matches_response(
+    snapshot: Snapshot,
+    criteria: dict[str, list[Bounds]],
+) -> Response:
+    """
+    Get the response listing the matches which meet the given criteria along
+    with those from the filters, limit and cursor in the query string.
+    """
+    comp = snapshot.comp
 
     # check for unknown filters
-    filter_names = [name for name, _, _ in filters] + ['limit']
     for arg in request.args:
-        if arg not in filter_names:
+        if (
+            arg not in MATCH_FILTERS and arg not in ('limit', 'after', 'fields') or
+            # Filters which the endpoint already applies
+            arg in criteria
+        ):
             raise errors.UnknownMatchFilter(arg)
 
-    # actually run the filters
-    for filter_key, filter_type, filter_value in filters:
+    criteria = dict(criteria)
+    for filter_key, filter_type in MATCH_FILTERS.items():
         if filter_key in request.args:
             value = request.args[filter_key]
             try:
-                predicate = parse_difference_string(value, filter_type)
-                matches = [
-                    match
-                    for match in matches
-                    if predicate(filter_type(filter_value(match)))  # type: ignore[no-untyped-call]  # noqa:E501
+                criteria[filter_key] = [
+                    parse_difference_bounds(part, filter_type)
+                    for part in value.split(',')
                 ]
             except ValueError:
                 raise errors.BadRequest(f"Bad value '{value}' for '{filter_key}'.")
 
+    index = _match_index(snapshot)
+
+    start = 0
+    if 'after' in request.args:
+        after = request.args['after']
+        try:
+            arena, num = after.rsplit(',', 1)
+            start = index.start_after(ArenaName(arena), MatchNumber(int(num)))
+        except ValueError:
+            raise errors.BadRequest(
+                f"Bad value '{after}' for 'after', expected '<arena>,<num>'.",
+            )
+
     # limit the results
+    next_url = None
     try:
         limit = int(request.args['limit'])
     except KeyError:
-        pass
+        selected = index.select(criteria, start)
     except ValueError:
         raise errors.BadRequest('Limit must be a positive or negative integer.')
     else:
         if limit == 0:
-            matches = []
+            selected = []
         elif limit > 0:
-            matches = matches[:limit]
+            # Select one more than needed to find whether there is a next page
+            selected = index.select(criteria, start, limit + 1)
+            if len(selected) > limit:
+                selected = selected[:limit]
+                last = selected[-1]
+                args: dict[str, Any] = {**(request.view_args or {}), **request.args}
+                args['after'] = f'{last.arena},{last.num}'
+                assert request.endpoint is not None
+                next_url = url_for(request.endpoint, **args)
         elif limit < 0:
-            matches = matches[limit:]
+            selected = index.select(criteria, start)[limit:]
         else:
             raise AssertionError("Limit isn't a number?")
 
-    return jsonify(matches=matches, last_scored=comp.scores.last_scored_match)
+    fields = _requested_fields()
+    matches = cached_match_json_infos(snapshot, selected)
+    if fields is not None:
+        # Note: the cached match information is shared so must not be modified
+        matches = select_fields(matches, fields)
+
+    response = jsonify(matches=matches, last_scored=comp.scores.last_scored_match)
+    if next_url is not None:
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+        # Allow cross-origin clients to follow the link
+        response.headers['Access-Control-Expose-Headers'] = 'Link'
+    return response
+
+
+@app.route("/matches")
+def matches() -> Response:
+    snapshot: Snapshot = g.comp_man.get_snapshot()
+
+    if 'since' in request.args:
+        return _matches_since(snapshot, request.args['since'])
+
+    return _matches_response(snapshot, {})
+
+
+@app.route('/teams/<tla>/matches')
+def get_team_matches(tla: str) -> Response:
+    snapshot: Snapshot = g.comp_man.get_snapshot()
+
+    if TLA(tla) not in snapshot.comp.teams:
+        abort(404)
+
+    return _matches_response(snapshot, {'team': [(tla, tla)]})
 
 
 @app.route("/periods")
+@prerendered
 def match_periods() -> Response:
     comp: SRComp = g.comp_man.get_comp()
 
@@ -376,55 +891,129 @@ def match_periods() -> Response:
     return jsonify(periods=periods)
 
 
-@app.route("/current")
-def current_state() -> Response:
-    comp: SRComp = g.comp_man.get_comp()
+# Rendered in place of the time in cached `/current` responses
+CURRENT_TIME_PLACEHOLDER = '__srcomp_current_time__'
 
-    time = datetime.datetime.now(comp.timezone)
+# The maximum number of distinct selections of fields for which `/current`
+# responses are kept for each snapshot
+CURRENT_BODIES = 20
 
-    delay = comp.schedule.delay_at(time)
-    delay_seconds = int(delay.total_seconds())
+# The longest, in seconds, that clients may cache `/current` responses for.
+# Kept short as a reload may add a delay or otherwise change the schedule
+# before the next transition.
+CURRENT_MAX_AGE = 5
 
-    matches = [
-        match_json_info(comp, x)
-        for x in comp.schedule.matches_at(time)
-    ]
 
-    staging_matches = []
-    shepherding_matches = []
-    for slot in comp.schedule.matches:
-        for match in slot.values():
-            staging_times = comp.schedule.get_staging_times(match)
+def _render_current(
+    snapshot: Snapshot,
+    index: MatchIndex,
+    time: datetime.datetime,
+    fields: FieldSelection | None,
+) -> tuple[str, str]:
+    """
+    Render the body of the `/current` response at the given time, returning
+    the parts of the body before and after the time.
+    """
+    comp = snapshot.comp
 
-            if time > staging_times['closes']:
-                # Already done staging
-                continue
+    delay = comp.schedule.delay_at(time)
+    delay_seconds = int(delay.total_seconds())
 
-            if staging_times['opens'] <= time:
-                staging_matches.append(match_json_info(comp, match))
+    groups = [
+        index.at(interval_index, time)
+        for interval_index in (index.slots, index.staging, index.shepherding)
+    ]
+    # Look up the information for all the matches at once, so that it is
+    # counted as a single cache request
+    infos: list[Any] = cached_match_json_infos(
+        snapshot,
+        [match for group in groups for match in group],
+    )
+    if fields is not None:
+        infos = select_fields(infos, fields)
 
-            signal_shepherds = staging_times['signal_shepherds']
-            if signal_shepherds:
-                first_signal = min(signal_shepherds.values())
-                if first_signal <= time:
-                    shepherding_matches.append(match_json_info(comp, match))
+    grouped = []
+    for group in groups:
+        grouped.append(infos[:len(group)])
+        infos = infos[len(group):]
+    matches, staging_matches, shepherding_matches = grouped
 
-    return jsonify(
+    body = jsonify(
         delay=delay_seconds,
-        time=time.isoformat(),
+        time=CURRENT_TIME_PLACEHOLDER,
         matches=matches,
         staging_matches=staging_matches,
         shepherding_matches=shepherding_matches,
-    )
+    ).get_data(as_text=True)
+
+    before, after = body.split(app.json.dumps(CURRENT_TIME_PLACEHOLDER))
+    return before, after
+
+
+def _current_body(
+    snapshot: Snapshot,
+    time: datetime.datetime,
+    fields: str | None = None,
+) -> tuple[str, datetime.datetime | None]:
+    """
+    Get the body of the `/current` response at the given time, along with the
+    time of the next transition after which it will differ.
+
+    :param str fields: The fields to select from each match, as given in the
+                       ``fields`` query parameter.
+    """
+    # The response only changes at transitions between matches (other than
+    # the time), so is rendered once for each window between them.
+    index = _match_index(snapshot)
+    window, next_transition = index.window(time)
+
+    rendered: dict[str | None, tuple[int, str, str]]
+    rendered = snapshot.cached('current', None, dict, counted=False)
+
+    cached = rendered.get(fields)
+    if cached is not None and cached[0] == window:
+        CACHE_REQUESTS.inc('current', 'hit')
+        _, before, after = cached
+    else:
+        CACHE_REQUESTS.inc('current', 'miss')
+        try:
+            selection = parse_fields(fields) if fields is not None else None
+        except ValueError:
+            raise errors.BadRequest(f"Bad value '{fields}' for 'fields'.")
+        before, after = _render_current(snapshot, index, time, selection)
+        # Bound the number of selections of fields which are kept
+        if fields in rendered or len(rendered) < CURRENT_BODIES:
+            rendered[fields] = (window, before, after)
+
+    body = before + app.json.dumps(time.isoformat()) + after
+    return body, next_transition
+
+
+@app.route("/current")
+def current_state() -> Response:
+    snapshot: Snapshot = g.comp_man.get_snapshot()
+    time = datetime.datetime.now(snapshot.comp.timezone)
+
+    body, next_transition = _current_body(snapshot, time, request.args.get('fields'))
+    response = app.response_class(body, mimetype='application/json')
+
+    max_age = CURRENT_MAX_AGE
+    if next_transition is not None:
+        max_age = min(max_age, int((next_transition - time).total_seconds()))
+    response.cache_control.max_age = max_age
+
+    return response
 
 
 @app.route('/knockout')
+@prerendered
 def knockout() -> Response:
     comp: SRComp = g.comp_man.get_comp()
     return jsonify(rounds=comp.schedule.knockout_rounds)
 
 
 @app.route('/tiebreaker')
+@prerendered
 def tiebreaker() -> Response:
     comp: SRComp = g.comp_man.get_comp()
     try:
@@ -433,6 +1022,212 @@ def tiebreaker() -> Response:
         abort(404)
 
 
+@app.route('/reloads')
+def reloads() -> Response:
+    def format_reload(info: ReloadInfo) -> dict[str, Any]:
+        return {
+            'state': info['state'],
+            'time': datetime.datetime.fromtimestamp(
+                info['time'],
+                datetime.timezone.utc,
+            ).isoformat(),
+            'duration': sum(info['phases'].values()),
+            'phases': dict(info['phases']),
+            'derived_phases': dict(info['derived_phases']),
+        }
+
+    # Ensure that the compstate has been loaded at least once
+    g.comp_man.get_comp()
+
+    return jsonify(reloads=[
+        format_reload(info)
+        for info in reversed(g.comp_man.reloads)
+    ])
+
+
+@app.route('/metrics')
+def metrics() -> Response:
+    return Response(REGISTRY.exposition(), content_type=METRICS_CONTENT_TYPE)
+
+
+# The maximum number of requests which can be made in a single batch
+MAX_BATCH_SIZE = 20
+
+# Endpoints which cannot be requested in a batch, as their responses are not
+# JSON or are not complete
+UNBATCHABLE_ENDPOINTS = frozenset({
+    'batch',
+    'get_team_image',
+    'metrics',
+    'stream',
+})
+
+
+class _PinnedManager:
+    """
+    Stands in for the compstate manager while handling a batch of requests,
+    so that they are all handled using the same snapshot.
+    """
+
+    def __init__(self, manager: SRCompManager, snapshot: Snapshot) -> None:
+        self.root_dir = manager.root_dir
+        self.reloads = manager.reloads
+        self._snapshot = snapshot
+
+    def get_snapshot(self) -> Snapshot:
+        return self._snapshot
+
+    def get_comp(self) -> SRComp:
+        return self._snapshot.comp
+
+
+def _batched_response(path: str) -> Response:
+    """Handle a request within a batch, returning its response."""
+    path_info, _, query_string = path.partition('?')
+    if not path_info.startswith('/'):
+        raise errors.BadRequest(f"Bad path '{path}' in batch.")
+
+    environ = {
+        **request.environ,
+        'PATH_INFO': path_info.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': query_string.encode('utf-8').decode('latin-1'),
+    }
+
+    # Note: this shares the application context, and so `g`, with the batch
+    with app.request_context(environ):
+        if request.endpoint in UNBATCHABLE_ENDPOINTS:
+            raise errors.BadRequest(f"Cannot batch requests for '{path}'.")
+
+        key = _response_cache_key()
+        cache, resp = (None, None) if key is None else _lookup_response(key)
+        if resp is not None:
+            return resp
+
+        try:
+            try:
+                rv = app.dispatch_request()
+            except werkzeug.exceptions.HTTPException as e:
+                rv = app.handle_user_exception(e)
+            resp = app.make_response(rv)
+        except BaseException:
+            if cache is not None:
+                cache.abandon(key)
+            raise
+
+        if cache is not None:
+            _store_response(cache, key, resp)
+        return resp
+
+
+@app.route('/batch')
+def batch() -> Response:
+    paths = request.args.getlist('path')
+    if len(paths) > MAX_BATCH_SIZE:
+        raise errors.BadRequest(f"At most {MAX_BATCH_SIZE} requests may be batched.")
+
+    snapshot: Snapshot = g.comp_man.get_snapshot()
+    g.comp_man = _PinnedManager(g.comp_man, snapshot)
+
+    # The bodies of the responses are already JSON, so are included as they
+    # are rather than being decoded and encoded again.
+    parts = []
+    for path in paths:
+        response = _batched_response(path)
+        if 300 <= response.status_code < 400:
+            # Such as for paths with doubled slashes. Not followed, so that
+            # the client learns the path it should have used.
+            raise errors.BadRequest(
+                f"Request for '{path}' in batch redirects to '{response.location}'.",
+            )
+        if not response.is_json:
+            raise errors.BadRequest(f"Request for '{path}' in batch did not give JSON.")
+
+        body = response.get_data(as_text=True).rstrip('\n')
+        parts.append(
+            f'{{"body":{body},"path":{app.json.dumps(path)},'
+            f'"status":{response.status_code}}}',
+        )
+
+    state = app.json.dumps(snapshot.comp.state)
+    body = f'{{"responses":[{",".join(parts)}],"state":{state}}}\n'
+    return app.response_class(body, mimetype='application/json')
+
+
+# How often the event producer checks for updates to the compstate, in seconds
+STREAM_POLL_INTERVAL = 1
+
+
+def _produce_events(broadcaster: Broadcaster) -> None:
+    """
+    Publish events for `/stream` when the compstate is reloaded and when the
+    `/current` response changes.
+    """
+    state = None
+    window = None
+
+    with app.app_context():
+        g.comp_man = comp_man
+
+        while True:
+            timeout: float = STREAM_POLL_INTERVAL
+            try:
+                snapshot = comp_man.get_snapshot()
+                comp = snapshot.comp
+
+                if comp.state != state:
+                    state = comp.state
+                    # Always publish `/current` for a new snapshot
+                    window = None
+                    broadcaster.publish(
+                        'state',
+                        jsonify(state=state).get_data(as_text=True),
+                    )
+
+                time = datetime.datetime.now(comp.timezone)
+                new_window, next_transition = _match_index(snapshot).window(time)
+                if new_window != window:
+                    window = new_window
+                    body, _ = _current_body(snapshot, time)
+                    broadcaster.publish('current', body)
+
+                if next_transition is not None:
+                    timeout = min(timeout, (next_transition - time).total_seconds())
+            except Exception:
+                logging.exception("Error checking for events")
+
+            if not broadcaster.wait(timeout):
+                return
+
+
+events = Broadcaster(_produce_events)
+comp_man.add_reload_listener(lambda info: events.wake())
+
+
+@app.route('/stream')
+def stream() -> Response:
+    # Ensure that the compstate can be loaded before starting the stream
+    g.comp_man.get_snapshot()
+
+    def generate() -> Iterator[bytes]:
+        # Subscribe only once the body is consumed, as it never is for HEAD
+        # requests, which would then never unsubscribe
+        subscription = events.subscribe()
+        try:
+            yield from subscription
+        finally:
+            subscription.close()
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # Prevent nginx from buffering the events
+            'X-Accel-Buffering': 'no',
+        },
+    )
+
+
 @app.errorhandler(werkzeug.exceptions.HTTPException)
 def error_handler(
     e: werkzeug.exceptions.HTTPException,
@@ -0,0 +1,144 @@
+"""A manifest of the teams' images, along with smaller variants of them."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import io
+import os
+import threading
+from collections.abc import Mapping
+from typing import NamedTuple
+
+from sr.comp.http.metrics import CACHE_REQUESTS
+from sr.comp.types import TLA
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # type: ignore[assignment]
+
+RESIZING_AVAILABLE: bool = Image is not None
+"""Whether Pillow is installed, so that variants of the images can be made."""
+
+VARIANT_SIZES: Mapping[str, int] = {
+    'thumb': 64,
+    'small': 256,
+}
+"""The maximum width and height, in pixels, of each variant of the images."""
+
+
+class TeamImage(NamedTuple):
+    path: str
+    size: int
+    """The size of the image, in bytes."""
+    last_modified: datetime.datetime
+    digest: str
+    """A hash of the content of the image."""
+
+
+def _hash_file(path: str) -> str:
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while chunk := f.read(65536):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def resize(image: bytes, max_size: int) -> bytes:
+    """
+    Shrink a PNG image to fit within a square of the given size, preserving
+    its aspect ratio. Images which already fit are returned unchanged.
+    """
+    if not RESIZING_AVAILABLE:
+        raise RuntimeError("Resizing images requires Pillow")
+
+    with Image.open(io.BytesIO(image)) as original:
+        if original.width <= max_size and original.height <= max_size:
+            return image
+        original.thumbnail((max_size, max_size))
+        output = io.BytesIO()
+        original.save(output, format='PNG', optimize=True)
+        return output.getvalue()
+
+
+class TeamImages:
+    """
+    A manifest of the images in a directory, named by the TLAs of the teams
+    they belong to.
+
+    The manifest is built once, so that checking whether a team has an image
+    does not touch the filesystem.
+
+    :param str directory: The directory containing the images.
+    :param TeamImages previous: An earlier manifest, whose digests are reused
+                                for images which are unchanged since it was
+                                built, so that only new or changed images are
+                                hashed.
+    """
+
+    def __init__(self, directory: str, previous: TeamImages | None = None) -> None:
+        self.directory = directory
+
+        self.images: dict[TLA, TeamImage] = {}
+        self._digests: dict[tuple[str, int, int], str] = {}
+        """Digests of the images, keyed by their path, size and mtime."""
+
+        previous_digests = previous._digests if previous is not None else {}
+
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            entries = []
+
+        for entry in entries:
+            tla, ext = os.path.splitext(entry.name)
+            if ext != '.png' or not entry.is_file():
+                continue
+            stat = entry.stat()
+            key = (entry.path, stat.st_size, stat.st_mtime_ns)
+            digest = previous_digests.get(key)
+            if digest is None:
+                digest = _hash_file(entry.path)
+            self._digests[key] = digest
+            self.images[TLA(tla)] = TeamImage(
+                path=entry.path,
+                size=stat.st_size,
+                last_modified=datetime.datetime.fromtimestamp(
+                    int(stat.st_mtime),
+                    datetime.timezone.utc,
+                ),
+                digest=digest,
+            )
+
+        self._lock = threading.Lock()
+        self._variants: dict[tuple[TLA, str], bytes] = {}
+
+    def get(self, tla: TLA) -> TeamImage | None:
+        return self.images.get(tla)
+
+    def variant(self, tla: TLA, name: str) -> bytes | None:
+        """
+        Get the named smaller variant of a team's image, generating it on
+        first use.
+
+        :return: The variant, or ``None`` if the team has no image or Pillow
+                 is not installed.
+        """
+        image = self.images.get(tla)
+        if image is None or not RESIZING_AVAILABLE:
+            return None
+
+        key = (tla, name)
+        with self._lock:
+            body = self._variants.get(key)
+        if body is not None:
+            CACHE_REQUESTS.inc('team_image_variant', 'hit')
+            return body
+
+        CACHE_REQUESTS.inc('team_image_variant', 'miss')
+        with open(image.path, 'rb') as f:
+            body = resize(f.read(), VARIANT_SIZES[name])
+
+        with self._lock:
+            return self._variants.setdefault(key, body)
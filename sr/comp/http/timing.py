@@ -0,0 +1,37 @@
+"""Timing of the phases of an operation."""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from collections.abc import Iterator
+
+
+class PhaseTimer:
+    """Records how long is spent in each of a number of named phases."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        """Mapping of phase names to the total seconds spent in them."""
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a phase. Time spent in a phase of the same name is accumulated.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0) + duration
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def describe(self) -> str:
+        return ', '.join(
+            f'{name}={duration:.3f}s'
+            for name, duration in self.phases.items()
+        )
@@ -0,0 +1,186 @@
+"""Watchers for detecting requests to reload a compstate."""
+
+from __future__ import annotations
+
+import abc
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+# Values from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class UpdateWatcher(abc.ABC):
+    """
+    Base class for watching a file which is touched when an update is wanted.
+
+    :param str path: The path of the file to watch. The file need not exist.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @abc.abstractmethod
+    def changed(self) -> bool:
+        """
+        Return whether the file has been touched since the last call.
+
+        This is called on the request path so should be as cheap as possible.
+        """
+
+    def close(self) -> None:  # noqa: B027 # not all watchers need closing
+        """Stop watching the file."""
+
+
+class PollingWatcher(UpdateWatcher):
+    """
+    Detect changes by comparing the modification time of the file.
+
+    :param str path: The path of the file to watch. The file need not exist.
+    :param float interval: The minimum number of seconds between checks of
+                           the modification time.
+    """
+
+    def __init__(self, path: str, interval: float = 5) -> None:
+        super().__init__(path)
+        self.interval = interval
+        self._last_check = time.time()
+        self._mtime = self._get_mtime()
+
+    def _get_mtime(self) -> float:
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            # It doesn't exist. That's fine -- the file being created will
+            # still look like a change.
+            return -1
+
+    def changed(self) -> bool:
+        now = time.time()
+        if now - self._last_check < self.interval:
+            return False
+        self._last_check = now
+
+        new_time = self._get_mtime()
+        if new_time != self._mtime:
+            self._mtime = new_time
+            return True
+
+        return False
+
+
+class InotifyWatcher(UpdateWatcher):
+    """
+    Detect changes using Linux's inotify, via a background thread.
+
+    The containing directory is watched (rather than the file itself) so that
+    the file being created or replaced is also noticed.
+
+    :param str path: The path of the file to watch. The file need not exist.
+    :raises OSError: if inotify is not available.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+
+        self._generation = 0
+        """Incremented by the watching thread for each relevant event."""
+
+        self._seen_generation = 0
+        """The generation as at the last call to ``changed``."""
+
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError("Unable to find libc")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        try:
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except AttributeError:
+            raise OSError("inotify is not supported") from None
+
+        self._fd: int = inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        directory, filename = os.path.split(os.path.abspath(path))
+        self._filename = os.fsencode(filename)
+
+        wd = inotify_add_watch(
+            self._fd,
+            os.fsencode(directory),
+            IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO,
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, os.strerror(err), directory)
+
+        self._stop_read, self._stop_write = os.pipe()
+
+        self._thread = threading.Thread(
+            target=self._watch,
+            name='srcomp-inotify',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _watch(self) -> None:
+        try:
+            while True:
+                readable, _, _ = select.select([self._fd, self._stop_read], [], [])
+                if self._stop_read in readable:
+                    break
+                self._handle_events(os.read(self._fd, 4096))
+        finally:
+            os.close(self._fd)
+            os.close(self._stop_read)
+
+    def _handle_events(self, data: bytes) -> None:
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+
+            if name == self._filename:
+                self._generation += 1
+
+    def changed(self) -> bool:
+        generation = self._generation
+        if generation != self._seen_generation:
+            self._seen_generation = generation
+            return True
+        return False
+
+    def close(self) -> None:
+        os.write(self._stop_write, b'\0')
+        os.close(self._stop_write)
+
+
+def create_update_watcher(path: str) -> UpdateWatcher:
+    """
+    Create a watcher for the given file, preferring inotify where available.
+    """
+    try:
+        return InotifyWatcher(path)
+    except OSError as e:
+        logging.warning(
+            "Unable to watch %s using inotify, falling back to polling: %s",
+            path,
+            e,
+        )
+        return PollingWatcher(path)
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import contextlib
+import gzip
 import os.path
+import tempfile
 import unittest
 from collections.abc import Iterable, Iterator, Mapping
 from typing import Any
+from unittest import mock
 
 from flask.testing import FlaskClient
 from freezegun import freeze_time
 
-from sr.comp.http import app
+from sr.comp.http import app, query_utils, server
+from sr.comp.http.metrics import CACHE_REQUESTS
+from sr.comp.http.recording import read_recording
+from sr.comp.types import ArenaName, MatchNumber
 
 FlaskTestResponse = tuple[Iterable[bytes], str, Mapping[str, str]]
 
@@ -310,6 +316,22 @@ class ApiTests(unittest.TestCase):
         }
         self.assertEqual(expected, self.server_get('/teams/CLF'))
 
+    def test_team_fields(self) -> None:
+        expected = {
+            'tla': 'CLF',
+            'scores': {'league': 68},
+        }
+        self.assertEqual(expected, self.server_get('/teams/CLF?fields=tla,scores.league'))
+
+    def test_teams_fields(self) -> None:
+        teams = self.server_get('/teams?fields=tla,league_pos')['teams']
+
+        self.assertEqual({'tla': 'CLF', 'league_pos': 36}, teams['CLF'])
+        self.assertEqual(
+            self.server_get('/teams').keys(),
+            teams.keys(),
+        )
+
     def test_team_image(self) -> None:
         self.assertEqual(
             '/teams/BAY/image',
@@ -320,6 +342,40 @@ class ApiTests(unittest.TestCase):
         with self.assertRaisesApiError('NotFound', 404):
             self.server_get('/teams/BEES/image')
 
+    def test_team_image_validators(self) -> None:
+        response = self.client.get('/teams/BAY/image')
+        response.close()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('image/png', response.mimetype)
+        self.assertIsNotNone(response.last_modified)
+
+        etag = response.headers['ETag']
+        response = self.client.get('/teams/BAY/image', headers={'If-None-Match': etag})
+        self.assertEqual(304, response.status_code)
+
+    def test_team_image_variant(self) -> None:
+        full = self.client.get('/teams/BAY/image')
+        full.close()
+
+        response = self.client.get('/teams/BAY/image?size=thumb')
+        response.close()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('image/png', response.mimetype)
+        self.assertEqual(full.last_modified, response.last_modified)
+
+        etag = response.headers['ETag']
+        response = self.client.get(
+            '/teams/BAY/image?size=thumb',
+            headers={'If-None-Match': etag},
+        )
+        self.assertEqual(304, response.status_code)
+
+    def test_team_image_bad_size(self) -> None:
+        with self.assertRaisesApiError('UnknownImageSize', 400):
+            self.server_get('/teams/BAY/image?size=enormous')
+
     def test_bad_team(self) -> None:
         with self.assertRaisesApiError('NotFound', 404):
             self.server_get('/teams/BEES')
@@ -366,6 +422,83 @@ class ApiTests(unittest.TestCase):
             self.server_get('/matches?num=0&arena=A'),
         )
 
+    def test_match_filter_team(self) -> None:
+        self.assertEqual(
+            {'matches': MATCH_0, 'last_scored': 99},
+            self.server_get('/matches?num=0&team=TTN,GRS'),
+        )
+
+        matches = self.server_get('/matches?team=CLY')['matches']
+        self.assertNotEqual([], matches)
+        for match in matches:
+            self.assertIn('CLY', match['teams'])
+
+    def test_matches_fields(self) -> None:
+        expected = [
+            {
+                'num': match['num'],
+                'arena': match['arena'],
+                'times': {'slot': match['times']['slot']},
+            }
+            for match in self.server_get('/matches?num=0')['matches']
+        ]
+
+        self.assertEqual(
+            {'matches': expected, 'last_scored': 99},
+            self.server_get('/matches?num=0&fields=num,arena,times.slot'),
+        )
+
+        # The cached full information is unaffected
+        self.assertEqual(MATCH_0, self.server_get('/matches?num=0')['matches'])
+
+    def test_matches_bad_fields(self) -> None:
+        with self.assertRaisesApiError('BadRequest', 400):
+            self.server_get('/matches?fields=num,,arena')
+
+    def test_team_matches(self) -> None:
+        self.assertEqual(
+            self.server_get('/matches?team=CLY'),
+            self.server_get('/teams/CLY/matches'),
+        )
+
+    def test_team_matches_filters(self) -> None:
+        self.assertEqual(
+            self.server_get('/matches?team=CLY&num=2..10&limit=-2'),
+            self.server_get('/teams/CLY/matches?num=2..10&limit=-2'),
+        )
+
+    def test_team_matches_pages(self) -> None:
+        response = self.client.get('/teams/CLY/matches?limit=1')
+
+        self.assertEqual(
+            '</teams/CLY/matches?limit=1&after=A,0>; rel="next"',
+            response.headers['Link'],
+        )
+
+    def test_team_matches_team_filter(self) -> None:
+        with self.assertRaisesApiError('UnknownMatchFilter', 400):
+            self.server_get('/teams/CLY/matches?team=TTN')
+
+    def test_team_matches_bad_team(self) -> None:
+        with self.assertRaisesApiError('NotFound', 404):
+            self.server_get('/teams/BEES/matches')
+
+    def test_match_filter_multiple_values(self) -> None:
+        self.assertEqual(
+            self.server_get('/matches?num=0..1'),
+            self.server_get('/matches?num=0,1'),
+        )
+        self.assertEqual(
+            self.server_get('/matches'),
+            self.server_get('/matches?arena=A,B'),
+        )
+
+    def test_match_filter_multiple_values_with_ranges(self) -> None:
+        self.assertEqual(
+            self.server_get('/matches?num=1..3'),
+            self.server_get('/matches?num=1,2..3'),
+        )
+
     def test_match_forwards_limit(self) -> None:
         expected = {
             'matches': [
@@ -408,6 +541,75 @@ class ApiTests(unittest.TestCase):
             self.server_get('/matches?arena=A&limit=1'),
         )
 
+    def test_match_pages(self) -> None:
+        expected = self.server_get('/matches?arena=A')['matches']
+
+        response = self.client.get('/matches?arena=A&limit=2')
+        assert response.json is not None
+        self.assertEqual(expected[:2], response.json['matches'])
+        self.assertEqual(
+            '</matches?arena=A&limit=2&after=A,1>; rel="next"',
+            response.headers['Link'],
+        )
+
+        matches = []
+        url: str | None = '/matches?arena=A&limit=2'
+        while url is not None:
+            response = self.client.get(url)
+            assert response.json is not None
+            matches += response.json['matches']
+            link = response.headers.get('Link')
+            url = link[1:link.index('>')] if link else None
+
+        self.assertEqual(expected, matches)
+
+    def test_match_after(self) -> None:
+        self.assertEqual(
+            self.server_get('/matches?num=2..'),
+            self.server_get('/matches?after=B,1'),
+        )
+
+    def test_match_bad_after(self) -> None:
+        with self.assertRaisesApiError('BadRequest', 400):
+            self.server_get('/matches?after=1')
+
+    def test_matches_since_nothing(self) -> None:
+        response = self.server_get('/matches?since=')
+
+        self.assertEqual(self.server_get('/matches')['matches'], response['matches'])
+        self.assertEqual([], response['removed'])
+        self.assertEqual(self.server_get('/state')['state'], response['state'])
+
+    def test_matches_since_current(self) -> None:
+        state = self.server_get('/matches?since=')['state']
+
+        response = self.server_get(f'/matches?since={state}')
+
+        self.assertEqual([], response['matches'])
+        self.assertEqual([], response['removed'])
+        self.assertEqual(state, response['state'])
+
+    def test_matches_since_changes(self) -> None:
+        state = self.server_get('/matches?since=')['state']
+        # Simulate the match having changed since the previous revision
+        digests = dict(server.match_history.get(state) or {})
+        digests[ArenaName('A'), MatchNumber(0)] = b'changed'
+        digests[ArenaName('C'), MatchNumber(0)] = b'removed'
+        server.match_history.add('previous', digests)
+
+        response = self.server_get('/matches?since=previous&fields=arena,num')
+
+        self.assertEqual([{'arena': 'A', 'num': 0}], response['matches'])
+        self.assertEqual([{'arena': 'C', 'num': 0}], response['removed'])
+
+    def test_matches_since_unknown(self) -> None:
+        with self.assertRaisesApiError('UnknownRevision', 410):
+            self.server_get('/matches?since=bees')
+
+    def test_matches_since_with_filter(self) -> None:
+        with self.assertRaisesApiError('BadRequest', 400):
+            self.server_get('/matches?since=&arena=A')
+
     def test_match_backwards_limit(self) -> None:
         expected = {
             'matches': [
@@ -653,6 +855,63 @@ class ApiTests(unittest.TestCase):
 
         self.assertEqual(MATCH_0, match_list)
 
+    @freeze_time('2014-04-26 12:01:00')  # UTC
+    def test_current_fields(self) -> None:
+        current = self.server_get('/current?fields=num,arena')
+
+        self.assertEqual(
+            sorted([{'num': 0, 'arena': 'A'}, {'num': 0, 'arena': 'B'}], key=str),
+            sorted(current['matches'], key=str),
+        )
+        self.assertEqual(
+            MATCH_0,
+            sorted(self.server_get('/current')['matches'], key=lambda x: x['arena']),
+        )
+
+    def test_current_reuses_body(self) -> None:
+        with freeze_time('2014-04-26 12:01:00'):  # UTC
+            expected = self.server_get('/current')
+
+        with mock.patch.object(
+            server,
+            '_render_current',
+        ) as mock_render_current, freeze_time('2014-04-26 12:01:05'):  # UTC
+            current = self.server_get('/current')
+
+        self.assertFalse(mock_render_current.called, "Should reuse the rendered body")
+        self.assertEqual('2014-04-26T13:01:05+01:00', current['time'])
+        self.assertEqual(expected, {**current, 'time': expected['time']})
+
+    @freeze_time('2014-04-26 12:01:00')  # UTC
+    def test_current_cache_control(self) -> None:
+        response = self.client.get('/current')
+
+        # The next transition is minutes away, but a reload could change the
+        # schedule before then
+        self.assertEqual(server.CURRENT_MAX_AGE, response.cache_control.max_age)
+
+    @freeze_time('2014-04-26 12:01:00')  # UTC
+    def test_current_cache_metrics(self) -> None:
+        hits = CACHE_REQUESTS.get('current', 'hit')
+        misses = CACHE_REQUESTS.get('current', 'miss')
+
+        # A selection of fields which no other test renders
+        for _ in range(3):
+            self.client.get('/current?fields=num,arena,display_name')
+
+        self.assertEqual(hits + 2, CACHE_REQUESTS.get('current', 'hit'))
+        self.assertEqual(misses + 1, CACHE_REQUESTS.get('current', 'miss'))
+
+    @freeze_time('2014-04-26 12:04:58')  # UTC
+    def test_current_cache_control_near_transition(self) -> None:
+        response = self.client.get('/current')
+
+        # The match slot ends at 12:05 UTC, so the response may change then
+        max_age = response.cache_control.max_age
+        assert max_age is not None
+        self.assertLessEqual(max_age, 2)
+        self.assertGreaterEqual(max_age, 0)
+
     def test_knockouts(self) -> None:
         ref = [
             [
@@ -955,3 +1214,362 @@ class ApiTests(unittest.TestCase):
     def test_tiebreaker(self) -> None:
         with self.assertRaisesApiError('NotFound', 404):
             self.server_get('/tiebreaker')
+
+    def test_etag(self) -> None:
+        response = self.client.get('/teams')
+        etag = response.headers['ETag']
+
+        response = self.client.get('/teams', headers={'If-None-Match': etag})
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response.headers['ETag'])
+        self.assertEqual(b'', response.data)
+
+    def test_weak_etag(self) -> None:
+        etag = self.client.get('/teams').headers['ETag']
+
+        response = self.client.get('/teams', headers={'If-None-Match': f'W/{etag}'})
+
+        self.assertEqual(304, response.status_code)
+
+    def test_etag_varies_by_script_root(self) -> None:
+        etag = self.client.get('/teams').headers['ETag']
+
+        response = self.client.get(
+            '/teams',
+            base_url='http://localhost/api/',
+            headers={'If-None-Match': etag},
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response.headers['ETag'])
+
+    def test_etag_varies_by_query(self) -> None:
+        etag = self.client.get('/matches?arena=A').headers['ETag']
+
+        response = self.client.get('/matches?arena=B', headers={'If-None-Match': etag})
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response.headers['ETag'])
+
+    def test_no_etag_for_errors(self) -> None:
+        response = self.client.get('/teams/BEES')
+        self.assertEqual(404, response.status_code)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_no_etag_for_current(self) -> None:
+        response = self.client.get('/current')
+        self.assertNotIn('ETag', response.headers)
+
+    @mock.patch.dict(app.config, {'RESPONSE_CACHE_MAX_BYTES': 0})
+    def test_prerendered_teams(self) -> None:
+        expected = self.client.get('/teams').data
+
+        with mock.patch.object(server, 'team_info') as mock_team_info:
+            response = self.client.get('/teams')
+
+        self.assertEqual(expected, response.data)
+        self.assertEqual('application/json', response.mimetype)
+        self.assertFalse(mock_team_info.called, "Should use the pre-rendered body")
+
+    @mock.patch.dict(app.config, {'RESPONSE_CACHE_MAX_BYTES': 0})
+    def test_cached_match_info(self) -> None:
+        expected = self.client.get('/matches?num=0..2').data
+
+        with mock.patch.object(
+            query_utils,
+            'match_json_info',
+        ) as mock_match_json_info:
+            response = self.client.get('/matches?num=0..2')
+
+        self.assertEqual(expected, response.data)
+        self.assertFalse(
+            mock_match_json_info.called,
+            "Should use the cached match information",
+        )
+
+    @mock.patch.dict(app.config, {'RESPONSE_CACHE_MAX_BYTES': 0})
+    def test_cached_match_info_counted_per_request(self) -> None:
+        self.client.get('/matches?num=0..2')
+        hits = CACHE_REQUESTS.get('match_info', 'hit')
+        misses = CACHE_REQUESTS.get('match_info', 'miss')
+
+        self.client.get('/matches?num=0..2')
+
+        self.assertEqual(hits + 1, CACHE_REQUESTS.get('match_info', 'hit'))
+        self.assertEqual(misses, CACHE_REQUESTS.get('match_info', 'miss'))
+
+    def test_response_cache(self) -> None:
+        expected = self.client.get('/matches?num=0..2&arena=A').data
+
+        with mock.patch.object(server, '_matches_response') as mock_matches_response:
+            response = self.client.get('/matches?arena=A&num=0..2')
+
+        self.assertEqual(expected, response.data)
+        self.assertEqual('application/json', response.mimetype)
+        self.assertFalse(mock_matches_response.called, "Should use the cached response")
+
+    def test_response_cache_metrics(self) -> None:
+        hits = CACHE_REQUESTS.get('response', 'hit')
+        misses = CACHE_REQUESTS.get('response', 'miss')
+
+        # A query which no other test requests, so is not yet cached
+        for _ in range(2):
+            self.client.get('/matches?num=1..3&type=league')
+
+        self.assertEqual(hits + 1, CACHE_REQUESTS.get('response', 'hit'))
+        self.assertEqual(misses + 1, CACHE_REQUESTS.get('response', 'miss'))
+        self.assertNotIn(
+            'response_cache',
+            {labels[0] for _, _, labels, _ in CACHE_REQUESTS.samples()},
+        )
+
+    def test_response_cache_keeps_order_of_values(self) -> None:
+        self.client.get('/matches?arena=A&arena=B')
+
+        with mock.patch.object(
+            server,
+            '_matches_response',
+            wraps=server._matches_response,
+        ) as mock_matches_response:
+            self.client.get('/matches?arena=B&arena=A')
+
+        self.assertTrue(mock_matches_response.called, "Should not conflate the requests")
+
+    def test_response_cache_skips_errors(self) -> None:
+        self.client.get('/matches?num=bees')
+
+        with mock.patch.object(
+            server,
+            '_matches_response',
+            wraps=server._matches_response,
+        ) as mock_matches_response:
+            response = self.client.get('/matches?num=bees')
+
+        self.assertEqual(400, response.status_code)
+        self.assertTrue(mock_matches_response.called, "Should not cache errors")
+
+    @mock.patch.dict(app.config, {'RESPONSE_CACHE_MAX_BYTES': 0})
+    def test_response_cache_disabled(self) -> None:
+        self.client.get('/matches?num=0..3')
+
+        with mock.patch.object(
+            server,
+            '_matches_response',
+            wraps=server._matches_response,
+        ) as mock_matches_response:
+            self.client.get('/matches?num=0..3')
+
+        self.assertTrue(mock_matches_response.called, "Should not cache responses")
+
+    def test_response_cache_batch(self) -> None:
+        expected = self.server_get('/matches?num=1..2')
+
+        with mock.patch.object(server, '_matches_response') as mock_matches_response:
+            response = self.server_get('/batch?path=/matches%3Fnum%3D1..2')
+
+        (result,) = response['responses']
+        self.assertEqual(expected, result['body'])
+        self.assertFalse(mock_matches_response.called, "Should use the cached response")
+
+    def test_request_recording(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'requests.jsonl')
+            with mock.patch.dict(app.config, {'REQUEST_RECORD_FILE': path}):
+                self.client.get('/teams?fields=tla', headers={'Accept-Encoding': 'gzip'})
+                self.client.get('/teams/BEES')
+            server._request_recorder(path).close()
+
+            first, second = read_recording(path)
+
+        self.assertEqual('/teams', first.path)
+        self.assertEqual('fields=tla', first.query)
+        self.assertEqual('gzip', first.accept_encoding)
+        self.assertEqual(200, first.status)
+        self.assertIsNone(first.interval)
+
+        self.assertEqual('/teams/<tla>', second.route)
+        self.assertEqual(404, second.status)
+        self.assertIsNone(second.accept_encoding)
+        self.assertEqual(second.time - first.time, second.interval)
+
+    def test_stream(self) -> None:
+        state = self.server_get('/state')['state']
+
+        response = self.client.get('/stream')
+        self.addCleanup(response.close)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('text/event-stream', response.mimetype)
+        self.assertNotIn('ETag', response.headers)
+
+        events = response.iter_encoded()
+        state_event = next(events).decode()
+        self.assertEqual(
+            f'event: state\ndata: {{"state":"{state}"}}\n\n',
+            state_event,
+        )
+
+        current_event = next(events).decode()
+        self.assertTrue(
+            current_event.startswith('event: current\ndata: {"delay":'),
+            current_event,
+        )
+
+    def test_stream_head(self) -> None:
+        subscribers = server.events.num_subscribers
+
+        for _ in range(3):
+            response = self.client.head('/stream')
+            response.close()
+            self.assertEqual(200, response.status_code)
+
+        self.assertEqual(subscribers, server.events.num_subscribers)
+
+    def test_compressed(self) -> None:
+        expected = self.client.get('/matches')
+
+        response = self.client.get('/matches', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual('gzip', response.content_encoding)
+        self.assertIn('Accept-Encoding', response.vary)
+        self.assertEqual(expected.data, gzip.decompress(response.data))
+        self.assertEqual(expected.headers['ETag'][:-1] + '-gzip"', response.headers['ETag'])
+
+        response = self.client.get('/matches', headers={
+            'Accept-Encoding': 'gzip',
+            'If-None-Match': response.headers['ETag'],
+        })
+        self.assertEqual(304, response.status_code)
+
+    def test_compressed_metrics(self) -> None:
+        hits = CACHE_REQUESTS.get('compressed', 'hit')
+        misses = CACHE_REQUESTS.get('compressed', 'miss')
+
+        # A query which no other test requests, so is not yet compressed
+        for _ in range(2):
+            response = self.client.get(
+                '/matches?num=0..5&type=league',
+                headers={'Accept-Encoding': 'gzip'},
+            )
+            self.assertEqual('gzip', response.content_encoding)
+
+        self.assertEqual(hits + 1, CACHE_REQUESTS.get('compressed', 'hit'))
+        self.assertEqual(misses + 1, CACHE_REQUESTS.get('compressed', 'miss'))
+
+    def test_compressed_not_accepted(self) -> None:
+        response = self.client.get('/matches', headers={'Accept-Encoding': 'identity'})
+
+        self.assertIsNone(response.content_encoding)
+        self.assertIn('Accept-Encoding', response.vary)
+
+    def test_small_response_not_compressed(self) -> None:
+        response = self.client.get('/state', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertIsNone(response.content_encoding)
+
+    def test_reloads(self) -> None:
+        # Ensure the compstate has been loaded
+        self.server_get('/state')
+
+        reloads = self.server_get('/reloads')['reloads']
+
+        self.assertGreaterEqual(len(reloads), 1)
+        latest = reloads[0]
+        self.assertEqual(self.server_get('/state')['state'], latest['state'])
+        self.assertIn('load', latest['phases'])
+        self.assertAlmostEqual(sum(latest['phases'].values()), latest['duration'])
+        self.assertIsInstance(latest['derived_phases'], dict)
+
+    def test_batch(self) -> None:
+        response = self.server_get(
+            '/batch?path=/state&path=/teams/CLF&path=/matches%3Fnum%3D0%26arena%3DA',
+        )
+
+        self.assertEqual(
+            [
+                {
+                    'path': '/state',
+                    'status': 200,
+                    'body': self.server_get('/state'),
+                },
+                {
+                    'path': '/teams/CLF',
+                    'status': 200,
+                    'body': self.server_get('/teams/CLF'),
+                },
+                {
+                    'path': '/matches?num=0&arena=A',
+                    'status': 200,
+                    'body': self.server_get('/matches?num=0&arena=A'),
+                },
+            ],
+            response['responses'],
+        )
+        self.assertEqual(self.server_get('/state')['state'], response['state'])
+
+    def test_batch_error(self) -> None:
+        response = self.server_get('/batch?path=/teams/BEES')
+
+        (result,) = response['responses']
+        self.assertEqual(404, result['status'])
+        self.assertEqual('NotFound', result['body']['error']['name'])
+
+    def test_batch_uses_one_snapshot(self) -> None:
+        with mock.patch.object(
+            server.comp_man,
+            'get_snapshot',
+            wraps=server.comp_man.get_snapshot,
+        ) as mock_get_snapshot:
+            self.server_get('/batch?path=/state&path=/teams&path=/current')
+
+        self.assertEqual(1, mock_get_snapshot.call_count)
+
+    def test_batch_not_cached(self) -> None:
+        response = self.client.get('/batch?path=/state')
+        self.assertNotIn('ETag', response.headers)
+
+    def test_batch_unbatchable(self) -> None:
+        with self.assertRaisesApiError('BadRequest', 400):
+            self.server_get('/batch?path=/stream')
+
+    def test_batch_bad_path(self) -> None:
+        with self.assertRaisesApiError('BadRequest', 400):
+            self.server_get('/batch?path=state')
+
+    def test_batch_redirect(self) -> None:
+        with self.assertRaisesApiError('BadRequest', 400):
+            self.server_get('/batch?path=/teams//CLF')
+
+    @mock.patch.dict(app.config, {'RESPONSE_CACHE_MAX_BYTES': 0})
+    def test_batch_non_json(self) -> None:
+        with mock.patch.dict(
+            app.view_functions,
+            {'state': lambda: app.response_class('text', mimetype='text/plain')},
+        ), self.assertRaisesApiError('BadRequest', 400):
+            self.server_get('/batch?path=/state')
+
+    def test_batch_too_large(self) -> None:
+        paths = '&'.join(['path=/state'] * (server.MAX_BATCH_SIZE + 1))
+        with self.assertRaisesApiError('BadRequest', 400):
+            self.server_get(f'/batch?{paths}')
+
+    def test_metrics(self) -> None:
+        before = server.REQUESTS.get('/arenas', '200')
+        self.client.get('/arenas')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('text/plain', response.mimetype)
+        self.assertEqual(before + 1, server.REQUESTS.get('/arenas', '200'))
+
+        body = response.get_data(as_text=True)
+        self.assertIn(
+            'srcomp_http_requests_total{route="/arenas",status="200"}',
+            body,
+        )
+        self.assertIn('srcomp_http_request_duration_seconds_bucket{route="/arenas"', body)
+        self.assertIn('srcomp_http_response_size_bytes_count{route="/arenas"}', body)
+        self.assertIn('srcomp_http_snapshot_age_seconds ', body)
+        self.assertIn('srcomp_http_reloads_total ', body)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os.path
+import unittest
+from typing import Any
+
+from sr.comp.http import app
+from sr.comp.http.asgi import AsgiApp, Message
+
+COMPSTATE = os.path.join(os.path.dirname(__file__), 'dummy')
+app.config['COMPSTATE'] = COMPSTATE
+
+
+def build_scope(
+    path: str,
+    query: bytes = b'',
+    method: str = 'GET',
+    root_path: str = '',
+) -> dict[str, Any]:
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query,
+        'root_path': root_path,
+        'headers': [(b'host', b'localhost'), (b'origin', b'http://example.com')],
+        'client': ('127.0.0.1', 1234),
+        'server': ('localhost', 80),
+    }
+
+
+class AsgiTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.asgi_app = AsgiApp(app, max_workers=2)
+        self.addCleanup(self.asgi_app.executor.shutdown)
+        self.flask_client = app.test_client()
+
+    def request(
+        self,
+        path: str,
+        query: bytes = b'',
+        root_path: str = '',
+    ) -> tuple[Message, bytes]:
+        sent: list[Message] = []
+
+        async def receive() -> Message:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        asyncio.run(self.asgi_app(
+            build_scope(path, query, root_path=root_path),
+            receive,
+            send,
+        ))
+
+        start, *bodies = sent
+        self.assertEqual('http.response.start', start['type'])
+        return start, b''.join(x['body'] for x in bodies)
+
+    def test_matches_flask(self) -> None:
+        start, body = self.request('/matches', b'arena=A&limit=2')
+
+        expected = self.flask_client.get('/matches?arena=A&limit=2')
+        self.assertEqual(expected.status_code, start['status'])
+        self.assertEqual(expected.data, body)
+
+        headers = dict(start['headers'])
+        self.assertEqual(b'application/json', headers[b'content-type'])
+        self.assertEqual(b'*', headers[b'access-control-allow-origin'])
+
+    def test_not_found(self) -> None:
+        start, body = self.request('/teams/BEES')
+
+        self.assertEqual(404, start['status'])
+        self.assertEqual('NotFound', json.loads(body)['error']['name'])
+
+    def test_root_path(self) -> None:
+        expected = self.flask_client.get('/matches?arena=A&limit=2')
+
+        # Servers differ in whether the path includes the root path
+        for path in ('/comp/matches', '/matches'):
+            with self.subTest(path=path):
+                start, body = self.request(path, b'arena=A&limit=2', root_path='/comp')
+                self.assertEqual(expected.status_code, start['status'])
+                self.assertEqual(expected.data, body)
+
+    def test_stream(self) -> None:
+        self.assertStream(build_scope('/stream'))
+
+    def test_stream_root_path(self) -> None:
+        self.assertStream(build_scope('/comp/stream', root_path='/comp'))
+
+    def assertStream(self, scope: dict[str, Any]) -> None:
+        state = self.flask_client.get('/state').json['state']  # type: ignore[index]
+        sent: list[Message] = []
+
+        async def run() -> None:
+            disconnect = asyncio.Event()
+
+            async def receive() -> Message:
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message: Message) -> None:
+                sent.append(message)
+                if len(sent) == 3:
+                    disconnect.set()
+
+            await asyncio.wait_for(
+                self.asgi_app(scope, receive, send),
+                timeout=10,
+            )
+
+        asyncio.run(run())
+
+        start, state_event, current_event = sent
+        self.assertEqual(200, start['status'])
+        self.assertEqual(
+            b'text/event-stream; charset=utf-8',
+            dict(start['headers'])[b'content-type'],
+        )
+        self.assertEqual(
+            f'event: state\ndata: {{"state":"{state}"}}\n\n'.encode(),
+            state_event['body'],
+        )
+        self.assertTrue(current_event['body'].startswith(b'event: current\n'))
+
+    def test_lifespan(self) -> None:
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent: list[Message] = []
+
+        async def receive() -> Message:
+            return messages.pop(0)
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        asyncio.run(self.asgi_app({'type': 'lifespan'}, receive, send))
+
+        self.assertEqual(
+            [
+                {'type': 'lifespan.startup.complete'},
+                {'type': 'lifespan.shutdown.complete'},
+            ],
+            sent,
+        )
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+from benchmarks.benchmark import (
+    benchmark_endpoints,
+    compare,
+    results_json,
+    run,
+    Timing,
+)
+from benchmarks.synthetic import generate, Scale
+from sr.comp.http import app
+
+
+class TimingTests(unittest.TestCase):
+    def test_from_durations(self) -> None:
+        timing = Timing.from_durations([3, 1, 2, 4])
+
+        self.assertEqual(4, timing.runs)
+        self.assertEqual(1, timing.minimum)
+        self.assertEqual(2.5, timing.median)
+        self.assertEqual(2.5, timing.mean)
+        self.assertAlmostEqual(3.85, timing.p95)
+
+    def test_from_single_duration(self) -> None:
+        self.assertEqual(Timing(1, 2, 2, 2, 2), Timing.from_durations([2]))
+
+
+class CompareTests(unittest.TestCase):
+    def test_compare(self) -> None:
+        previous = results_json(
+            {
+                'same': Timing.from_durations([1]),
+                'slower': Timing.from_durations([1]),
+            },
+            scale=None,
+        )
+
+        lines, slower = compare(previous, {
+            'same': Timing.from_durations([1.05]),
+            'slower': Timing.from_durations([1.5]),
+            'added': Timing.from_durations([1]),
+        })
+
+        self.assertEqual(
+            [
+                'same: 1000.00ms -> 1050.00ms (+5%)',
+                'slower: 1000.00ms -> 1500.00ms (+50%)',
+                'added: new',
+            ],
+            lines,
+        )
+        self.assertEqual(['slower'], slower)
+
+
+class BenchmarkTests(unittest.TestCase):
+    compstate_dir: tempfile.TemporaryDirectory[str]
+    compstate: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.compstate_dir = tempfile.TemporaryDirectory()
+        cls.compstate = cls.compstate_dir.name
+        generate(cls.compstate, Scale(teams=8, arenas=2, league_slots=4, knockout_teams=4))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.compstate_dir.cleanup()
+        super().tearDownClass()
+
+    def test_run(self) -> None:
+        timings = run(self.compstate, repeat=2, load_repeat=1)
+
+        self.assertEqual(1, timings['load_comp'].runs)
+        self.assertEqual(2, timings['match_json_info (all matches)'].runs)
+        self.assertIn('GET /matches (cold)', timings)
+        self.assertIn('GET /teams/{tla} (warm)', timings)
+
+    def test_restores_config(self) -> None:
+        previous = app.config.get('COMPSTATE')
+
+        benchmark_endpoints(self.compstate, repeat=1, endpoints=['/state'])
+
+        self.assertEqual(previous, app.config.get('COMPSTATE'))
+
+    def test_error(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, '404'):
+            benchmark_endpoints(self.compstate, repeat=1, endpoints=['/teams/BEES'])
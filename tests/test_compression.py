@@ -0,0 +1,55 @@
+import gzip
+import unittest
+
+from werkzeug.datastructures import Accept
+
+from sr.comp.http.compression import (
+    choose_encoding,
+    compress,
+    CompressedBodies,
+)
+
+
+class ChooseEncodingTests(unittest.TestCase):
+    def test_gzip(self) -> None:
+        self.assertEqual('gzip', choose_encoding(Accept([('gzip', 1)])))
+
+    def test_unsupported(self) -> None:
+        self.assertIsNone(choose_encoding(Accept([('compress', 1)])))
+
+    def test_none(self) -> None:
+        self.assertIsNone(choose_encoding(Accept()))
+
+
+class CompressTests(unittest.TestCase):
+    def test_gzip(self) -> None:
+        compressed = compress(b'body' * 100, 'gzip')
+
+        self.assertEqual(b'body' * 100, gzip.decompress(compressed))
+        self.assertEqual(compressed, compress(b'body' * 100, 'gzip'))
+
+    def test_unsupported(self) -> None:
+        with self.assertRaises(ValueError):
+            compress(b'body', 'compress')
+
+
+class CompressedBodiesTests(unittest.TestCase):
+    def test_get(self) -> None:
+        bodies = CompressedBodies(2)
+        bodies.add('key', 'gzip', b'gzipped')
+
+        self.assertEqual(b'gzipped', bodies.get('key', 'gzip'))
+        self.assertIsNone(bodies.get('key', 'br'))
+        self.assertIsNone(bodies.get('other', 'gzip'))
+
+    def test_evicts_least_recently_used(self) -> None:
+        bodies = CompressedBodies(2)
+        bodies.add('a', 'gzip', b'a')
+        bodies.add('b', 'gzip', b'b')
+        bodies.get('a', 'gzip')
+
+        bodies.add('c', 'gzip', b'c')
+
+        self.assertEqual(b'a', bodies.get('a', 'gzip'))
+        self.assertIsNone(bodies.get('b', 'gzip'))
+        self.assertEqual(b'c', bodies.get('c', 'gzip'))
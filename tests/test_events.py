@@ -0,0 +1,88 @@
+import threading
+import unittest
+
+from sr.comp.http.events import Broadcaster, format_event, HEARTBEAT
+
+
+class FormatEventTests(unittest.TestCase):
+    def test_single_line(self) -> None:
+        self.assertEqual(
+            b'event: state\ndata: {"state": "abc"}\n\n',
+            format_event('state', '{"state": "abc"}'),
+        )
+
+    def test_multiple_lines(self) -> None:
+        self.assertEqual(
+            b'event: current\ndata: {\ndata:   "a": 1\ndata: }\n\n',
+            format_event('current', '{\n  "a": 1\n}\n'),
+        )
+
+
+class BroadcasterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.produced = threading.Event()
+        self.finished = threading.Event()
+        self.publishes = 0
+
+    def producer(self, broadcaster: Broadcaster) -> None:
+        while True:
+            self.publishes += 1
+            broadcaster.publish('count', str(self.publishes))
+            self.produced.set()
+            if not broadcaster.wait(60):
+                self.finished.set()
+                return
+
+    def test_fan_out(self) -> None:
+        broadcaster = Broadcaster(self.producer)
+
+        first_subscription = broadcaster.subscribe()
+        self.addCleanup(first_subscription.close)
+        first = iter(first_subscription)
+        self.assertEqual(b'event: count\ndata: 1\n\n', next(first))
+
+        second_subscription = broadcaster.subscribe()
+        self.addCleanup(second_subscription.close)
+        second = iter(second_subscription)
+        # Replays the latest event to new subscribers
+        self.assertEqual(b'event: count\ndata: 1\n\n', next(second))
+
+        broadcaster.wake()
+        self.assertEqual(b'event: count\ndata: 2\n\n', next(first))
+        self.assertEqual(b'event: count\ndata: 2\n\n', next(second))
+
+        self.assertEqual(2, broadcaster.num_subscribers)
+
+    def test_stops_without_subscribers(self) -> None:
+        broadcaster = Broadcaster(self.producer)
+
+        subscription = broadcaster.subscribe()
+        self.assertTrue(self.produced.wait(5))
+
+        subscription.close()
+
+        self.assertTrue(self.finished.wait(5), "Producer should stop")
+        self.assertEqual(0, broadcaster.num_subscribers)
+
+    def test_heartbeat(self) -> None:
+        broadcaster = Broadcaster(self.producer, heartbeat_interval=0)
+
+        subscription = broadcaster.subscribe()
+        self.addCleanup(subscription.close)
+        messages = iter(subscription)
+        self.assertEqual(b'event: count\ndata: 1\n\n', next(messages))
+
+        self.assertEqual(HEARTBEAT, next(messages))
+
+    def test_drops_slow_subscribers(self) -> None:
+        broadcaster = Broadcaster(self.producer, max_pending=2)
+
+        subscription = broadcaster.subscribe()
+        self.assertTrue(self.produced.wait(5))
+
+        for _ in range(3):
+            broadcaster.publish('other', 'data')
+
+        self.assertEqual([], list(subscription))
+        self.assertEqual(0, broadcaster.num_subscribers)
@@ -0,0 +1,63 @@
+import unittest
+
+from sr.comp.http.query_utils import parse_fields, select_fields
+
+
+class ParseFieldsTests(unittest.TestCase):
+    def test_single(self) -> None:
+        self.assertEqual({'num': None}, parse_fields('num'))
+
+    def test_nested(self) -> None:
+        self.assertEqual(
+            {'num': None, 'times': {'slot': None, 'game': {'start': None}}},
+            parse_fields('num,times.slot,times.game.start'),
+        )
+
+    def test_whole_value_takes_precedence(self) -> None:
+        self.assertEqual({'times': None}, parse_fields('times.slot,times'))
+        self.assertEqual({'times': None}, parse_fields('times,times.slot'))
+
+    def test_empty_field(self) -> None:
+        for string in ('', 'num,', 'times.', '.slot', 'times..slot'):
+            with self.subTest(string=string):
+                with self.assertRaises(ValueError):
+                    parse_fields(string)
+
+
+class SelectFieldsTests(unittest.TestCase):
+    def test_select(self) -> None:
+        value = {
+            'num': 1,
+            'arena': 'A',
+            'times': {
+                'slot': {'start': 'a', 'end': 'b'},
+                'game': {'start': 'c', 'end': 'd'},
+            },
+        }
+
+        selected = select_fields(value, parse_fields('num,times.slot.start'))
+
+        self.assertEqual({'num': 1, 'times': {'slot': {'start': 'a'}}}, selected)
+
+    def test_list(self) -> None:
+        values = [{'num': 1, 'arena': 'A'}, {'num': 2, 'arena': 'B'}]
+
+        selected = select_fields(values, parse_fields('num'))
+
+        self.assertEqual([{'num': 1}, {'num': 2}], selected)
+
+    def test_missing_fields_omitted(self) -> None:
+        selected = select_fields({'num': 1}, parse_fields('num,scores.game'))
+
+        self.assertEqual({'num': 1}, selected)
+
+    def test_does_not_modify(self) -> None:
+        value = {'num': 1, 'times': {'slot': {'start': 'a', 'end': 'b'}}}
+
+        selected = select_fields(value, parse_fields('times.slot.start'))
+        selected['times']['slot']['start'] = 'changed'
+
+        self.assertEqual(
+            {'num': 1, 'times': {'slot': {'start': 'a', 'end': 'b'}}},
+            value,
+        )
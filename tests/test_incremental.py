@@ -0,0 +1,185 @@
+import os.path
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sr.comp.comp import SRComp
+from sr.comp.http.incremental import (
+    load_comp,
+    only_scores_changed,
+    reload_scores,
+    ScoreSheetCache,
+)
+from sr.comp.http.timing import PhaseTimer
+from sr.comp.types import MatchNumber
+
+COMPSTATE = os.path.join(os.path.dirname(__file__), 'dummy')
+
+
+class OnlyScoresChangedTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.root = Path(tempdir.name)
+
+        self.git('init', '-q')
+        self.write('teams.yaml', 'teams: {}')
+        self.write('league/A/A001.yaml', 'match_number: 1')
+        self.state = self.commit()
+
+    def git(self, *args: str) -> str:
+        return subprocess.check_output(
+            ('git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args),
+            cwd=self.root,
+            text=True,
+        )
+
+    def write(self, path: str, content: str) -> None:
+        full_path = self.root / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(content)
+
+    def commit(self) -> str:
+        self.git('add', '--all')
+        self.git('commit', '--quiet', '--message', 'Commit')
+        return self.git('rev-parse', 'HEAD').strip()
+
+    def test_no_changes(self) -> None:
+        self.assertTrue(only_scores_changed(str(self.root), self.state))
+
+    def test_committed_score(self) -> None:
+        self.write('league/A/A002.yaml', 'match_number: 2')
+        self.commit()
+
+        self.assertTrue(only_scores_changed(str(self.root), self.state))
+
+    def test_uncommitted_score(self) -> None:
+        self.write('knockout/A/A003.yaml', 'match_number: 3')
+
+        self.assertTrue(only_scores_changed(str(self.root), self.state))
+
+    def test_committed_other_change(self) -> None:
+        self.write('league/A/A002.yaml', 'match_number: 2')
+        self.write('teams.yaml', 'teams: {ABC: {name: ABC}}')
+        self.commit()
+
+        self.assertFalse(only_scores_changed(str(self.root), self.state))
+
+    def test_uncommitted_other_change(self) -> None:
+        self.write('teams.yaml', 'teams: {ABC: {name: ABC}}')
+
+        self.assertFalse(only_scores_changed(str(self.root), self.state))
+
+    def test_ignored_paths(self) -> None:
+        self.write('.update-pls', '')
+
+        self.assertFalse(only_scores_changed(str(self.root), self.state))
+        self.assertTrue(only_scores_changed(
+            str(self.root),
+            self.state,
+            ignore=['.update-pls'],
+        ))
+
+    def test_unknown_revision(self) -> None:
+        self.assertFalse(only_scores_changed(str(self.root), 'f' * 40))
+
+
+class ScoreSheetCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.root = Path(tempdir.name)
+        (self.root / 'A').mkdir()
+
+    def write(self, name: str, num: int) -> None:
+        path = self.root / 'A' / name
+        path.write_text(f'match_number: {num}')
+        # Ensure changes are visible regardless of timestamp resolution
+        os.utime(path, ns=(num, num))
+
+    def test_reuses_unchanged_sheets(self) -> None:
+        cache = ScoreSheetCache()
+        self.write('A001.yaml', 1)
+
+        cache.load(self.root)
+        with mock.patch('sr.comp.yaml_loader.load') as mock_load:
+            sheet, = cache.load(self.root)
+
+        self.assertEqual({'match_number': 1}, sheet)
+        self.assertFalse(mock_load.called, "Should not re-parse unchanged sheets")
+
+    def test_modified_sheets_not_shared(self) -> None:
+        cache = ScoreSheetCache()
+        self.write('A001.yaml', 1)
+
+        first, = cache.load(self.root)
+        first['match_number'] = MatchNumber(2)
+        second, = cache.load(self.root)
+
+        self.assertEqual({'match_number': 1}, second)
+
+    def test_reloads_changed_sheets(self) -> None:
+        cache = ScoreSheetCache()
+        self.write('A001.yaml', 1)
+        cache.load(self.root)
+
+        self.write('A001.yaml', 2)
+
+        self.assertEqual([{'match_number': 2}], cache.load(self.root))
+
+    def test_removed_sheets(self) -> None:
+        cache = ScoreSheetCache()
+        self.write('A001.yaml', 1)
+        cache.load(self.root)
+
+        (self.root / 'A' / 'A001.yaml').unlink()
+
+        self.assertEqual([], cache.load(self.root))
+
+
+class ReloadScoresTests(unittest.TestCase):
+    def test_matches_full_load(self) -> None:
+        comp = SRComp(COMPSTATE)
+
+        reloaded = reload_scores(comp, ScoreSheetCache())
+
+        self.assertIsNot(comp, reloaded)
+        self.assertEqual(comp.state, reloaded.state)
+        self.assertIs(comp.teams, reloaded.teams)
+        self.assertEqual(comp.scores.league.teams, reloaded.scores.league.teams)
+        self.assertEqual(comp.scores.league.positions, reloaded.scores.league.positions)
+        self.assertEqual(
+            comp.scores.last_scored_match,
+            reloaded.scores.last_scored_match,
+        )
+        self.assertEqual(comp.awards, reloaded.awards)
+        self.assertEqual(
+            [list(slot.values()) for slot in comp.schedule.matches],
+            [list(slot.values()) for slot in reloaded.schedule.matches],
+        )
+
+
+class LoadCompTests(unittest.TestCase):
+    def test_matches_full_load(self) -> None:
+        comp = SRComp(COMPSTATE)
+        timer = PhaseTimer()
+
+        loaded = load_comp(COMPSTATE, ScoreSheetCache(), timer)
+
+        self.assertEqual(vars(comp).keys(), vars(loaded).keys())
+        self.assertEqual(comp.state, loaded.state)
+        self.assertEqual(comp.teams, loaded.teams)
+        self.assertEqual(comp.scores.league.positions, loaded.scores.league.positions)
+        self.assertEqual(comp.awards, loaded.awards)
+        self.assertEqual(
+            [list(slot.values()) for slot in comp.schedule.matches],
+            [list(slot.values()) for slot in loaded.schedule.matches],
+        )
+        self.assertEqual(
+            {'parse', 'scoring', 'schedule', 'awards', 'venue'},
+            timer.phases.keys(),
+        )
@@ -1,7 +1,14 @@
+import datetime
+import json
 import unittest
 from enum import Enum
 
-from sr.comp.http.json_provider import JsonEncoder
+from sr.comp.http import json_provider
+from sr.comp.http.json_provider import (
+    COMPACT_SEPARATORS,
+    fast_dumps,
+    JsonEncoder,
+)
 
 
 class JsonTests(unittest.TestCase):
@@ -34,3 +41,72 @@ class JsonTests(unittest.TestCase):
         expected = f'"{val}"'
 
         self.assertEqual(expected, output)
+
+
+@unittest.skipIf(not json_provider.FAST_ENCODING_AVAILABLE, "orjson is not installed")
+class FastDumpsTests(unittest.TestCase):
+    def assertSameOutput(self, obj: object) -> None:
+        expected = json.dumps(
+            obj,
+            cls=JsonEncoder,  # type: ignore[arg-type]
+            sort_keys=True,
+            separators=COMPACT_SEPARATORS,
+        )
+        output = fast_dumps(obj, sort_keys=True, separators=COMPACT_SEPARATORS)
+        self.assertEqual(expected, output)
+
+    def test_simple(self) -> None:
+        self.assertSameOutput({
+            'b': [1, 2.5, None, True, False],
+            'a': {'nested': 'value'},
+            'c': '\t"quoted"\n',
+        })
+
+    def test_non_string_keys(self) -> None:
+        self.assertSameOutput({2: 'two', 10: 'ten', 'a': 'a'})
+
+    def test_enum(self) -> None:
+        class Thing(Enum):
+            yup = 'the-string-value'
+
+        self.assertSameOutput({'thing': Thing.yup})
+
+    def test_datetime(self) -> None:
+        self.assertSameOutput({
+            'when': datetime.datetime(2014, 4, 26, 13, 0, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2014, 4, 26),
+        })
+
+    def test_floats(self) -> None:
+        for value in (0.0, -0.0, 0.1, 1e-4, 1e15, 1e16, 1e-5, 1.5e-9, 1.5e300):
+            with self.subTest(value=value):
+                output = fast_dumps(value, separators=COMPACT_SEPARATORS)
+                if output is not None:
+                    expected = json.dumps(value, cls=JsonEncoder)  # type: ignore[arg-type]
+                    self.assertEqual(expected, output)
+
+    def test_exponent_falls_back(self) -> None:
+        self.assertIsNone(fast_dumps([1e16], separators=COMPACT_SEPARATORS))
+        self.assertIsNone(fast_dumps([1e-5], separators=COMPACT_SEPARATORS))
+
+    def test_non_finite_falls_back(self) -> None:
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.subTest(value=value):
+                self.assertIsNone(fast_dumps(
+                    {'a': [None, (1, value)]},
+                    separators=COMPACT_SEPARATORS,
+                ))
+
+    def test_null_without_non_finite(self) -> None:
+        self.assertSameOutput({'a': [None, 1.5]})
+
+    def test_non_ascii_falls_back(self) -> None:
+        self.assertIsNone(fast_dumps(['café'], separators=COMPACT_SEPARATORS))
+        self.assertIsNone(fast_dumps(['\x7f'], separators=COMPACT_SEPARATORS))
+
+    def test_unknown_type_falls_back(self) -> None:
+        self.assertIsNone(fast_dumps([object()], separators=COMPACT_SEPARATORS))
+
+    def test_other_options_fall_back(self) -> None:
+        self.assertIsNone(fast_dumps([1]))
+        self.assertIsNone(fast_dumps([1], indent=2))
@@ -1,8 +1,23 @@
 import os.path
+import tempfile
+import threading
+import time
 import unittest
 from unittest import mock
 
-from sr.comp.http.manager import LOCK_FILE, update_lock
+from sr.comp.http.incremental import ScoreSheetCache
+from sr.comp.http.manager import (
+    load_shared_comp,
+    LOCK_FILE,
+    Snapshot,
+    SRCompManager,
+    touch_update_file,
+    update_lock,
+    update_pls_path,
+)
+from sr.comp.http.metrics import CACHE_REQUESTS
+from sr.comp.http.timing import PhaseTimer
+from sr.comp.http.watcher import InotifyWatcher, PollingWatcher, UpdateWatcher
 
 
 class ManagerTests(unittest.TestCase):
@@ -58,3 +73,447 @@ class ManagerTests(unittest.TestCase):
                 mock_touch.called,
                 "Should not touch the update file on failure",
             )
+
+
+class FakeComp:
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+
+class SharedSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        compstate = tempfile.TemporaryDirectory()
+        self.addCleanup(compstate.cleanup)
+        self.compstate = compstate.name
+
+        snapshots = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshots.cleanup)
+        self.snapshots = snapshots.name
+
+        patcher = mock.patch('sr.comp.http.manager.SRComp', side_effect=FakeComp)
+        self.mock_srcomp = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.revision: str | None = 'abc123'
+        patcher = mock.patch(
+            'sr.comp.http.manager._compstate_revision',
+            side_effect=lambda _: self.revision,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def touch(self, mtime: int) -> None:
+        touch_update_file(self.compstate)
+        os.utime(update_pls_path(self.compstate), (mtime, mtime))
+
+    def test_no_update_file(self) -> None:
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertEqual(2, self.mock_srcomp.call_count)
+        self.assertEqual([], os.listdir(self.snapshots))
+
+    def test_reuses_snapshot(self) -> None:
+        self.touch(1)
+
+        first = load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+        second = load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.mock_srcomp.assert_called_once_with(self.compstate)
+        self.assertIsInstance(second, FakeComp)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.compstate, second.root)
+
+    def test_reuse_takes_shared_lock(self) -> None:
+        self.touch(1)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        with mock.patch(
+            'sr.comp.http.manager.exclusive_lock',
+        ) as mock_excl_lock:
+            load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertFalse(
+            mock_excl_lock.called,
+            "Should not take an exclusive lock to read a snapshot",
+        )
+        self.mock_srcomp.assert_called_once_with(self.compstate)
+
+    def test_stored_while_waiting(self) -> None:
+        self.touch(1)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        # As if another process stored the snapshot between the shared and
+        # exclusive locks
+        with mock.patch(
+            'sr.comp.http.manager._read_shared_snapshot',
+            side_effect=[None, FakeComp(self.compstate)],
+        ):
+            load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.mock_srcomp.assert_called_once_with(self.compstate)
+
+    def test_update_invalidates_snapshot(self) -> None:
+        self.touch(1)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.touch(2)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertEqual(2, self.mock_srcomp.call_count)
+
+    def test_commit_invalidates_snapshot(self) -> None:
+        self.touch(1)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        # Changed without touching the update file
+        self.revision = 'def456'
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertEqual(2, self.mock_srcomp.call_count)
+
+    def test_library_version_invalidates_snapshot(self) -> None:
+        self.touch(1)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        with mock.patch(
+            'sr.comp.http.manager._library_versions',
+            return_value='sr.comp=0.0.0',
+        ):
+            load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertEqual(2, self.mock_srcomp.call_count)
+
+    def test_not_a_repository(self) -> None:
+        self.touch(1)
+        self.revision = None
+
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertEqual(2, self.mock_srcomp.call_count)
+        self.assertEqual([], os.listdir(self.snapshots))
+
+    def test_public_directory(self) -> None:
+        self.touch(1)
+        os.chmod(self.snapshots, 0o777)
+
+        with self.assertLogs(level='WARNING'):
+            load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertEqual(2, self.mock_srcomp.call_count)
+        self.assertEqual([], os.listdir(self.snapshots))
+
+    def test_public_snapshot(self) -> None:
+        self.touch(1)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        (snapshot,) = (x for x in os.listdir(self.snapshots) if x.endswith('.snapshot'))
+        os.chmod(os.path.join(self.snapshots, snapshot), 0o666)
+        load_shared_comp(self.compstate, self.snapshots, self.mock_srcomp)
+
+        self.assertEqual(2, self.mock_srcomp.call_count)
+
+
+class SnapshotTests(unittest.TestCase):
+    def test_cached(self) -> None:
+        snapshot = Snapshot(mock.Mock())
+        factory = mock.Mock(return_value='value')
+
+        self.assertEqual('value', snapshot.cached('cache', 'key', factory))
+        self.assertEqual('value', snapshot.cached('cache', 'key', factory))
+
+        factory.assert_called_once_with()
+
+    def test_cached_metrics(self) -> None:
+        snapshot = Snapshot(mock.Mock())
+        misses = CACHE_REQUESTS.get('test-cache', 'miss')
+        hits = CACHE_REQUESTS.get('test-cache', 'hit')
+
+        snapshot.cached('test-cache', 'key', lambda: 'value')
+        snapshot.cached('test-cache', 'key', lambda: 'value')
+
+        self.assertEqual(misses + 1, CACHE_REQUESTS.get('test-cache', 'miss'))
+        self.assertEqual(hits + 1, CACHE_REQUESTS.get('test-cache', 'hit'))
+
+    def test_cached_uncounted(self) -> None:
+        snapshot = Snapshot(mock.Mock())
+        misses = CACHE_REQUESTS.get('test-uncounted', 'miss')
+        hits = CACHE_REQUESTS.get('test-uncounted', 'hit')
+
+        snapshot.cached('test-uncounted', 'key', lambda: 'value', counted=False)
+        snapshot.cached('test-uncounted', 'key', lambda: 'value', counted=False)
+
+        self.assertEqual(misses, CACHE_REQUESTS.get('test-uncounted', 'miss'))
+        self.assertEqual(hits, CACHE_REQUESTS.get('test-uncounted', 'hit'))
+
+    def test_cached_distinct_keys(self) -> None:
+        snapshot = Snapshot(mock.Mock())
+
+        self.assertEqual(1, snapshot.cached('cache', 'a', lambda: 1))
+        self.assertEqual(2, snapshot.cached('cache', 'b', lambda: 2))
+        self.assertEqual(3, snapshot.cached('other', 'a', lambda: 3))
+
+
+class FakeWatcher(UpdateWatcher):
+    touched = False
+
+    def changed(self) -> bool:
+        touched, self.touched = self.touched, False
+        return touched
+
+
+class SRCompManagerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.watcher = FakeWatcher('update-pls')
+        self.loads: list[threading.Event] = []
+        self.load_count = 0
+
+        def fake_srcomp(root_dir: str) -> mock.Mock:
+            self.load_count += 1
+            for event in self.loads:
+                event.wait(timeout=5)
+            return mock.Mock(name=f'SRComp-{self.load_count}')
+
+        def fake_load_comp(
+            root_dir: str,
+            sheets: ScoreSheetCache,
+            timer: PhaseTimer,
+        ) -> mock.Mock:
+            with timer.phase('parse'):
+                return fake_srcomp(root_dir)
+
+        for target, kwargs in (
+            ('sr.comp.http.manager.SRComp', {'side_effect': fake_srcomp}),
+            ('sr.comp.http.manager.load_comp', {'side_effect': fake_load_comp}),
+            ('sr.comp.http.manager.share_lock', {}),
+            ('sr.comp.http.manager.create_update_watcher', {'return_value': self.watcher}),
+        ):
+            patcher = mock.patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.manager = SRCompManager()
+
+    def make_stale(self) -> None:
+        self.watcher.touched = True
+
+    def wait_for_reload(self) -> None:
+        # The thread is started before `get_comp` returns, though may already
+        # have completed by now.
+        reload_thread = self.manager._reload_thread
+        if reload_thread is not None:
+            reload_thread.join(timeout=5)
+
+    def test_initial_load(self) -> None:
+        comp = self.manager.get_comp()
+
+        self.assertEqual(1, self.load_count)
+        self.assertIs(comp, self.manager.get_comp())
+        self.assertEqual(1, self.load_count, "Should not reload an unchanged state")
+
+    def test_reload_info(self) -> None:
+        comp = self.manager.get_comp()
+        self.make_stale()
+        self.manager.get_comp()
+
+        self.assertEqual(2, len(self.manager.reloads))
+        info = self.manager.reloads[0]
+        self.assertEqual(comp.state, info['state'])
+        self.assertEqual({'lock_wait', 'load'}, info['phases'].keys())
+
+    def test_reload_info_incremental(self) -> None:
+        self.manager.incremental_reload = True
+
+        self.manager.get_comp()
+
+        info = self.manager.reloads[-1]
+        self.assertEqual({'lock_wait', 'parse'}, info['phases'].keys())
+
+    def test_reload_info_excludes_derived_work(self) -> None:
+        self.manager.get_comp()
+        info = self.manager.reloads[-1]
+        phases = dict(info['phases'])
+
+        with self.manager.get_snapshot().timer.phase('prerender'):
+            pass
+
+        self.assertEqual(phases, info['phases'])
+        self.assertEqual({'prerender'}, info['derived_phases'].keys())
+
+    def test_reload_listener(self) -> None:
+        listener = mock.Mock()
+        self.manager.add_reload_listener(listener)
+
+        self.manager.get_comp()
+
+        listener.assert_called_once_with(self.manager.reloads[-1])
+
+    def test_failing_reload_listener(self) -> None:
+        self.manager.add_reload_listener(mock.Mock(side_effect=ValueError))
+
+        with self.assertLogs(level='ERROR'):
+            comp = self.manager.get_comp()
+
+        self.assertEqual(1, self.load_count)
+        self.assertIsNotNone(comp)
+
+    def test_inline_reload(self) -> None:
+        old_comp = self.manager.get_comp()
+        self.make_stale()
+
+        new_comp = self.manager.get_comp()
+
+        self.assertEqual(2, self.load_count)
+        self.assertIsNot(old_comp, new_comp)
+
+    def test_background_reload(self) -> None:
+        self.manager.background_reload = True
+        old_comp = self.manager.get_comp()
+        self.make_stale()
+
+        release = threading.Event()
+        self.loads.append(release)
+
+        # The reload is in progress, so requests keep getting the old instance
+        # and no further loads are started.
+        for _ in range(3):
+            self.assertIs(old_comp, self.manager.get_comp())
+        self.assertEqual(2, self.load_count)
+
+        reload_thread = self.manager._reload_thread
+        assert reload_thread is not None
+        release.set()
+        reload_thread.join(timeout=5)
+
+        self.assertIsNot(old_comp, self.manager.get_comp())
+        self.assertEqual(2, self.load_count)
+
+    def test_background_reload_failure(self) -> None:
+        self.manager.background_reload = True
+        old_comp = self.manager.get_comp()
+        self.make_stale()
+
+        with mock.patch(
+            'sr.comp.http.manager.SRComp',
+            side_effect=ValueError("Bad compstate"),
+        ), self.assertLogs(level='ERROR'):
+            self.manager.get_comp()
+            self.wait_for_reload()
+
+        self.assertIs(old_comp, self.manager.get_comp())
+
+        # The failed load should be retried on the next update
+        release = threading.Event()
+        self.loads.append(release)
+        self.make_stale()
+        self.manager.get_comp()
+        reload_thread = self.manager._reload_thread
+        assert reload_thread is not None
+        release.set()
+        reload_thread.join(timeout=5)
+
+        self.assertEqual(2, self.load_count)
+        self.assertIsNot(old_comp, self.manager.get_comp())
+
+    def test_reload_replaces_snapshot(self) -> None:
+        old_snapshot = self.manager.get_snapshot()
+        old_snapshot.cached('cache', 'key', lambda: 'old')
+        self.make_stale()
+
+        new_snapshot = self.manager.get_snapshot()
+
+        self.assertIsNot(old_snapshot, new_snapshot)
+        self.assertEqual('new', new_snapshot.cached('cache', 'key', lambda: 'new'))
+
+    def test_change_of_root_dir(self) -> None:
+        old_comp = self.manager.get_comp()
+
+        self.manager.root_dir = 'elsewhere'
+
+        self.assertIsNot(old_comp, self.manager.get_comp())
+        self.assertEqual(2, self.load_count)
+
+    def test_concurrent_initial_load_is_single_flight(self) -> None:
+        release = threading.Event()
+        self.loads.append(release)
+
+        results: list[object] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.manager.get_comp()))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(1, self.load_count)
+        self.assertEqual(5, len(results))
+        self.assertEqual(1, len(set(map(id, results))))
+
+
+class WatcherTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.compstate = tempdir.name
+        self.update_path = update_pls_path(self.compstate)
+
+    def wait_for_change(self, watcher: UpdateWatcher) -> bool:
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if watcher.changed():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_polling(self) -> None:
+        watcher = PollingWatcher(self.update_path, interval=0)
+
+        self.assertFalse(watcher.changed())
+
+        touch_update_file(self.compstate)
+        # Ensure the modification time differs
+        os.utime(self.update_path, (0, 0))
+
+        self.assertTrue(watcher.changed())
+        self.assertFalse(watcher.changed())
+
+    def test_polling_interval(self) -> None:
+        watcher = PollingWatcher(self.update_path, interval=60)
+
+        touch_update_file(self.compstate)
+
+        self.assertFalse(watcher.changed(), "Should not check within the interval")
+
+    def test_inotify(self) -> None:
+        watcher = InotifyWatcher(self.update_path)
+        self.addCleanup(watcher.close)
+
+        self.assertFalse(watcher.changed())
+
+        touch_update_file(self.compstate)
+
+        self.assertTrue(self.wait_for_change(watcher))
+        self.assertFalse(watcher.changed())
+
+    def test_inotify_ignores_other_files(self) -> None:
+        watcher = InotifyWatcher(self.update_path)
+        self.addCleanup(watcher.close)
+
+        open(os.path.join(self.compstate, 'other'), 'w').close()
+        touch_update_file(self.compstate)
+
+        self.assertTrue(self.wait_for_change(watcher))
+        self.assertFalse(watcher.changed())
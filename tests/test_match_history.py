@@ -0,0 +1,50 @@
+import unittest
+
+from sr.comp.http.match_history import diff_matches, MatchHistory
+from sr.comp.types import ArenaName, MatchNumber
+
+MATCH_A0 = (ArenaName('A'), MatchNumber(0))
+MATCH_B0 = (ArenaName('B'), MatchNumber(0))
+MATCH_A1 = (ArenaName('A'), MatchNumber(1))
+
+
+class DiffMatchesTests(unittest.TestCase):
+    def test_unchanged(self) -> None:
+        digests = {MATCH_A0: b'a', MATCH_B0: b'b'}
+
+        self.assertEqual(([], []), diff_matches(digests, dict(digests)))
+
+    def test_changes(self) -> None:
+        old = {MATCH_A0: b'a', MATCH_B0: b'b'}
+        new = {MATCH_A0: b'changed', MATCH_A1: b'c'}
+
+        self.assertEqual(
+            ([MATCH_A0, MATCH_A1], [MATCH_B0]),
+            diff_matches(old, new),
+        )
+
+    def test_from_nothing(self) -> None:
+        self.assertEqual(
+            ([MATCH_A0, MATCH_B0], []),
+            diff_matches({}, {MATCH_A0: b'a', MATCH_B0: b'b'}),
+        )
+
+
+class MatchHistoryTests(unittest.TestCase):
+    def test_get(self) -> None:
+        history = MatchHistory(2)
+        history.add('abc', {MATCH_A0: b'a'})
+
+        self.assertEqual({MATCH_A0: b'a'}, history.get('abc'))
+        self.assertIsNone(history.get('def'))
+
+    def test_evicts_least_recently_used(self) -> None:
+        history = MatchHistory(2)
+        history.add('abc', {})
+        history.add('def', {})
+        history.get('abc')
+        history.add('ghi', {})
+
+        self.assertIsNotNone(history.get('abc'))
+        self.assertIsNone(history.get('def'))
+        self.assertIsNotNone(history.get('ghi'))
@@ -0,0 +1,216 @@
+import datetime
+import unittest
+from typing import Any
+from unittest import mock
+
+from sr.comp.http.match_index import IntervalIndex, MatchIndex, SortedIndex
+from sr.comp.match_period import Match, MatchType
+from sr.comp.types import ArenaName, MatchNumber, TLA
+
+START = datetime.datetime(2014, 4, 26, 13, 0, tzinfo=datetime.timezone.utc)
+SLOT = datetime.timedelta(minutes=5)
+
+
+def build_match(num: int, arena: str, teams: list[TLA | None]) -> Match:
+    return Match(
+        num=MatchNumber(num),
+        display_name=f'Match {num}',
+        arena=ArenaName(arena),
+        teams=teams,
+        start_time=START + SLOT * num,
+        end_time=START + SLOT * (num + 1),
+        type=MatchType.league if num < 3 else MatchType.knockout,
+        use_resolved_ranking=False,
+    )
+
+
+class SortedIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.index = SortedIndex([(3, 0), (1, 1), (2, 2), (1, 3)])
+
+    def test_exact(self) -> None:
+        self.assertEqual([1, 3], sorted(self.index.between(1, 1)))
+
+    def test_lower(self) -> None:
+        self.assertEqual([0, 2], sorted(self.index.between(2, None)))
+
+    def test_upper(self) -> None:
+        self.assertEqual([1, 2, 3], sorted(self.index.between(None, 2)))
+
+    def test_missing(self) -> None:
+        self.assertEqual([], self.index.between(4, 5))
+
+
+class IntervalIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.entries = [
+            (START, START + SLOT, 0),
+            (START + SLOT * 2, START + SLOT * 3, 1),
+            (START, START + SLOT * 4, 2),
+        ]
+
+    def test_containing(self) -> None:
+        index = IntervalIndex(self.entries)
+
+        self.assertEqual([0, 2], index.containing(START))
+        self.assertEqual([0, 2], index.containing(START + SLOT))
+        self.assertEqual([1, 2], index.containing(START + SLOT * 2.5))
+        self.assertEqual([], index.containing(START + SLOT * 5))
+        self.assertEqual([], index.containing(START - SLOT))
+
+    def test_exclusive_end(self) -> None:
+        index = IntervalIndex(self.entries, inclusive_end=False)
+
+        self.assertEqual([2], index.containing(START + SLOT))
+
+    def test_empty(self) -> None:
+        self.assertEqual([], IntervalIndex([]).containing(START))
+
+
+class MatchIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.matches = [
+            {
+                'A': build_match(num, 'A', [TLA('AAA'), None, TLA('BBB'), None]),
+                'B': build_match(num, 'B', [TLA('CCC'), TLA('DDD'), None, None]),
+            }
+            for num in range(4)
+        ]
+
+        comp = mock.Mock()
+        comp.schedule.matches = self.matches
+        comp.schedule.match_slot_lengths = {
+            'pre': datetime.timedelta(seconds=90),
+            'match': datetime.timedelta(seconds=180),
+        }
+        comp.schedule.get_staging_times = self.get_staging_times
+        comp.schedule.delays = []
+        comp.schedule.match_periods = []
+        self.index = MatchIndex(comp)
+
+    def get_staging_times(self, match: Match) -> dict[str, Any]:
+        return {
+            'opens': match.start_time - datetime.timedelta(minutes=4),
+            'closes': match.start_time - datetime.timedelta(minutes=1),
+            'signal_shepherds': (
+                {'Blue': match.start_time - datetime.timedelta(minutes=6)}
+                if match.arena == 'A'
+                else {}
+            ),
+        }
+
+    def test_no_criteria(self) -> None:
+        self.assertEqual(
+            [match for slot in self.matches for match in slot.values()],
+            self.index.select({}),
+        )
+
+    def test_intersection(self) -> None:
+        self.assertEqual(
+            [self.matches[1]['B'], self.matches[2]['B']],
+            self.index.select({'num': [(1, 2)], 'arena': [('B', 'B')]}),
+        )
+
+    def test_union(self) -> None:
+        self.assertEqual(
+            [self.matches[0]['A'], self.matches[3]['A']],
+            self.index.select({'num': [(0, 0), (3, None)], 'arena': [('A', 'A')]}),
+        )
+
+    def test_team(self) -> None:
+        self.assertEqual(
+            [self.matches[num]['B'] for num in range(4)],
+            self.index.select({'team': [('DDD', 'DDD')]}),
+        )
+
+    def test_type(self) -> None:
+        self.assertEqual(
+            list(self.matches[3].values()),
+            self.index.select({'type': [('knockout', 'knockout')]}),
+        )
+
+    def test_game_start_time(self) -> None:
+        game_start = START + SLOT + datetime.timedelta(seconds=90)
+
+        self.assertEqual(
+            list(self.matches[1].values()),
+            self.index.select({'game_start_time': [(game_start, game_start)]}),
+        )
+
+    def test_no_matches(self) -> None:
+        self.assertEqual(
+            [],
+            self.index.select({'num': [(1, 1)], 'team': [('EEE', 'EEE')]}),
+        )
+
+    def test_start_and_limit(self) -> None:
+        self.assertEqual(
+            [self.matches[1]['A'], self.matches[1]['B'], self.matches[2]['A']],
+            self.index.select({}, start=2, limit=3),
+        )
+        self.assertEqual(
+            [self.matches[2]['B'], self.matches[3]['B']],
+            self.index.select({'arena': [('B', 'B')]}, start=4, limit=5),
+        )
+
+    def test_start_after(self) -> None:
+        self.assertEqual(4, self.index.start_after(ArenaName('B'), MatchNumber(1)))
+
+    def test_start_after_missing_match(self) -> None:
+        self.assertEqual(4, self.index.start_after(ArenaName('C'), MatchNumber(1)))
+        self.assertEqual(8, self.index.start_after(ArenaName('A'), MatchNumber(10)))
+
+    def test_slots(self) -> None:
+        self.assertEqual(
+            list(self.matches[1].values()),
+            self.index.at(self.index.slots, START + SLOT),
+        )
+
+    def test_staging(self) -> None:
+        self.assertEqual(
+            list(self.matches[2].values()),
+            self.index.at(self.index.staging, START + SLOT * 2 - SLOT / 2),
+        )
+
+    def test_staging_closes(self) -> None:
+        closes = START + SLOT * 2 - datetime.timedelta(minutes=1)
+
+        self.assertEqual(
+            list(self.matches[2].values()),
+            self.index.at(self.index.staging, closes),
+        )
+
+    def test_shepherding(self) -> None:
+        self.assertEqual(
+            [self.matches[2]['A']],
+            self.index.at(self.index.shepherding, START + SLOT * 2 - SLOT / 2),
+        )
+
+    def test_shepherding_overlap(self) -> None:
+        closes = START + SLOT * 2 - datetime.timedelta(minutes=1)
+
+        self.assertEqual(
+            [self.matches[2]['A'], self.matches[3]['A']],
+            self.index.at(self.index.shepherding, closes),
+        )
+
+    def test_window(self) -> None:
+        window, next_transition = self.index.window(START + SLOT / 2)
+
+        # Shepherding for match 2 starts next
+        self.assertEqual(START + SLOT * 2 - datetime.timedelta(minutes=6), next_transition)
+        self.assertEqual(
+            (window, next_transition),
+            self.index.window(START + SLOT * 0.7),
+        )
+        assert next_transition is not None
+        self.assertNotEqual(window, self.index.window(next_transition)[0])
+
+    def test_window_after_end(self) -> None:
+        _, next_transition = self.index.window(START + SLOT * 10)
+
+        self.assertIsNone(next_transition)
@@ -0,0 +1,92 @@
+import unittest
+
+from sr.comp.http.metrics import Registry
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.registry = Registry()
+
+    def test_counter(self) -> None:
+        counter = self.registry.counter('things_total', "Things.", ('kind',))
+
+        counter.inc('b')
+        counter.inc('a', amount=2)
+        counter.inc('b')
+
+        self.assertEqual(2, counter.get('b'))
+        self.assertEqual(0, counter.get('c'))
+        self.assertEqual(
+            '# HELP things_total Things.\n'
+            '# TYPE things_total counter\n'
+            'things_total{kind="a"} 2\n'
+            'things_total{kind="b"} 2\n',
+            self.registry.exposition(),
+        )
+
+    def test_counter_wrong_labels(self) -> None:
+        counter = self.registry.counter('things_total', "Things.", ('kind',))
+
+        with self.assertRaises(ValueError):
+            counter.inc()
+
+    def test_label_escaping(self) -> None:
+        counter = self.registry.counter('things_total', "Things.", ('kind',))
+
+        counter.inc('a"b\\c\n')
+
+        self.assertIn(
+            'things_total{kind="a\\"b\\\\c\\n"} 1\n',
+            self.registry.exposition(),
+        )
+
+    def test_histogram(self) -> None:
+        histogram = self.registry.histogram('sizes', "Sizes.", (10, 1))
+
+        histogram.observe(0.5)
+        histogram.observe(1)
+        histogram.observe(5)
+        histogram.observe(20.5)
+
+        self.assertEqual(
+            '# HELP sizes Sizes.\n'
+            '# TYPE sizes histogram\n'
+            'sizes_bucket{le="1"} 2\n'
+            'sizes_bucket{le="10"} 3\n'
+            'sizes_bucket{le="+Inf"} 4\n'
+            'sizes_sum 27\n'
+            'sizes_count 4\n',
+            self.registry.exposition(),
+        )
+
+    def test_histogram_labels(self) -> None:
+        histogram = self.registry.histogram('sizes', "Sizes.", (1,), ('route',))
+
+        histogram.observe(0.25, '/a')
+
+        self.assertEqual(
+            '# HELP sizes Sizes.\n'
+            '# TYPE sizes histogram\n'
+            'sizes_bucket{route="/a",le="1"} 1\n'
+            'sizes_bucket{route="/a",le="+Inf"} 1\n'
+            'sizes_sum{route="/a"} 0.25\n'
+            'sizes_count{route="/a"} 1\n',
+            self.registry.exposition(),
+        )
+
+    def test_gauge(self) -> None:
+        values = [None, 1.5]
+        self.registry.gauge('age', "Age.", values.pop)
+
+        self.assertEqual(
+            '# HELP age Age.\n'
+            '# TYPE age gauge\n'
+            'age 1.5\n',
+            self.registry.exposition(),
+        )
+        self.assertEqual(
+            '# HELP age Age.\n'
+            '# TYPE age gauge\n',
+            self.registry.exposition(),
+        )
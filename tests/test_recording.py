@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os.path
+import tempfile
+import unittest
+
+from sr.comp.http.recording import (
+    read_recording,
+    RecordedRequest,
+    RequestRecorder,
+)
+
+
+class RequestRecorderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'requests.jsonl')
+
+    def record(self, recorder: RequestRecorder, arrival: float, path: str) -> None:
+        recorder.record(
+            arrival=arrival,
+            method='GET',
+            path=path,
+            query='a=1',
+            accept_encoding='gzip',
+            route=path,
+            status=200,
+            duration=0.5,
+        )
+
+    def test_record(self) -> None:
+        recorder = RequestRecorder(self.path)
+        self.record(recorder, 100, '/teams')
+        self.record(recorder, 102.5, '/matches')
+        recorder.close()
+
+        first, _ = read_recording(self.path)
+        self.assertEqual(
+            RecordedRequest(100, None, 'GET', '/teams', 'a=1', 'gzip', '/teams', 200, 0.5),
+            first,
+        )
+        self.assertEqual(
+            [
+                (100, None, '/teams'),
+                (102.5, 2.5, '/matches'),
+            ],
+            [(x.time, x.interval, x.path) for x in read_recording(self.path)],
+        )
+
+    def test_appends(self) -> None:
+        for arrival in (100, 101):
+            recorder = RequestRecorder(self.path)
+            self.record(recorder, arrival, '/teams')
+            recorder.close()
+
+        self.assertEqual(
+            [(100, None), (101, None)],
+            [(x.time, x.interval) for x in read_recording(self.path)],
+        )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+from benchmarks.replay import (
+    HttpTarget,
+    InProcessTarget,
+    percentile,
+    replay,
+    Result,
+    summarise,
+)
+from sr.comp.http.recording import RecordedRequest
+
+
+def make_request(time: float, path: str, query: str = '') -> RecordedRequest:
+    return RecordedRequest(
+        time=time,
+        interval=None,
+        method='GET',
+        path=path,
+        query=query,
+        accept_encoding='gzip',
+        route=path,
+        status=200,
+        duration=0.01,
+    )
+
+
+def make_app() -> Flask:
+    app = Flask(__name__)
+
+    @app.route('/echo')
+    def echo() -> str:
+        return f"{request.args['value']} {request.headers['Accept-Encoding']}"
+
+    return app
+
+
+class ReplayTests(unittest.TestCase):
+    def test_replay(self) -> None:
+        sent = []
+
+        def send(recorded: RecordedRequest) -> int:
+            sent.append(recorded.path)
+            if recorded.path == '/error':
+                raise OSError("Connection refused")
+            return 200
+
+        results = replay(
+            [
+                make_request(1002, '/error'),
+                make_request(1000, '/teams'),
+                make_request(1001, '/stream'),
+            ],
+            send,
+            speed=100,
+            workers=1,
+        )
+
+        self.assertEqual(['/teams', '/error'], sent)
+        self.assertEqual(['/teams', '/error'], [x.route for x in results])
+        self.assertEqual([200, None], [x.status for x in results])
+        self.assertGreaterEqual(results[1].latency, 0)
+
+    def test_replay_scaled(self) -> None:
+        times = []
+
+        def send(recorded: RecordedRequest) -> int:
+            times.append(recorded.time)
+            return 200
+
+        replay(
+            [make_request(1000, '/teams'), make_request(1000.1, '/teams')],
+            send,
+            speed=0,
+        )
+
+        self.assertEqual(2, len(times))
+
+    def test_percentile(self) -> None:
+        values = [float(x) for x in range(1, 11)]
+
+        self.assertEqual(5, percentile(values, 0.5))
+        self.assertEqual(9, percentile(values, 0.9))
+        self.assertEqual(10, percentile(values, 0.99))
+        self.assertEqual(1, percentile(values, 0))
+
+    def test_summarise(self) -> None:
+        (summary,) = summarise([
+            Result('/teams', 200, 0.2, 0),
+            Result('/teams', 500, 0.1, 0),
+            Result('/teams', None, 0.3, 0),
+        ])
+
+        self.assertEqual('/teams', summary.route)
+        self.assertEqual(3, summary.requests)
+        self.assertEqual(2, summary.errors)
+        self.assertEqual(0.2, summary.percentiles[0.5])
+        self.assertEqual(0.3, summary.maximum)
+
+
+class TargetTests(unittest.TestCase):
+    def test_in_process(self) -> None:
+        send = InProcessTarget(make_app())
+        self.assertEqual(200, send(make_request(0, '/echo', 'value=1')))
+        self.assertEqual(404, send(make_request(0, '/missing')))
+
+    def test_http(self) -> None:
+        server = make_server('127.0.0.1', 0, make_app(), threaded=True)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.shutdown)
+
+        send = HttpTarget(f'http://127.0.0.1:{server.port}/')
+        self.assertEqual(200, send(make_request(0, '/echo', 'value=1')))
+        self.assertEqual(404, send(make_request(0, '/missing')))
+
+    def test_http_bad_url(self) -> None:
+        with self.assertRaises(ValueError):
+            HttpTarget('https://example.com')
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from sr.comp.http.response_cache import CachedResponse, ResponseCache
+
+
+def make_entry(body: bytes) -> CachedResponse:
+    return CachedResponse(200, [('Content-Type', 'application/json')], body)
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_miss_then_hit(self) -> None:
+        cache = ResponseCache(100)
+
+        entry, should_add = cache.lookup('a')
+        self.assertIsNone(entry)
+        self.assertTrue(should_add)
+
+        cache.add('a', make_entry(b'1234'))
+
+        entry, should_add = cache.lookup('a')
+        self.assertEqual(make_entry(b'1234'), entry)
+        self.assertFalse(should_add)
+        self.assertEqual(4, cache.size)
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = ResponseCache(10)
+        cache.add('a', make_entry(b'aaaa'))
+        cache.add('b', make_entry(b'bbbb'))
+        cache.lookup('a')
+        cache.add('c', make_entry(b'cccc'))
+
+        self.assertEqual(make_entry(b'aaaa'), cache.lookup('a')[0])
+        self.assertEqual(make_entry(b'cccc'), cache.lookup('c')[0])
+        self.assertEqual((None, True), cache.lookup('b'))
+        self.assertEqual(8, cache.size)
+
+    def test_replaces_entry(self) -> None:
+        cache = ResponseCache(10)
+        cache.add('a', make_entry(b'aaaa'))
+        cache.add('a', make_entry(b'aa'))
+
+        self.assertEqual(make_entry(b'aa'), cache.lookup('a')[0])
+        self.assertEqual(2, cache.size)
+
+    def test_too_large(self) -> None:
+        cache = ResponseCache(10)
+        cache.add('a', make_entry(b'aaaa'))
+        cache.add('b', make_entry(b'b' * 11))
+
+        self.assertEqual(make_entry(b'aaaa'), cache.lookup('a')[0])
+        self.assertEqual((None, True), cache.lookup('b'))
+
+    def test_single_flight(self) -> None:
+        cache = ResponseCache(100)
+        self.assertEqual((None, True), cache.lookup('a'))
+
+        results = []
+
+        def lookup() -> None:
+            results.append(cache.lookup('a'))
+
+        threads = [threading.Thread(target=lookup) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+
+        self.assertEqual([], results, "Should wait for the response")
+
+        cache.add('a', make_entry(b'1234'))
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([(make_entry(b'1234'), False)] * 5, results)
+
+    def test_abandon(self) -> None:
+        cache = ResponseCache(100)
+        self.assertEqual((None, True), cache.lookup('a'))
+
+        results = []
+
+        def lookup() -> None:
+            results.append(cache.lookup('a'))
+
+        thread = threading.Thread(target=lookup)
+        thread.start()
+        cache.abandon('a')
+        thread.join()
+
+        self.assertEqual([(None, True)], results, "Should take over rendering")
+
+    def test_wait_timeout(self) -> None:
+        cache = ResponseCache(100, wait_timeout=0.01)
+        self.assertEqual((None, True), cache.lookup('a'))
+        self.assertEqual((None, False), cache.lookup('a'))
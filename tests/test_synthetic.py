@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+from benchmarks.synthetic import generate, Scale, team_tla
+from sr.comp.comp import SRComp
+from sr.comp.match_period import MatchType
+
+
+class SyntheticCompstateTests(unittest.TestCase):
+    def test_team_tla(self) -> None:
+        self.assertEqual('AAA', team_tla(0))
+        self.assertEqual('AAZ', team_tla(25))
+        self.assertEqual('ABA', team_tla(26))
+
+    def test_generate(self) -> None:
+        scale = Scale(teams=12, arenas=3, league_slots=6, scored_slots=2, knockout_teams=4)
+
+        with tempfile.TemporaryDirectory() as compstate:
+            generate(compstate, scale)
+            comp = SRComp(compstate)
+
+        self.assertEqual(12, len(comp.teams))
+        self.assertEqual(['A', 'B', 'C'], list(comp.arenas))
+
+        league = [
+            slot
+            for slot in comp.schedule.matches
+            if next(iter(slot.values())).type == MatchType.league
+        ]
+        self.assertEqual(6, len(league))
+
+        for slot in league:
+            teams = [tla for match in slot.values() for tla in match.teams]
+            self.assertEqual(12, len(set(teams)), "Teams should play once per slot")
+
+        self.assertEqual(6, len(comp.scores.league.game_points))
+        self.assertTrue(comp.schedule.knockout_rounds, "Should have knockouts")
+
+    def test_generate_is_repeatable(self) -> None:
+        scale = Scale(teams=8, arenas=2, league_slots=3)
+
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            generate(first, scale)
+            generate(second, scale)
+            self.assertEqual(SRComp(first).state, SRComp(second).state)
+
+    def test_too_few_teams(self) -> None:
+        with tempfile.TemporaryDirectory() as compstate, self.assertRaises(ValueError):
+            generate(compstate, Scale(teams=7, arenas=2))
@@ -0,0 +1,119 @@
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sr.comp.http.team_images import (
+    Image,
+    resize,
+    RESIZING_AVAILABLE,
+    TeamImages,
+)
+from sr.comp.types import TLA
+
+
+class TeamImagesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = tmpdir.name
+
+    def write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_manifest(self) -> None:
+        path = self.write('ABC.png', b'image-content')
+        os.utime(path, (1_400_000_000, 1_400_000_000))
+
+        image = TeamImages(self.directory).get(TLA('ABC'))
+
+        assert image is not None
+        self.assertEqual(path, image.path)
+        self.assertEqual(len(b'image-content'), image.size)
+        self.assertEqual(1_400_000_000, image.last_modified.timestamp())
+        self.assertEqual(hashlib.sha1(b'image-content').hexdigest(), image.digest)
+
+    def test_reuses_previous_digests(self) -> None:
+        self.write('ABC.png', b'image-content')
+        previous = TeamImages(self.directory)
+
+        path = self.write('DEF.png', b'other-content')
+        os.utime(path, (1_400_000_000, 1_400_000_000))
+
+        with mock.patch(
+            'sr.comp.http.team_images._hash_file',
+            side_effect=lambda path: 'new-digest',
+        ) as mock_hash:
+            images = TeamImages(self.directory, previous=previous)
+
+        mock_hash.assert_called_once_with(path)
+        self.assertEqual(previous.images[TLA('ABC')], images.get(TLA('ABC')))
+        self.assertEqual('new-digest', images.images[TLA('DEF')].digest)
+
+    def test_changed_image_rehashed(self) -> None:
+        path = self.write('ABC.png', b'image-content')
+        os.utime(path, (1_400_000_000, 1_400_000_000))
+        previous = TeamImages(self.directory)
+
+        self.write('ABC.png', b'changed-content')
+        os.utime(path, (1_400_000_001, 1_400_000_001))
+        image = TeamImages(self.directory, previous=previous).get(TLA('ABC'))
+
+        assert image is not None
+        self.assertEqual(hashlib.sha1(b'changed-content').hexdigest(), image.digest)
+
+    def test_missing_image(self) -> None:
+        self.write('ABC.png', b'image-content')
+
+        self.assertIsNone(TeamImages(self.directory).get(TLA('DEF')))
+
+    def test_ignores_other_files(self) -> None:
+        self.write('ABC.jpg', b'image-content')
+        os.mkdir(os.path.join(self.directory, 'DEF.png'))
+
+        self.assertEqual({}, TeamImages(self.directory).images)
+
+    def test_missing_directory(self) -> None:
+        images = TeamImages(os.path.join(self.directory, 'missing'))
+
+        self.assertEqual({}, images.images)
+
+    def test_variant_no_image(self) -> None:
+        self.assertIsNone(TeamImages(self.directory).variant(TLA('ABC'), 'thumb'))
+
+
+@unittest.skipIf(not RESIZING_AVAILABLE, "Pillow is not installed")
+class VariantTests(unittest.TestCase):
+    def make_png(self, width: int, height: int) -> bytes:
+        path = os.path.join(self.directory, 'ABC.png')
+        Image.new('RGB', (width, height)).save(path)
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def setUp(self) -> None:
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = tmpdir.name
+
+    def test_variant(self) -> None:
+        self.make_png(400, 200)
+        images = TeamImages(self.directory)
+
+        variant = images.variant(TLA('ABC'), 'thumb')
+
+        assert variant is not None
+        with Image.open(io.BytesIO(variant)) as image:
+            self.assertEqual((64, 32), image.size)
+        self.assertIs(variant, images.variant(TLA('ABC'), 'thumb'))
+
+    def test_small_image_unchanged(self) -> None:
+        original = self.make_png(20, 20)
+
+        self.assertEqual(original, resize(original, 64))
@@ -0,0 +1,39 @@
+import unittest
+from unittest import mock
+
+from sr.comp.http.timing import PhaseTimer
+
+
+class PhaseTimerTests(unittest.TestCase):
+    def test_phases(self) -> None:
+        timer = PhaseTimer()
+
+        with mock.patch('time.perf_counter', side_effect=[1, 3, 3, 8]):
+            with timer.phase('first'):
+                pass
+            with timer.phase('second'):
+                pass
+
+        self.assertEqual({'first': 2, 'second': 5}, timer.phases)
+        self.assertEqual(7, timer.total)
+        self.assertEqual('first=2.000s, second=5.000s', timer.describe())
+
+    def test_repeated_phase(self) -> None:
+        timer = PhaseTimer()
+
+        with mock.patch('time.perf_counter', side_effect=[1, 3, 5, 6]):
+            with timer.phase('phase'):
+                pass
+            with timer.phase('phase'):
+                pass
+
+        self.assertEqual({'phase': 3}, timer.phases)
+
+    def test_phase_with_error(self) -> None:
+        timer = PhaseTimer()
+
+        with mock.patch('time.perf_counter', side_effect=[1, 4]):
+            with self.assertRaises(ValueError), timer.phase('phase'):
+                raise ValueError
+
+        self.assertEqual({'phase': 3}, timer.phases)